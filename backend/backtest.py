@@ -0,0 +1,286 @@
+"""Walk-forward backtest of the quantile models: every origin in a date range x every step x every quantile.
+
+    python -m backend.backtest AAPL --horizon 10 --start 2022-01-01
+    python -m backend.backtest AAPL MSFT NVDA --horizon 5 --retrain-every 63 --rounds 100 --jobs 8 --out bt.json
+    python -m backend.backtest all --horizon 5 --jobs 8        # every ticker with trained models
+
+An origin is a historical bar. Its step-s forecast is scored against the close s bars later, in the
+same prepared frame (feature_engineering + dropna) that training uses.
+
+Modes:
+- Trained models (default). The ticker's live bundle predicts every origin in one batched call per
+  step/quantile booster (ModelBundle.predict_all on the feature matrix). Origins inside the models'
+  90% training split are in-sample, so without --start scoring begins right after it.
+- --retrain-every N. Expanding-window walk-forward. Origins are cut into blocks of N bars. Each block is
+  predicted by fresh boosters trained only on rows whose target was known at the block's first origin
+  (row i for step s when i + s <= origin). Blocks are independent and run on a process pool (--jobs).
+
+Metrics are NumPy reductions over (origins, steps, quantiles). Steps whose target lies past the end of
+the data are masked out.
+- qXX_mae and qXX_pinball, defined as in training metadata.
+- qXX_hit: share of actuals at or below the quantile (close to q when calibrated).
+- coverage: share of actuals inside the outer quantile interval; nominal_coverage is its width,
+  e.g. 0.8 for p10-p90.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+if __package__ is None and __name__ == "__main__":
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from backend.train_lightgbm import (prepare, train_step, train_rows, default_params, thread_budget,
+                                    QUANTILES, NUM_BOOST_ROUND)
+from backend.utils import model_loader, price_store
+
+MIN_TRAIN_ROWS = 250  # walk-forward: rows the first block's longest step needs to train on
+
+
+def actuals(close: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+    """(origins, steps) realized closes: close[origin + s], NaN past the end of the data."""
+    idx = origins[:, None] + np.arange(1, horizon+1)
+    out = np.full(idx.shape, np.nan)
+    inside = idx < len(close)
+    out[inside] = close[idx[inside]]
+    return out
+
+
+def score(pred: np.ndarray, actual: np.ndarray, quantiles: list[float]) -> dict[str, np.ndarray]:
+    """Metrics of (origins, steps, quantiles) predictions against (origins, steps) actuals.
+
+    -> 'n' (steps,), 'mae'/'pinball'/'hit' (steps, quantiles), 'coverage' (steps,). NaN actuals are
+    left out of their step's averages; a step without any target scores NaN.
+    """
+    q = np.asarray(quantiles, dtype=np.float64)
+    valid = ~np.isnan(actual)
+    n = valid.sum(axis=0)
+    err = np.where(valid[..., None], actual[..., None] - pred, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_q = n[:, None].astype(np.float64)
+        out = {
+            'n': n,
+            'mae': np.abs(err).sum(axis=0) / per_q,
+            'pinball': np.maximum(q*err, (q-1)*err).sum(axis=0) / per_q,
+            'hit': ((actual[..., None] <= pred) & valid[..., None]).sum(axis=0) / per_q,
+        }
+        lo, hi = pred[..., int(np.argmin(q))], pred[..., int(np.argmax(q))]
+        out['coverage'] = (valid & (actual >= lo) & (actual <= hi)).sum(axis=0) / n
+    return out
+
+
+def _num(value) -> float | None:
+    return None if np.isnan(value) else round(float(value), 6)
+
+
+def summarize(metrics: dict, quantiles: list[float]) -> tuple[dict, dict]:
+    """-> (summary over every scored origin/step, {'step_s': {...}}) in metadata-style keys."""
+    keys = [f'q{int(q*100)}' for q in quantiles]
+    n = metrics['n']
+    weights = n / n.sum() if n.sum() else n
+    summary = {'scored': int(n.sum()), 'nominal_coverage': round(max(quantiles) - min(quantiles), 6),
+               'coverage': _num(np.nansum(metrics['coverage'] * weights))}
+    steps = {}
+    for s in range(len(n)):
+        steps[f'step_{s+1}'] = {'n': int(n[s]), 'coverage': _num(metrics['coverage'][s])}
+    for j, k in enumerate(keys):
+        for name in ('mae', 'pinball', 'hit'):
+            summary[f'{k}_{name}'] = _num(np.nansum(metrics[name][:, j] * weights))
+            for s in range(len(n)):
+                steps[f'step_{s+1}'][f'{k}_{name}'] = _num(metrics[name][s, j])
+    return summary, steps
+
+
+def _setup(ticker: str, horizon: int | None, start: str | None, end: str | None,
+           walk_forward: bool, min_train_rows: int) -> dict:
+    """Prices -> prepared frame, feature matrix, origins and actuals (and the bundle for trained mode)."""
+    t = ticker.upper()
+    try:
+        meta = model_loader.load_metadata(t)
+    except FileNotFoundError:
+        if not walk_forward:
+            raise
+        meta = None  # walk-forward trains its own models; defaults stand in for the metadata
+    prices = price_store.load_prices(t)
+    if prices is None:
+        raise FileNotFoundError(f"No stored prices for {t}")
+    frame = prepare(prices, engine=(meta or {}).get('feature_engine', 'pandas'))
+    feature_cols = meta['feature_cols'] if meta else [c for c in frame.columns if c != 'date']
+    quantiles = meta['quantiles'] if meta else QUANTILES
+
+    bundle = None
+    if not walk_forward:
+        bundle = model_loader.load_models(t, horizon)
+        horizon = bundle.horizon
+    elif horizon is None:
+        horizon = (meta or {}).get('default_horizon') or (meta or {}).get('horizon') or 30
+
+    dates = pd.to_datetime(frame['date']).to_numpy()
+    idx = np.arange(len(frame))
+    keep = idx < len(frame) - 1  # at least one realized step
+    if start:
+        keep &= dates >= np.datetime64(pd.Timestamp(start))
+    if end:
+        keep &= dates <= np.datetime64(pd.Timestamp(end))
+    in_sample_rows = 0
+    if walk_forward:
+        keep &= idx >= min_train_rows + horizon - 1
+    elif 'rows' in meta:
+        # shared layouts align each step to itself, so step 1 saw the most rows
+        in_sample_rows = train_rows(meta['rows'], 1 if meta.get('layout') == 'shared' else horizon)
+        if not start:
+            keep &= idx >= in_sample_rows
+    origins = idx[keep]
+    if not len(origins):
+        raise ValueError(f"No backtest origins for {t} in the requested range")
+    close = frame['close'].to_numpy(dtype=np.float64)
+    return {'ticker': t, 'horizon': horizon, 'quantiles': quantiles, 'bundle': bundle,
+            'X': frame[feature_cols].to_numpy(dtype=np.float64), 'close': close, 'dates': dates,
+            'origins': origins, 'actual': actuals(close, origins, horizon),
+            'in_sample': int((origins < in_sample_rows).sum())}
+
+
+def _fold_task(X_known: np.ndarray, close_known: np.ndarray, X_block: np.ndarray, horizon: int,
+               quantiles: list[float], params: dict, rounds: int) -> np.ndarray:
+    """Train on the rows known at the block's first origin (the last row of X_known), predict the block.
+
+    -> (block origins, horizon, quantiles). One binned Dataset per step, shared by its quantiles.
+    """
+    import lightgbm as lgb
+    out = np.empty((len(X_block), horizon, len(quantiles)))
+    first = len(X_known) - 1
+    for step in range(1, horizon+1):
+        X_tr, y_tr = X_known[:first-step+1], close_known[step:first+1]
+        dataset = lgb.Dataset(X_tr, label=y_tr, params=params, free_raw_data=False)
+        for j, q in enumerate(quantiles):
+            model, _ = train_step(X_tr, y_tr, q, step, None, params, dataset=dataset, num_boost_round=rounds)
+            out[:, step-1, j] = model.predict(X_block)
+    return out
+
+
+def _finish(ctx: dict, pred: np.ndarray, seconds: float, **extra) -> dict:
+    summary, steps = summarize(score(pred, ctx['actual'], ctx['quantiles']), ctx['quantiles'])
+    origins = ctx['origins']
+    return {'ticker': ctx['ticker'], 'horizon': ctx['horizon'], 'quantiles': ctx['quantiles'],
+            'origins': len(origins), 'start': str(pd.Timestamp(ctx['dates'][origins[0]]).date()),
+            'end': str(pd.Timestamp(ctx['dates'][origins[-1]]).date()), **extra,
+            'seconds': round(seconds, 3), 'summary': summary, 'steps': steps}
+
+
+def backtest(ticker: str, horizon: int | None = None, start: str | None = None, end: str | None = None) -> dict:
+    """Score the ticker's trained bundle at every origin in [start, end] (batched predict_all)."""
+    t0 = time.perf_counter()
+    ctx = _setup(ticker, horizon, start, end, walk_forward=False, min_train_rows=0)
+    pred = ctx['bundle'].predict_all(ctx['X'][ctx['origins']])
+    return _finish(ctx, pred, time.perf_counter() - t0, mode='trained', in_sample_origins=ctx['in_sample'])
+
+
+def _walk_forward_tasks(ctx: dict, every: int, params: dict, rounds: int) -> list[tuple]:
+    tasks = []
+    for i in range(0, len(ctx['origins']), every):
+        block = ctx['origins'][i:i+every]
+        first = int(block[0])
+        tasks.append((ctx['X'][:first+1], ctx['close'][:first+1], ctx['X'][block], ctx['horizon'],
+                      ctx['quantiles'], params, rounds))
+    return tasks
+
+
+def _init_worker(threads: int):
+    os.environ['OMP_NUM_THREADS'] = str(threads)  # booster predict threads in trained mode
+
+
+def run(tickers: list[str], horizon: int | None = None, start: str | None = None, end: str | None = None,
+        retrain_every: int | None = None, rounds: int = NUM_BOOST_ROUND, min_train_rows: int = MIN_TRAIN_ROWS,
+        jobs: int = 1) -> list[dict]:
+    """Backtest many tickers -> one report per ticker, in order ({'ticker', 'error'} for failures).
+
+    Trained mode runs one ticker per worker. Walk-forward sets every ticker up first, then spreads
+    all (ticker, block) trainings over the pool, so a few long tickers do not leave workers idle.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    threads = thread_budget(jobs)
+    pool = ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(threads,)) if jobs > 1 else None
+    reports: list[dict | None] = [None] * len(tickers)
+    try:
+        if not retrain_every:
+            calls = [(backtest, t, horizon, start, end) for t in tickers]
+            futures = [pool.submit(*c) if pool else None for c in calls]
+            for i, (call, fut) in enumerate(zip(calls, futures)):
+                try:
+                    reports[i] = fut.result() if fut else call[0](*call[1:])
+                except Exception as e:
+                    reports[i] = {'ticker': tickers[i].upper(), 'error': str(e)}
+            return reports
+        params = dict(default_params(), num_threads=threads)
+        pending = []
+        for i, t in enumerate(tickers):
+            t0 = time.perf_counter()
+            try:
+                ctx = _setup(t, horizon, start, end, walk_forward=True, min_train_rows=min_train_rows)
+            except Exception as e:
+                reports[i] = {'ticker': t.upper(), 'error': str(e)}
+                continue
+            tasks = _walk_forward_tasks(ctx, retrain_every, params, rounds)
+            futures = [pool.submit(_fold_task, *task) if pool else task for task in tasks]
+            pending.append((i, ctx, t0, futures))
+        for i, ctx, t0, futures in pending:
+            try:
+                blocks = [f.result() if pool else _fold_task(*f) for f in futures]
+            except Exception as e:
+                reports[i] = {'ticker': ctx['ticker'], 'error': str(e)}
+                continue
+            reports[i] = _finish(ctx, np.concatenate(blocks), time.perf_counter() - t0, mode='walk_forward',
+                                 retrain_every=retrain_every, folds=len(blocks), rounds=rounds)
+        return reports
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def trained_tickers() -> list[str]:
+    root = Path(model_loader.MODELS_DIR)
+    return sorted(p.name for p in root.iterdir()
+                  if p.is_dir() and (model_loader.model_root(p.name) / 'metadata.json').exists())
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description='Walk-forward backtest of the quantile forecast models')
+    ap.add_argument('tickers', nargs='+', help="Tickers, or 'all' for every ticker with trained models")
+    ap.add_argument('--horizon', type=int, default=None, help='Horizon to score (default: the trained default)')
+    ap.add_argument('--start', default=None, help='First origin date (default: first out-of-sample bar)')
+    ap.add_argument('--end', default=None, help='Last origin date')
+    ap.add_argument('--retrain-every', type=int, default=None,
+                    help='Expanding-window walk-forward: retrain every N origins instead of using the trained models')
+    ap.add_argument('--rounds', type=int, default=NUM_BOOST_ROUND, help='Boosting rounds per walk-forward retrain')
+    ap.add_argument('--min-train-rows', type=int, default=MIN_TRAIN_ROWS)
+    ap.add_argument('--jobs', type=int, default=1, help='Worker processes (0 = one per CPU)')
+    ap.add_argument('--out', type=Path, default=None, help='Write every report (with per-step metrics) as JSON')
+    args = ap.parse_args(argv)
+
+    tickers = trained_tickers() if args.tickers == ['all'] else args.tickers
+    start = time.perf_counter()
+    reports = run(tickers, args.horizon, args.start, args.end, args.retrain_every, args.rounds,
+                  args.min_train_rows, args.jobs)
+    for r in reports:
+        if 'error' in r:
+            print(f"{r['ticker']:<8} error: {r['error']}")
+            continue
+        s = r['summary']
+        mid = f"q{int(r['quantiles'][len(r['quantiles']) // 2] * 100)}_mae"
+        print(f"{r['ticker']:<8} H{r['horizon']:<4} {r['origins']:>5} origins {r['start']}..{r['end']}  "
+              f"{mid} {s[mid]}  coverage {s['coverage']} (nominal {s['nominal_coverage']})  {r['seconds']}s")
+    print(f"{len(reports)} ticker(s) in {time.perf_counter() - start:.1f}s")
+    if args.out:
+        args.out.write_text(json.dumps(reports, indent=2))
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# Micro-benchmarks for the forecasting backend (run as python -m backend.benchmarks.<name>).
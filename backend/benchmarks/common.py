@@ -0,0 +1,102 @@
+"""Shared helpers for the benchmark scripts: synthetic data, throwaway model dirs, timing."""
+from __future__ import annotations
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.generate_sample_data import generate_stock_data
+from backend.feature_engineering import build_features
+from backend.utils import model_loader
+
+QUANTILES = [0.1, 0.5, 0.9]
+
+
+def synthetic_features(ticker: str = 'BENCH', days: int = 1000) -> pd.DataFrame:
+    df = generate_stock_data(ticker, days=days)
+    return build_features(df).dropna().reset_index(drop=True)
+
+
+def build_fake_models(models_root: Path, ticker: str, horizons: list[int],
+                      artifact: str = 'both', rounds: int = 300, days: int = 1000) -> dict:
+    """Train one real booster per quantile and reuse it for every step of every horizon.
+
+    Load/inference cost depends on booster size and count, not on what the trees learned,
+    so this gives production-shaped artifacts in seconds instead of a full training run.
+    """
+    import joblib
+    import lightgbm as lgb
+
+    df = synthetic_features(ticker, days)
+    feature_cols = [c for c in df.columns if c != 'date']
+    X, y = df[feature_cols].iloc[:-1], df['close'].shift(-1).iloc[:-1]
+    boosters = {}
+    for q in QUANTILES:
+        params = {'objective': 'quantile', 'alpha': q, 'num_leaves': 64, 'min_data_in_leaf': 30,
+                  'learning_rate': 0.05, 'verbosity': -1, 'seed': 42}
+        boosters[int(q*100)] = lgb.train(params, lgb.Dataset(X, y), num_boost_round=rounds)
+
+    ticker_root = Path(models_root) / ticker
+    for H in horizons:
+        hdir = ticker_root / f'H{H}'
+        hdir.mkdir(parents=True, exist_ok=True)
+        model_map = {(step, q_int): b for step in range(1, H+1) for q_int, b in boosters.items()}
+        if artifact in ('pkl', 'both'):
+            for (step, q_int), b in model_map.items():
+                joblib.dump(b, hdir / f'step_{step}_q{q_int}.pkl')
+        if artifact in ('packed', 'both'):
+            model_loader.write_packed(hdir, model_map)
+    meta = {
+        'ticker': ticker,
+        'horizons': sorted(horizons),
+        'default_horizon': max(horizons),
+        'quantiles': QUANTILES,
+        'feature_cols': feature_cols,
+        'metrics': {},
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'rows': len(df),
+    }
+    with open(ticker_root / 'metadata.json', 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def clear_model_caches():
+    model_loader.clear_caches()
+
+
+@contextmanager
+def models_dir(path: Path):
+    """Point the model loader at a scratch models directory for the duration of a benchmark."""
+    original = model_loader.MODELS_DIR
+    model_loader.MODELS_DIR = Path(path)
+    clear_model_caches()
+    try:
+        yield
+    finally:
+        model_loader.MODELS_DIR = original
+        clear_model_caches()
+
+
+def time_call(fn, repeat: int = 1, setup=None) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict:
+    arr = np.asarray(samples) * 1000.0
+    return {
+        'n': len(samples),
+        'mean_ms': float(arr.mean()),
+        'p50_ms': float(np.percentile(arr, 50)),
+        'p99_ms': float(np.percentile(arr, 99)),
+    }
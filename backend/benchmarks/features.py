@@ -0,0 +1,65 @@
+"""build_features: pandas column-by-column path vs the vectorized float32 matrix engine.
+
+    python -m backend.benchmarks.features --rows 1000,100000,10000000
+
+Very large row counts need several GB of RAM for the pandas path; pass --skip-pandas-above
+to time only the numpy engine beyond a size.
+"""
+from __future__ import annotations
+import argparse
+import gc
+
+import numpy as np
+import pandas as pd
+
+from backend.benchmarks.common import time_call, summarize
+from backend.feature_engineering import build_features, build_features_matrix
+
+
+def synthetic_prices(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Vectorized random-walk OHLCV (generate_sample_data loops per row, too slow at 10M)."""
+    rng = np.random.default_rng(seed)
+    # restart the log-price walk every ~10 years of bars so 10M rows stay in float32 range
+    walk = np.cumsum(rng.normal(0.0002, 0.02, rows))
+    close = 100 * np.exp(walk - np.repeat(walk[::2520], 2520)[:rows])
+    spread = np.abs(rng.normal(0, 0.01, rows)) * close
+    return pd.DataFrame({
+        'date': pd.date_range('1990-01-01', periods=rows, freq='min'),
+        'open': close + rng.normal(0, 0.005, rows) * close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(100_000, 2_000_000, rows),
+    })
+
+
+def run(sizes: list[int], repeat: int = 3, skip_pandas_above: int | None = None) -> dict:
+    results = {}
+    for rows in sizes:
+        df = synthetic_prices(rows)
+        reps = repeat if rows <= 1_000_000 else 1
+        res = {'rows': rows}
+        res['numpy'] = summarize(time_call(lambda df=df: build_features_matrix(df), reps, gc.collect))
+        if skip_pandas_above is None or rows <= skip_pandas_above:
+            res['pandas'] = summarize(time_call(lambda df=df: build_features(df), reps, gc.collect))
+        results[str(rows)] = res
+        del df
+        gc.collect()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark feature engines')
+    ap.add_argument('--rows', default='1000,100000,10000000')
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--skip-pandas-above', type=int, default=None)
+    args = ap.parse_args()
+    sizes = [int(r) for r in args.rows.split(',') if r.strip()]
+    for key, res in run(sizes, args.repeat, args.skip_pandas_above).items():
+        line = f"{int(key):>10} rows  numpy {res['numpy']['p50_ms']:10.1f} ms"
+        if 'pandas' in res:
+            line += f"  pandas {res['pandas']['p50_ms']:10.1f} ms  speedup x{res['pandas']['p50_ms']/res['numpy']['p50_ms']:.1f}"
+        print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Forecast-time inference latency: per-(step, quantile) predict calls vs ModelBundle.predict_all
+(LightGBM boosters) vs the compiled array engine (backend.utils.tree_engine).
+
+    python -m backend.benchmarks.inference --horizons 30,365 --batch 256
+"""
+from __future__ import annotations
+import argparse
+import tempfile
+from pathlib import Path
+
+from backend.benchmarks.common import build_fake_models, models_dir, synthetic_features, time_call, summarize
+from backend.utils.model_loader import load_models
+
+
+def _per_call(bundle, X_row):
+    X_row = X_row.reshape(1, -1)
+    for step in range(1, bundle.horizon+1):
+        for q in bundle.quantiles:
+            bundle.predict_step_quantile(step, q, X_row)
+
+
+def run(horizons: list[int], repeat: int = 20, batch: int = 256, rounds: int = 300) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        meta = build_fake_models(Path(tmp), 'BENCH', horizons, artifact='packed', rounds=rounds)
+        feats = synthetic_features('BENCH', days=max(1000, batch + 100))
+        X = feats[meta['feature_cols']].to_numpy(dtype=float)
+        X_row, X_batch = X[-1], X[-batch:]
+        with models_dir(Path(tmp)):
+            for H in horizons:
+                bundle = load_models('BENCH', H)
+                bundle.predict_all(X_row)  # materialize boosters outside the timed region
+                forest = load_models('BENCH', H, engine='compiled').compiled
+                batch_repeat = max(3, repeat // 4)
+                res = {
+                    'per_call_single': summarize(time_call(lambda: _per_call(bundle, X_row), repeat)),
+                    'predict_all_single': summarize(time_call(lambda: bundle.predict_all(X_row), repeat)),
+                    'compiled_single': summarize(time_call(lambda: forest.predict(X_row), repeat)),
+                    'predict_all_batch': summarize(time_call(lambda: bundle.predict_all(X_batch), batch_repeat)),
+                    'compiled_batch': summarize(time_call(lambda: forest.predict(X_batch), batch_repeat)),
+                    'batch_rows': batch,
+                }
+                results[f'H{H}'] = res
+    return results
+
+def report(results: dict):
+    for key, res in results.items():
+        print(key)
+        for name, stats in res.items():
+            if isinstance(stats, dict):
+                print(f"  {name:<22} p50 {stats['p50_ms']:9.2f} ms   p99 {stats['p99_ms']:9.2f} ms")
+        per_row = res['predict_all_batch']['p50_ms'] / res['batch_rows']
+        print(f"  batch of {res['batch_rows']}: {per_row:.3f} ms/row")
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark bundle inference paths')
+    ap.add_argument('--horizons', default='30,365')
+    ap.add_argument('--repeat', type=int, default=20)
+    ap.add_argument('--batch', type=int, default=256)
+    ap.add_argument('--rounds', type=int, default=300)
+    args = ap.parse_args()
+    horizons = [int(h) for h in args.horizons.split(',') if h.strip()]
+    report(run(horizons, args.repeat, args.batch, args.rounds))
+
+if __name__ == '__main__':
+    main()
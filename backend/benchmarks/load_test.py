@@ -0,0 +1,246 @@
+"""Load generator for /api/predict, /api/models and /api/models/{ticker}: RPS, p50/p95/p99, errors.
+
+    python -m backend.benchmarks.load_test --concurrency 16 --requests 2000 --scenario both
+    python -m backend.benchmarks.load_test --url http://localhost:8000 --tickers MSFT --horizons 3,5
+
+In-process (default) the app is driven through httpx.ASGITransport. Market data comes from
+SyntheticProvider, so no network is used. Synthetic boosters for --synthetic-tickers tickers are
+generated into a scratch models dir, unless --models-dir points at real ones. The client shares
+the event loop with the app; forecast work itself runs on the service's FORECAST_POOL.
+
+Against --url, start the server with local data first, e.g.
+    MARKET_DATA_PROVIDER=synthetic MARKET_DATA_DISK=0 uvicorn backend.predict_service:app
+Only in-process runs can reset server caches, so there 'cold' means whatever state the
+server is in; 'warm' first requests every ticker/horizon once.
+
+Scenarios: 'cold' empties the model, feature, market data and forecast caches before the run;
+'warm' runs after a pass over every ticker/horizon. --no-result-cache disables the forecast
+cache in-process, so warm runs measure model inference rather than cache hits.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+ENDPOINTS = ('predict', 'models', 'model_meta')
+
+
+def build_plan(n: int, tickers: list[str], horizons: list[int], mix: dict[str, float], recent: int,
+               seed: int = 0) -> list[tuple[str, str, str, dict | None]]:
+    """n requests drawn from the endpoint mix -> [(endpoint, method, path, json body)]."""
+    rng = random.Random(seed)
+    names = [e for e in ENDPOINTS if mix.get(e, 0) > 0]
+    weights = [mix[e] for e in names]
+    plan = []
+    for endpoint in rng.choices(names, weights, k=n):
+        ticker = rng.choice(tickers)
+        if endpoint == 'predict':
+            body = {'ticker': ticker, 'horizon': rng.choice(horizons), 'recent': recent}
+            plan.append((endpoint, 'POST', '/api/predict', body))
+        elif endpoint == 'models':
+            plan.append((endpoint, 'GET', '/api/models', None))
+        else:
+            plan.append((endpoint, 'GET', f'/api/models/{ticker}', None))
+    return plan
+
+
+async def drive(client, plan: list, concurrency: int, duration: float | None = None) -> tuple[list, float]:
+    """Send the plan with `concurrency` in-flight requests -> ([(endpoint, status, seconds)], wall seconds).
+
+    With duration set, the plan is cycled until the time is up.
+    """
+    samples = []
+    position = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal position
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+                item = plan[position % len(plan)]
+            elif position >= len(plan):
+                return
+            else:
+                item = plan[position]
+            position += 1
+            endpoint, method, path, body = item
+            start = time.perf_counter()
+            try:
+                r = await client.request(method, path, json=body)
+                status = r.status_code
+            except Exception:
+                status = 0  # transport error
+            samples.append((endpoint, status, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples: list, wall: float) -> dict:
+    """Per endpoint and overall: requests, rps, error_rate, p50/p95/p99/max ms."""
+    groups = {'all': samples}
+    for endpoint in ENDPOINTS:
+        subset = [s for s in samples if s[0] == endpoint]
+        if subset:
+            groups[endpoint] = subset
+    out = {}
+    for name, subset in groups.items():
+        ms = np.array([s[2] for s in subset]) * 1e3
+        failed = [s[1] for s in subset if not 200 <= s[1] < 400]
+        out[name] = {
+            'requests': len(subset),
+            'rps': round(len(subset) / wall, 1) if wall else None,
+            'error_rate': round(len(failed) / len(subset), 4),
+            'errors_by_status': {str(code): failed.count(code) for code in sorted(set(failed))},
+            'p50_ms': round(float(np.percentile(ms, 50)), 2),
+            'p95_ms': round(float(np.percentile(ms, 95)), 2),
+            'p99_ms': round(float(np.percentile(ms, 99)), 2),
+            'max_ms': round(float(ms.max()), 2),
+        }
+    return out
+
+
+def synthetic_models(root: Path, count: int, horizons: list[int], rounds: int) -> list[str]:
+    """Packed synthetic models for LT0..LT{count-1}: one set is trained, then copied per ticker."""
+    from backend.benchmarks.common import build_fake_models
+    build_fake_models(root, 'LT0', horizons, artifact='packed', rounds=rounds)
+    tickers = [f'LT{i}' for i in range(count)]
+    for t in tickers[1:]:
+        shutil.copytree(root / 'LT0', root / t)
+        meta_path = root / t / 'metadata.json'
+        meta = json.loads(meta_path.read_text())
+        meta['ticker'] = t
+        meta_path.write_text(json.dumps(meta))
+    return tickers
+
+
+@contextmanager
+def in_process_app(models_root: Path, result_cache: bool, provider_rows: int):
+    """Point the service at models_root and a synthetic market data provider (no network, no disk)."""
+    from backend import predict_service as ps
+    from backend.utils import model_loader
+    from backend.utils.market_data import MarketDataCache, SyntheticProvider
+    saved = (ps.MODELS_DIR, model_loader.MODELS_DIR, ps.MARKET_DATA, ps.FORECAST_CACHE.maxsize,
+             os.environ.get('OFFLINE_MODE'))
+    ps.MODELS_DIR = model_loader.MODELS_DIR = Path(models_root)
+    ps.MARKET_DATA = MarketDataCache(SyntheticProvider(rows=provider_rows), cache_dir=None)
+    os.environ['OFFLINE_MODE'] = '0'  # go through MARKET_DATA rather than the local price store
+    if not result_cache:
+        ps.FORECAST_CACHE.maxsize = 0
+    reset_caches(ps)
+    try:
+        yield ps
+    finally:
+        ps.MARKET_DATA.shutdown()
+        ps.MODELS_DIR, model_loader.MODELS_DIR, ps.MARKET_DATA, ps.FORECAST_CACHE.maxsize, offline = saved
+        if offline is None:
+            os.environ.pop('OFFLINE_MODE', None)
+        else:
+            os.environ['OFFLINE_MODE'] = offline
+        reset_caches(ps)
+
+
+def reset_caches(ps):
+    from backend.utils import model_loader
+    model_loader.clear_caches()
+    ps.FORECAST_CACHE.clear()
+    ps.ONLINE_FEATURES.clear()
+    ps.MARKET_DATA.invalidate()
+
+
+async def run_scenarios(client, scenarios: list[str], plan: list, concurrency: int, duration: float | None,
+                        tickers: list[str], horizons: list[int], recent: int, ps=None) -> dict:
+    results = {}
+    for scenario in scenarios:
+        if scenario == 'cold' and ps is not None:
+            reset_caches(ps)
+        if scenario == 'warm':
+            warmup = [('predict', 'POST', '/api/predict', {'ticker': t, 'horizon': h, 'recent': recent})
+                      for t in tickers for h in horizons]
+            await drive(client, warmup, concurrency)
+        samples, wall = await drive(client, plan, concurrency, duration)
+        results[scenario] = summarize(samples, wall)
+        results[scenario]['all']['wall_s'] = round(wall, 2)
+    return results
+
+
+async def main_async(args) -> dict:
+    import httpx
+    horizons = [int(h) for h in args.horizons.split(',') if h.strip()]
+    mix = {k: float(v) for k, v in (p.split(':') for p in args.mix.split(','))}
+    scenarios = ['cold', 'warm'] if args.scenario == 'both' else [args.scenario]
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.url:
+        tickers = [t.strip().upper() for t in args.tickers.split(',')] if args.tickers else None
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout,
+                                     limits=httpx.Limits(max_connections=args.concurrency)) as client:
+            if tickers is None:
+                tickers = [m['ticker'] for m in (await client.get('/api/models')).json()]
+            plan = build_plan(args.requests, tickers, horizons, mix, args.recent, args.seed)
+            return await run_scenarios(client, scenarios, plan, args.concurrency, args.duration,
+                                       tickers, horizons, args.recent)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.models_dir:
+            models_root = Path(args.models_dir)
+            tickers = [t.strip().upper() for t in args.tickers.split(',')] if args.tickers else \
+                sorted(p.name for p in models_root.iterdir() if p.is_dir())
+        else:
+            models_root = Path(tmp)
+            tickers = synthetic_models(models_root, args.synthetic_tickers, horizons, args.model_rounds)
+        plan = build_plan(args.requests, tickers, horizons, mix, args.recent, args.seed)
+        with in_process_app(models_root, not args.no_result_cache, args.provider_rows) as ps:
+            transport = httpx.ASGITransport(app=ps.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://loadtest', timeout=timeout) as client:
+                return await run_scenarios(client, scenarios, plan, args.concurrency, args.duration,
+                                           tickers, horizons, args.recent, ps)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Load-test the forecast API with local data')
+    ap.add_argument('--url', default=None, help='Target a running server instead of the in-process app')
+    ap.add_argument('--concurrency', type=int, default=16)
+    ap.add_argument('--requests', type=int, default=1000, help='Requests per scenario (plan length)')
+    ap.add_argument('--duration', type=float, default=None, help='Run each scenario this many seconds instead')
+    ap.add_argument('--scenario', choices=['cold', 'warm', 'both'], default='both')
+    ap.add_argument('--mix', default='predict:8,models:1,model_meta:1', help='Endpoint weights')
+    ap.add_argument('--horizons', default='5,30')
+    ap.add_argument('--tickers', default=None, help='Comma list (default: every ticker with models)')
+    ap.add_argument('--recent', type=int, default=200)
+    ap.add_argument('--synthetic-tickers', type=int, default=8)
+    ap.add_argument('--model-rounds', type=int, default=300)
+    ap.add_argument('--models-dir', default=None, help='Serve these models in-process instead of synthetic ones')
+    ap.add_argument('--provider-rows', type=int, default=756, help='Bars returned by the synthetic provider')
+    ap.add_argument('--no-result-cache', action='store_true', help='Disable the forecast cache (in-process)')
+    ap.add_argument('--timeout', type=float, default=60.0)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', type=Path, default=None, help='Write the report as JSON')
+    args = ap.parse_args()
+
+    results = asyncio.run(main_async(args))
+    for scenario, groups in results.items():
+        print(f"== {scenario} (concurrency {args.concurrency}) ==")
+        for name, r in groups.items():
+            print(f"  {name:<11} {r['requests']:>6} req  {r['rps']:>8} rps  err {r['error_rate']:.2%}  "
+                  f"p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms"
+                  + (f"  errors {r['errors_by_status']}" if r['errors_by_status'] else ''))
+    if args.out:
+        args.out.write_text(json.dumps({'args': vars(args) | {'out': str(args.out)}, 'results': results}, indent=2))
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Cold-load time of legacy per-step pickles vs the packed single-file artifact.
+
+    python -m backend.benchmarks.model_load --horizons 30,365
+
+'packed (open)' is what load_models pays up front; boosters are then deserialized lazily,
+so 'packed (all)' additionally touches every booster once to show the full cost.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import tempfile
+from pathlib import Path
+
+from backend.benchmarks.common import build_fake_models, models_dir, clear_model_caches, time_call, summarize
+from backend.utils.model_loader import load_models
+
+
+def run(horizons: list[int], repeat: int = 3, rounds: int = 300) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        build_fake_models(Path(tmp), 'BENCH', horizons, artifact='both', rounds=rounds)
+        with models_dir(Path(tmp)):
+            def clear():
+                # drop the previous bundle outside the timed region (freeing boosters is not free)
+                clear_model_caches()
+                gc.collect()
+
+            for H in horizons:
+                def cold(artifact: str, touch_all: bool = False):
+                    bundle = load_models('BENCH', H, artifact)
+                    if touch_all:
+                        for key in bundle.model_map:
+                            bundle.model_map[key]
+                results[f'H{H}'] = {
+                    'models': H * 3,
+                    'pkl': summarize(time_call(lambda: cold('pkl'), repeat, clear)),
+                    'packed_open': summarize(time_call(lambda: cold('packed'), repeat, clear)),
+                    'packed_all': summarize(time_call(lambda: cold('packed', True), repeat, clear)),
+                }
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark cold model loading per artifact format')
+    ap.add_argument('--horizons', default='30,365')
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--rounds', type=int, default=300, help='Boosting rounds per synthetic model')
+    args = ap.parse_args()
+    horizons = [int(h) for h in args.horizons.split(',') if h.strip()]
+    results = run(horizons, args.repeat, args.rounds)
+    for key, res in results.items():
+        print(f"{key} ({res['models']} models)")
+        for fmt in ('pkl', 'packed_open', 'packed_all'):
+            print(f"  {fmt:<12} p50 {res[fmt]['p50_ms']:9.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""Benchmark suite: features, model loading, forecast() end to end, training and cold start, with JSON
+output and regression checks against a saved baseline.
+
+    python -m backend.benchmarks.run --out baseline.json
+    python -m backend.benchmarks.run --out current.json --compare baseline.json   # exit 1 on regression
+    python -m backend.benchmarks.run --load current.json --compare baseline.json  # compare two files
+
+Price data comes from generate_sample_data.generate_stock_data at each --rows scale; models are
+production-shaped synthetic boosters (common.build_fake_models); forecast() runs with
+download_latest stubbed out, so nothing touches the network. 'startup' (not in the default groups)
+runs benchmarks.startup: import times, CLI --help latency and time to first /health in fresh
+interpreters. Result names are stable
+('group.case[params]'), so files from different commits compare key by key.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from backend.benchmarks.common import (build_fake_models, models_dir, clear_model_caches, time_call, summarize,
+                                       QUANTILES)
+from backend.generate_sample_data import generate_stock_data
+from backend.feature_engineering import build_features
+from backend.utils.model_loader import load_models
+
+GROUPS = ('features', 'load', 'forecast', 'train', 'startup')
+DEFAULT_GROUPS = GROUPS[:4]
+
+
+def bench_features(rows_list: list[int], repeat: int) -> dict:
+    out = {}
+    for rows in rows_list:
+        df = generate_stock_data('BENCH', days=rows)
+        for engine in ('pandas', 'numpy'):
+            out[f'features.{engine}[rows={rows}]'] = summarize(
+                time_call(lambda: build_features(df, engine=engine), repeat, gc.collect))
+    return out
+
+
+def bench_load(root: Path, horizons: list[int], repeat: int) -> dict:
+    out = {}
+    with models_dir(root):
+        def cold_setup():
+            clear_model_caches()
+            gc.collect()
+
+        for H in horizons:
+            for artifact in ('pkl', 'packed'):
+                out[f'load.cold_{artifact}[H={H}]'] = summarize(
+                    time_call(lambda: load_models('BENCH', H, artifact), repeat, cold_setup))
+            load_models('BENCH', H)
+            out[f'load.warm[H={H}]'] = summarize(time_call(lambda: load_models('BENCH', H), repeat * 100))
+    return out
+
+
+def bench_forecast(root: Path, horizons: list[int], rows_list: list[int], repeat: int) -> dict:
+    from backend import predict_service as ps
+    out = {}
+    with models_dir(root):
+        for rows in rows_list:
+            prices = generate_stock_data('BENCH', days=rows)
+            with patch.object(ps, 'download_latest', lambda ticker: prices):
+                for H in horizons:
+                    def cold_setup():
+                        clear_model_caches()
+                        ps.ONLINE_FEATURES.clear()
+                        gc.collect()
+
+                    tag = f'[H={H},rows={rows}]'
+                    out[f'forecast.cold{tag}'] = summarize(
+                        time_call(lambda: ps.forecast('BENCH', H, 200, use_cache=False), repeat, cold_setup))
+                    out[f'forecast.warm{tag}'] = summarize(
+                        time_call(lambda: ps.forecast('BENCH', H, 200, use_cache=False), repeat * 10))
+                    ps.forecast('BENCH', H, 200)
+                    out[f'forecast.cached{tag}'] = summarize(
+                        time_call(lambda: ps.forecast('BENCH', H, 200), repeat * 10))
+            ps.FORECAST_CACHE.clear()
+    return out
+
+
+def bench_train(horizons: list[int], rows_list: list[int], rounds: int) -> dict:
+    """Fit every step/quantile booster of one horizon in-process (no artifacts written)."""
+    from backend import train_lightgbm as tl
+    out = {}
+    params = {'learning_rate': 0.05, 'feature_fraction': 0.9, 'bagging_fraction': 0.9, 'bagging_freq': 1,
+              'num_leaves': 64, 'min_data_in_leaf': 30, 'max_depth': -1, 'seed': 42, 'verbosity': -1,
+              'metric': 'quantile', 'num_threads': os.cpu_count() or 1}
+    for rows in rows_list:
+        df = tl.prepare(generate_stock_data('BENCH', days=rows))
+        feature_cols = [c for c in df.columns if c != 'date']
+        for H in horizons:
+            tl._init_task_data(df[feature_cols], df['close'], params)
+
+            def fit_horizon():
+                for step in range(1, H+1):
+                    for q in QUANTILES:
+                        tl._fit_task(H, step, q, None, rounds=rounds)
+            out[f'train.horizon[H={H},rows={rows},rounds={rounds}]'] = summarize(time_call(fit_horizon, 1))
+    return out
+
+
+def environment() -> dict:
+    import lightgbm
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'lightgbm': lightgbm.__version__,
+    }
+
+
+def run(groups: list[str], rows: list[int], horizons: list[int], repeat: int,
+        train_rows: list[int], train_horizons: list[int], train_rounds: int, model_rounds: int) -> dict:
+    results = {}
+    if 'features' in groups:
+        results.update(bench_features(rows, repeat))
+    if 'load' in groups or 'forecast' in groups:
+        with tempfile.TemporaryDirectory() as tmp:
+            build_fake_models(Path(tmp), 'BENCH', horizons, artifact='both', rounds=model_rounds)
+            if 'load' in groups:
+                results.update(bench_load(Path(tmp), horizons, repeat))
+            if 'forecast' in groups:
+                results.update(bench_forecast(Path(tmp), horizons, rows, repeat))
+    if 'train' in groups:
+        results.update(bench_train(train_horizons, train_rows, train_rounds))
+    if 'startup' in groups:
+        from backend.benchmarks.startup import measure
+        results.update(measure(repeat)[0])
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25, min_delta_ms: float = 0.05) -> list[dict]:
+    """Per-benchmark p50 comparison -> rows with status 'regression', 'faster', 'ok', 'new' or 'missing'.
+
+    A change counts only if it exceeds both the relative threshold and min_delta_ms, so
+    microsecond-scale benchmarks do not flap on timer noise.
+    """
+    rows = []
+    for name in sorted(set(current) | set(baseline)):
+        cur, base = current.get(name), baseline.get(name)
+        if cur is None or base is None:
+            rows.append({'name': name, 'status': 'missing' if cur is None else 'new',
+                         'base_ms': base and base['p50_ms'], 'cur_ms': cur and cur['p50_ms'], 'ratio': None})
+            continue
+        ratio = cur['p50_ms'] / base['p50_ms'] if base['p50_ms'] else float('inf')
+        delta = cur['p50_ms'] - base['p50_ms']
+        status = 'ok'
+        if abs(delta) >= min_delta_ms:
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold):
+                status = 'faster'
+        rows.append({'name': name, 'status': status, 'base_ms': base['p50_ms'], 'cur_ms': cur['p50_ms'],
+                     'ratio': round(ratio, 3)})
+    return rows
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Run the benchmark suite and optionally compare with a baseline')
+    ap.add_argument('--groups', default=','.join(DEFAULT_GROUPS), help=f'Subset of {",".join(GROUPS)}')
+    ap.add_argument('--rows', default='1000,5000', help='Price history lengths for features/forecast')
+    ap.add_argument('--horizons', default='5,30', help='Horizons for load/forecast')
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--model-rounds', type=int, default=300, help='Boosting rounds of the synthetic models')
+    ap.add_argument('--train-rows', default='1000')
+    ap.add_argument('--train-horizons', default='5')
+    ap.add_argument('--train-rounds', type=int, default=300)
+    ap.add_argument('--out', type=Path, default=None, help='Write results JSON here')
+    ap.add_argument('--load', type=Path, default=None, help='Read results JSON instead of running')
+    ap.add_argument('--compare', type=Path, default=None, help='Baseline results JSON to check against')
+    ap.add_argument('--threshold', type=float, default=0.25, help='Relative p50 slowdown flagged as regression')
+    ap.add_argument('--min-delta-ms', type=float, default=0.05)
+    args = ap.parse_args()
+
+    if args.load:
+        with open(args.load) as f:
+            doc = json.load(f)
+    else:
+        groups = [g.strip() for g in args.groups.split(',') if g.strip()]
+        unknown = set(groups) - set(GROUPS)
+        if unknown:
+            ap.error(f'unknown groups {sorted(unknown)}')
+        config = {'groups': groups, 'rows': _ints(args.rows), 'horizons': _ints(args.horizons),
+                  'repeat': args.repeat, 'train_rows': _ints(args.train_rows),
+                  'train_horizons': _ints(args.train_horizons), 'train_rounds': args.train_rounds,
+                  'model_rounds': args.model_rounds}
+        start = time.perf_counter()
+        results = run(**config)
+        doc = {'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'env': environment(),
+               'config': config, 'seconds': round(time.perf_counter() - start, 1), 'results': results}
+        for name, stats in results.items():
+            print(f"{name:<48} p50 {stats['p50_ms']:10.3f} ms   p99 {stats['p99_ms']:10.3f} ms   (n={stats['n']})")
+    if args.out:
+        args.out.write_text(json.dumps(doc, indent=2))
+        print(f"Wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(doc['results'], baseline['results'], args.threshold, args.min_delta_ms)
+        if baseline.get('env') != doc.get('env'):
+            print('note: baseline was recorded in a different environment:', baseline.get('env'))
+        fmt = lambda ms: '-' if ms is None else f'{ms:.3f}'
+        for r in rows:
+            if r['status'] == 'ok':
+                continue
+            ratio = f"x{r['ratio']:.2f}" if r['ratio'] is not None else ''
+            print(f"{r['status'].upper():<10} {r['name']:<48} {fmt(r['base_ms'])} -> {fmt(r['cur_ms'])} ms {ratio}")
+        regressions = [r for r in rows if r['status'] == 'regression']
+        print(f"{len(regressions)} regression(s), {sum(r['status'] == 'faster' for r in rows)} faster, "
+              f"{sum(r['status'] == 'ok' for r in rows)} unchanged (threshold {args.threshold:.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
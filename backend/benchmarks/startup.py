@@ -0,0 +1,126 @@
+"""Cold-start cost: module import time, CLI latency and service time-to-first-response.
+
+    python -m backend.benchmarks.startup --repeat 5 --ticker MSFT
+
+Every sample runs in a fresh interpreter (imports are cached per process). 'first_response' starts
+uvicorn with PRELOAD_MODELS=none and synthetic market data, then polls /health; with --ticker
+it also times the first /api/predict against the still-cold process. Heavy optional modules
+(yfinance, lightgbm, sklearn, scipy, joblib) that an import pulls in are listed. Nothing in
+that list should appear for the service.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from backend.benchmarks.common import summarize
+
+ROOT = Path(__file__).resolve().parents[2]
+MODULES = ('backend.predict_service', 'backend.train_lightgbm', 'backend.bootstrap_models', 'backend.data_fetch')
+CLIS = ('backend.train_lightgbm', 'backend.data_fetch', 'backend.utils.price_store')
+HEAVY = ('yfinance', 'lightgbm', 'sklearn', 'scipy', 'joblib')
+
+_IMPORT_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import {module}
+print(json.dumps([time.perf_counter() - t, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def _python(args: list[str], **kw) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True, **kw)
+
+
+def import_time(module: str, repeat: int) -> tuple[list[float], list[str]]:
+    samples, heavy = [], []
+    for _ in range(repeat):
+        seconds, heavy = json.loads(_python(['-c', _IMPORT_PROBE.format(module=module, heavy=HEAVY)]).stdout)
+        samples.append(seconds)
+    return samples, heavy
+
+
+def cli_time(module: str, repeat: int) -> list[float]:
+    """Wall time of `python -m module --help`: interpreter start + imports + argparse."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _python(['-m', module, '--help'])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def first_response(repeat: int, ticker: str | None = None, timeout: float = 60.0) -> dict[str, list[float]]:
+    """Seconds from spawning uvicorn to the first /health 200 (and the first forecast, with ticker)."""
+    import httpx
+    env = dict(os.environ, PRELOAD_MODELS='none', MARKET_DATA_PROVIDER='synthetic', MARKET_DATA_DISK='0')
+    out = {'health': [], 'predict': []}
+    for _ in range(repeat):
+        port = _free_port()
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'backend.predict_service:app', '--port', str(port),
+                                 '--log-level', 'warning'], cwd=ROOT, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            with httpx.Client(base_url=f'http://127.0.0.1:{port}', timeout=timeout) as client:
+                while True:
+                    if time.perf_counter() - start > timeout:
+                        raise TimeoutError('service did not answer /health')
+                    try:
+                        if client.get('/health').status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        time.sleep(0.01)
+                out['health'].append(time.perf_counter() - start)
+                if ticker:
+                    t0 = time.perf_counter()
+                    client.post('/api/predict', json={'ticker': ticker, 'horizon': 1, 'recent': 50}).raise_for_status()
+                    out['predict'].append(time.perf_counter() - t0)
+        finally:
+            proc.terminate()
+            proc.wait(10)
+    return {k: v for k, v in out.items() if v}
+
+
+def measure(repeat: int = 3, ticker: str | None = None) -> tuple[dict, dict]:
+    """-> (results in the benchmarks.run format, {module: heavy modules it imported})."""
+    results, heavy = {}, {}
+    for module in MODULES:
+        samples, heavy[module] = import_time(module, repeat)
+        results[f'startup.import[{module}]'] = summarize(samples)
+    for module in CLIS:
+        results[f'startup.cli_help[{module}]'] = summarize(cli_time(module, repeat))
+    for name, samples in first_response(repeat, ticker).items():
+        results[f'startup.first_{name}[service]'] = summarize(samples)
+    return results, heavy
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Measure import time, CLI latency and time to first response')
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--ticker', default=None, help='Also time the first /api/predict for this ticker')
+    ap.add_argument('--out', type=Path, default=None)
+    args = ap.parse_args()
+    results, heavy = measure(args.repeat, args.ticker)
+    for name, stats in results.items():
+        print(f"{name:<52} p50 {stats['p50_ms']:9.1f} ms   p99 {stats['p99_ms']:9.1f} ms")
+    for module, loaded in heavy.items():
+        print(f"{module:<32} heavy imports: {', '.join(loaded) or '-'}")
+    if args.out:
+        args.out.write_text(json.dumps({'results': results, 'heavy_imports': heavy}, indent=2))
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
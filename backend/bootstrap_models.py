@@ -3,27 +3,49 @@
 Environment variables:
   BOOTSTRAP_TICKERS  Comma separated tickers (default: MSFT)
   BOOTSTRAP_HORIZONS Comma separated horizons (default: 5)
+  BOOTSTRAP_LAYOUT   'per_horizon' (default) or 'shared' (train steps 1..max horizon once)
   OFFLINE_MODE       If '1' uses synthetic data generation when downloading fails
 
 Runs quickly because horizons kept small by default. Adjust for production.
+Tickers are trained in this process (train_lightgbm.main), so pandas/LightGBM are imported once
+rather than once per ticker, and not at all when every model is already present.
 """
 from __future__ import annotations
-import os, sys, subprocess
+import os, sys, json
 from pathlib import Path
 
 HERE = Path(__file__).parent
 MODELS = HERE / 'models'
 
+def _model_root(ticker: str) -> Path:
+    # versioned registry: models/T/CURRENT names the live versions/<v>/ directory
+    pointer = MODELS / ticker / 'CURRENT'
+    if pointer.exists():
+        return MODELS / ticker / 'versions' / pointer.read_text().strip()
+    return MODELS / ticker
+
 def have_all(ticker: str, horizons: list[int]) -> bool:
-    meta = MODELS / ticker / 'metadata.json'
+    root = _model_root(ticker)
+    meta = root / 'metadata.json'
     if not meta.exists():
         return False
+    with open(meta) as f:
+        trained = json.load(f)
+    if trained.get('layout') == 'shared':
+        # shared step set covers every horizon up to its length
+        return (root / 'shared').exists() and max(trained['horizons']) >= max(horizons)
     # quick heuristic: ensure each horizon dir exists
     for h in horizons:
-        if not (MODELS / ticker / f'H{h}').exists():
+        if not (root / f'H{h}').exists():
             return False
     return True
 
+def _train_main():
+    if str(HERE.parent) not in sys.path:
+        sys.path.append(str(HERE.parent))  # run as a script: make `backend.` importable
+    from backend.train_lightgbm import main as train_main
+    return train_main
+
 def main():
     tickers = [t.strip().upper() for t in os.getenv('BOOTSTRAP_TICKERS', 'MSFT').split(',') if t.strip()]
     horizons = sorted({int(h.strip()) for h in os.getenv('BOOTSTRAP_HORIZONS', '5').split(',') if h.strip()})
@@ -32,12 +54,12 @@ def main():
         if have_all(t, horizons):
             print(f"[bootstrap] Models already present for {t} -> skip")
             continue
-        cmd = [sys.executable, str(HERE / 'train_lightgbm.py'), t, '--horizons', ','.join(map(str,horizons))]
-        print(f"[bootstrap] Training {t}: {' '.join(cmd)}")
+        argv = [t, '--horizons', ','.join(map(str,horizons)), '--layout', os.getenv('BOOTSTRAP_LAYOUT', 'per_horizon')]
+        print(f"[bootstrap] Training {t}: train_lightgbm {' '.join(argv)}")
         try:
-            subprocess.check_call(cmd, cwd=HERE)
-        except subprocess.CalledProcessError as e:
-            print(f"[bootstrap] Training failed for {t}: {e}")
+            _train_main()(argv)
+        except (Exception, SystemExit) as e:
+            print(f"[bootstrap] Training failed for {t}: {e!r}")
     print("[bootstrap] Done")
 
 if __name__ == '__main__':
@@ -1,16 +1,23 @@
 """Download historical OHLCV data for one or more tickers using yfinance.
-Saves each ticker to backend/data/{TICKER}.csv
+Saves each ticker to the columnar price store backend/data/store/{TICKER}/ (see utils/price_store.py)
 """
 from __future__ import annotations
 import argparse
+import sys
 from pathlib import Path
-import yfinance as yf
 import pandas as pd
 
+if __package__ is None and __name__ == "__main__":
+    # python backend/data_fetch.py ...: make `backend.` imports work regardless of CWD
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from backend.utils import price_store
+
 DATA_DIR = Path(__file__).parent / 'data'
 
 
 def fetch_ticker(ticker: str, start: str = '2015-01-01', end: str | None = None, interval: str = '1d') -> pd.DataFrame:
+    import yfinance as yf  # only the download path needs it (and its network stack)
     df = yf.download(ticker, start=start, end=end, interval=interval, auto_adjust=True, progress=False)
     if df.empty:
         raise ValueError(f"No data returned for {ticker}")
@@ -25,11 +32,12 @@ def fetch_ticker(ticker: str, start: str = '2015-01-01', end: str | None = None,
     return df
 
 
-def save(df: pd.DataFrame, ticker: str):
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    out = DATA_DIR / f"{ticker.upper()}.csv"
-    df.to_csv(out, index=False)
-    return out
+def save(df: pd.DataFrame, ticker: str, append: bool = False):
+    """Store df for ticker; append=True only adds bars newer than what is stored."""
+    if append:
+        price_store.append(ticker, df)
+        return price_store.STORE_DIR / ticker.upper()
+    return price_store.write(ticker, df)
 
 
 def main():
@@ -38,12 +46,13 @@ def main():
     ap.add_argument('--start', default='2015-01-01')
     ap.add_argument('--end', default=None)
     ap.add_argument('--interval', default='1d')
+    ap.add_argument('--append', action='store_true', help='Append new bars to the stored history instead of replacing it')
     args = ap.parse_args()
 
     for t in args.tickers:
         try:
             df = fetch_ticker(t, start=args.start, end=args.end, interval=args.interval)
-            path = save(df, t)
+            path = save(df, t, append=args.append)
             print(f"Saved {t} -> {path} ({len(df)} rows)")
         except Exception as e:
             print(f"Failed {t}: {e}")
@@ -64,7 +64,20 @@ def add_calendar(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def build_features(df: pd.DataFrame) -> pd.DataFrame:
+def build_features(df: pd.DataFrame, engine: str = 'pandas') -> pd.DataFrame:
+    """Add every feature column to a copy of df.
+
+    engine='numpy' computes the same columns with build_features_matrix (float32 output);
+    train and serve with the same engine since float32 values can land on the other side of a
+    split threshold.
+    """
+    if engine == 'numpy':
+        matrix, columns, dates = build_features_matrix(df)
+        out = pd.DataFrame(matrix, columns=columns, copy=False)
+        out.insert(0, 'date', dates)
+        return out
+    if engine != 'pandas':
+        raise ValueError(f"Unknown feature engine {engine!r}")
     df = df.copy()
     # ensure date type
     if not np.issubdtype(df['date'].dtype, np.datetime64):
@@ -81,6 +94,132 @@ def build_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[n:] = x[:-n]
+    return out
+
+
+class _WindowSums:
+    """Shared prefix sums so every rolling mean/std (any window) costs O(n) subtractions.
+
+    Values are shifted by the first finite value before summing to limit cancellation in the
+    variance; NaN inputs poison exactly the windows that contain them (pandas semantics).
+    """
+
+    def __init__(self, x: np.ndarray):
+        nan = np.isnan(x)
+        self.has_nan = bool(nan.any())
+        finite = x[~nan] if self.has_nan else x
+        self.offset = finite[0] if finite.size else 0.0
+        xs = np.where(nan, 0.0, x - self.offset) if self.has_nan else x - self.offset
+        self.s1 = np.concatenate([[0.0], np.cumsum(xs)])
+        self.s2 = np.concatenate([[0.0], np.cumsum(xs * xs)])
+        self.nans = np.concatenate([[0], np.cumsum(nan)]) if self.has_nan else None
+        self.n = len(x)
+
+    def _window(self, arr: np.ndarray, w: int) -> np.ndarray:
+        out = np.empty(self.n)
+        out[:w-1] = np.nan
+        if self.n >= w:
+            np.subtract(arr[w:], arr[:-w], out=out[w-1:])
+        return out
+
+    def _mask(self, out: np.ndarray, w: int) -> np.ndarray:
+        if self.has_nan:
+            out[self._window(self.nans, w) != 0] = np.nan
+        return out
+
+    def mean(self, w: int) -> np.ndarray:
+        out = self._window(self.s1, w)
+        out /= w
+        out += self.offset
+        return self._mask(out, w)
+
+    def std(self, w: int) -> np.ndarray:
+        s1, s2 = self._window(self.s1, w), self._window(self.s2, w)
+        s1 *= s1
+        s1 /= w
+        s2 -= s1
+        s2 /= w - 1
+        np.maximum(s2, 0.0, out=s2)
+        return self._mask(np.sqrt(s2, out=s2), w)
+
+
+FEATURE_COLUMNS = (
+    ['return_1', 'log_return_1', 'return_5']
+    + [f'lag_{l}' for l in LAGS]
+    + [c for w in ROLLS for c in (f'roll_mean_{w}', f'roll_std_{w}')]
+    + ['rsi', 'macd', 'macd_signal', 'macd_hist', 'bb_mid', 'bb_upper', 'bb_lower', 'dayofweek', 'month']
+)
+
+
+def build_features_matrix(df: pd.DataFrame, dtype=np.float32) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """Vectorized build_features: (matrix, column names, dates).
+
+    All numeric input columns followed by FEATURE_COLUMNS are written into one preallocated
+    (rows, columns) array of `dtype`; intermediate maths runs in float64. Rolling windows share
+    one set of prefix sums (_WindowSums), so roll_*_20 and the Bollinger band reuse the same
+    mean/std. Rows are sorted by date afterwards, as in build_features.
+    """
+    raw_cols = [c for c in df.columns if c != 'date']
+    for c in raw_cols:
+        if not pd.api.types.is_numeric_dtype(df[c]):
+            raise TypeError(f"numpy feature engine needs numeric input columns, got {c!r} ({df[c].dtype})")
+    dates = pd.to_datetime(df['date']).to_numpy()
+    close = df['close'].to_numpy(dtype=np.float64)
+    columns = raw_cols + FEATURE_COLUMNS
+    # column-major: each feature is written contiguously and pandas can wrap it as one block
+    out = np.empty((len(df), len(columns)), dtype=dtype, order='F')
+    col = {name: i for i, name in enumerate(columns)}
+
+    for c in raw_cols:
+        out[:, col[c]] = df[c].to_numpy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prev = _shift(close, 1)
+        ret1 = close / prev - 1
+        out[:, col['return_1']] = ret1
+        out[:, col['log_return_1']] = np.log1p(ret1)
+        out[:, col['return_5']] = close / _shift(close, 5) - 1
+        for l in LAGS:
+            out[:, col[f'lag_{l}']] = _shift(close, l)
+
+        sums = _WindowSums(close)
+        stats = {w: (sums.mean(w), sums.std(w)) for w in set(ROLLS) | {20}}
+        for w in ROLLS:
+            out[:, col[f'roll_mean_{w}']], out[:, col[f'roll_std_{w}']] = stats[w]
+
+        # RSI (14): NaN diffs count as 0 gain / 0 loss, like delta.where(...) in add_rsi
+        delta = close - prev
+        gain = _WindowSums(np.where(delta > 0, delta, 0.0)).mean(14)
+        loss = _WindowSums(np.where(delta < 0, -delta, 0.0)).mean(14)
+        out[:, col['rsi']] = 100 - (100 / (1 + gain / loss))
+
+    # EMA recursions are inherently sequential; pandas' ewm runs them in compiled code
+    ema_fast = pd.Series(close).ewm(span=12, adjust=False).mean().to_numpy()
+    ema_slow = pd.Series(close).ewm(span=26, adjust=False).mean().to_numpy()
+    macd = ema_fast - ema_slow
+    signal = pd.Series(macd).ewm(span=9, adjust=False).mean().to_numpy()
+    out[:, col['macd']] = macd
+    out[:, col['macd_signal']] = signal
+    out[:, col['macd_hist']] = macd - signal
+
+    mid, std = stats[20]
+    out[:, col['bb_mid']] = mid
+    out[:, col['bb_upper']] = mid + 2.0 * std
+    out[:, col['bb_lower']] = mid - 2.0 * std
+
+    idx = pd.DatetimeIndex(dates)
+    out[:, col['dayofweek']] = idx.dayofweek
+    out[:, col['month']] = idx.month
+
+    if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+        order = np.argsort(dates, kind='stable')
+        out, dates = out[order], dates[order]
+    return out, columns, dates
+
+
 def feature_target(df: pd.DataFrame, horizon: int = 1) -> tuple[pd.DataFrame, pd.Series]:
     # target: close shifted -horizon forward (predict future close)
     df['target'] = df['close'].shift(-horizon)
@@ -91,4 +230,4 @@ def feature_target(df: pd.DataFrame, horizon: int = 1) -> tuple[pd.DataFrame, pd
     y = y.iloc[:-horizon]
     return X, y
 
-__all__ = ['build_features','feature_target']
+__all__ = ['build_features','build_features_matrix','feature_target','FEATURE_COLUMNS']
@@ -0,0 +1,185 @@
+"""Incremental (online) version of feature_engineering.build_features for inference.
+
+Serving only needs the features of the latest bar. Instead of rebuilding every indicator over
+~3 years of history per request, OnlineFeatureState keeps a bounded tail of closes (enough for the
+longest lag / rolling window) plus the running EMA values behind MACD, and advances in O(1) per
+new bar. features() returns the same columns and values build_features would produce for the
+last row (parity is covered by tests/test_online_features.py).
+"""
+from __future__ import annotations
+from collections import deque
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from backend.feature_engineering import LAGS, ROLLS
+
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_WINDOW, BB_K = 20, 2.0
+# closes needed to compute every lag / rolling window / RSI diff for the newest bar
+WINDOW = max(max(LAGS) + 1, max(ROLLS), RSI_WINDOW + 1)
+
+
+def _alpha(span: int) -> float:
+    return 2.0 / (span + 1.0)
+
+
+def _rolling(c: np.ndarray, w: int) -> tuple[float, float]:
+    # (mean, sample std) of the last w closes, NaN until w closes exist
+    if len(c) < w:
+        return math.nan, math.nan
+    tail = c[-w:]
+    return float(tail.mean()), float(tail.std(ddof=1))
+
+
+class OnlineFeatureState:
+    """Bounded per-ticker feature state; update() one bar at a time, features() for the latest."""
+
+    def __init__(self):
+        self.closes: deque = deque(maxlen=WINDOW)
+        self.count = 0
+        self.last_bar: dict | None = None
+        self.ema_fast = self.ema_slow = self.ema_signal = None
+
+    @property
+    def last_date(self):
+        return None if self.last_bar is None else self.last_bar['date']
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'OnlineFeatureState':
+        """Seed the state from full history in one vectorized pass (EMAs need the whole series)."""
+        state = cls()
+        if df.empty:
+            return state
+        df = df.sort_values('date', kind='stable').reset_index(drop=True)  # as build_features does
+        close = df['close'].astype(float)
+        ema_fast = close.ewm(span=MACD_FAST, adjust=False).mean()
+        ema_slow = close.ewm(span=MACD_SLOW, adjust=False).mean()
+        signal = (ema_fast - ema_slow).ewm(span=MACD_SIGNAL, adjust=False).mean()
+        state.ema_fast, state.ema_slow = float(ema_fast.iloc[-1]), float(ema_slow.iloc[-1])
+        state.ema_signal = float(signal.iloc[-1])
+        state.closes.extend(close.iloc[-WINDOW:].tolist())
+        state.count = len(df)
+        state.last_bar = df.iloc[-1].to_dict()
+        state.last_bar['date'] = pd.Timestamp(state.last_bar['date'])
+        return state
+
+    def update(self, bar: dict):
+        """Advance by one bar (mapping with 'date', 'close' and any other raw columns)."""
+        close = float(bar['close'])
+        if self.count == 0:
+            self.ema_fast = self.ema_slow = close
+            self.ema_signal = 0.0
+        else:
+            a = _alpha(MACD_FAST)
+            self.ema_fast = (1 - a) * self.ema_fast + a * close
+            a = _alpha(MACD_SLOW)
+            self.ema_slow = (1 - a) * self.ema_slow + a * close
+            a = _alpha(MACD_SIGNAL)
+            self.ema_signal = (1 - a) * self.ema_signal + a * (self.ema_fast - self.ema_slow)
+        self.closes.append(close)
+        self.count += 1
+        self.last_bar = dict(bar)
+        self.last_bar['date'] = pd.Timestamp(bar['date'])
+
+    def features(self) -> dict:
+        """Raw columns of the last bar plus every build_features column, same names/order."""
+        if self.last_bar is None:
+            raise ValueError('No bars seen yet')
+        c = np.fromiter(self.closes, dtype=float)
+        n = len(c)
+        nan = math.nan
+        last = c[-1]
+        out = dict(self.last_bar)
+
+        ret1 = last / c[-2] - 1 if n >= 2 else nan
+        out['return_1'] = ret1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['log_return_1'] = float(np.log1p(ret1))
+        out['return_5'] = last / c[-6] - 1 if n >= 6 else nan
+        for l in LAGS:
+            out[f'lag_{l}'] = c[-1 - l] if n > l else nan
+
+        stats = {w: _rolling(c, w) for w in set(ROLLS) | {BB_WINDOW}}
+        for w in ROLLS:
+            out[f'roll_mean_{w}'], out[f'roll_std_{w}'] = stats[w]
+
+        # RSI: pandas' first diff is NaN and counts as 0 in both gain & loss
+        if self.count > RSI_WINDOW - 1:
+            diffs = np.diff(c[-(RSI_WINDOW + 1):])
+            if self.count == RSI_WINDOW:
+                diffs = np.concatenate([[0.0], diffs])
+            gain = np.where(diffs > 0, diffs, 0.0).mean()
+            loss = np.where(diffs < 0, -diffs, 0.0).mean()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = np.float64(gain) / np.float64(loss)
+                out['rsi'] = float(100 - (100 / (1 + rs)))
+        else:
+            out['rsi'] = nan
+
+        macd = self.ema_fast - self.ema_slow
+        out['macd'] = macd
+        out['macd_signal'] = self.ema_signal
+        out['macd_hist'] = macd - self.ema_signal
+
+        mid, std = stats[BB_WINDOW]
+        out['bb_mid'] = mid
+        out['bb_upper'] = mid + BB_K * std
+        out['bb_lower'] = mid - BB_K * std
+
+        date = self.last_bar['date']
+        out['dayofweek'] = date.dayofweek
+        out['month'] = date.month
+        return out
+
+
+class OnlineFeatureStore:
+    """Per-ticker OnlineFeatureState cache used by the prediction service.
+
+    latest(ticker, df) advances the stored state with the bars of df newer than it has seen;
+    if df does not extend the stored history (revised data, gap, unsorted) it reseeds from df.
+    """
+
+    def __init__(self):
+        self._states: dict[str, OnlineFeatureState] = {}
+        self._lock = threading.Lock()
+
+    def latest(self, ticker: str, df: pd.DataFrame) -> dict:
+        dates = pd.to_datetime(df['date'])
+        with self._lock:
+            state = self._states.get(ticker)
+            start = self._continuation(state, df, dates)
+            if start is None:
+                state = OnlineFeatureState.from_frame(df.assign(date=dates))
+            else:
+                for bar in df.iloc[start:].assign(date=dates.iloc[start:]).to_dict('records'):
+                    state.update(bar)
+            self._states[ticker] = state
+            return state.features()
+
+    @staticmethod
+    def _continuation(state: OnlineFeatureState | None, df: pd.DataFrame, dates: pd.Series) -> int | None:
+        """Index of the first bar of df the state has not seen, or None if it must reseed."""
+        if state is None or state.last_bar is None or not dates.is_monotonic_increasing:
+            return None
+        pos = int(dates.searchsorted(state.last_date))
+        if pos >= len(df) or dates.iloc[pos] != state.last_date:
+            return None
+        if float(df['close'].iloc[pos]) != float(state.last_bar['close']):
+            return None
+        return pos + 1
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+def latest_features(df: pd.DataFrame) -> dict:
+    """One-shot equivalent of build_features(df).iloc[-1] (no stored state)."""
+    return OnlineFeatureState.from_frame(df).features()
+
+
+__all__ = ['OnlineFeatureState', 'OnlineFeatureStore', 'latest_features', 'WINDOW']
@@ -8,7 +8,8 @@ POST /api/predict
 {
   "ticker": "AAPL",
   "horizon": 30,
-  "recent": 200  # number of recent historical rows to return
+  "recent": 200,  # number of recent historical rows to return
+  "format": "records"  # or "columnar"
 }
 Response:
 {
@@ -19,18 +20,26 @@ Response:
   ],
   "metrics": {"step_1": {"q10_mae": ..}, ...}
 }
+With "format": "columnar", historical and predictions are column objects instead:
+  "historical": {"date": ["2024-09-01", ...], "close": [123.4, ...]},
+  "predictions": {"date": [...], "p10": [...], "p50": [...], "p90": [...]}
 """
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
+import hmac
 import os
+import time
+from typing import Literal
 
+import numpy as np
 import pandas as pd
-import joblib  # retained only if future per-call loading needed (can be removed later)
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Depends, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-import yfinance as yf
 
 import sys
 if __package__ is None and __name__ != "backend.predict_service":
@@ -43,11 +52,85 @@ if __package__ is None and __name__ != "backend.predict_service":
         sys.path.append(str(backend_dir))
 
 from backend.feature_engineering import build_features
-from backend.utils.model_loader import load_models, load_metadata
+from backend.online_features import OnlineFeatureStore
+from backend.utils.model_loader import (load_models, load_metadata, current_version, model_root, list_versions,
+                                       loaded_bundles, model_cache_stats)
+from backend.utils.cache import LRUCache
+from backend.utils import price_store
+from backend.utils.market_data import MarketDataCache, SyntheticProvider, yfinance_provider, CACHE_DIR
+from backend.utils.executor import BoundedExecutor, ExecutorBusy
+from backend.utils.warmup import ModelWarmup, parse_targets
+from backend.utils.metrics import StageMetrics
+from backend.utils.profiling import run_profiled, parse_modes
+from backend.utils.fastjson import JSONBytesResponse, dumps
 
 MODELS_DIR = Path(__file__).parent / 'models'
+# 'lightgbm' (Booster.predict) or 'compiled' (array-based evaluator, see utils/tree_engine.py)
+MODEL_ENGINE = os.getenv('MODEL_ENGINE', 'lightgbm')
+# 'online' keeps per-ticker incremental feature state (backend/online_features.py); 'pandas' rebuilds
+# every indicator over the full history per request; 'numpy' does that with the float32 matrix engine.
+# A model whose metadata records its training feature_engine is always served with that engine's
+# values (online rows are rounded to float32 for 'numpy' models); this only decides for older models.
+FEATURE_ENGINE = os.getenv('FEATURE_ENGINE', 'online')
+ONLINE_FEATURES = OnlineFeatureStore()
 
-app = FastAPI(title='Stock Forecast API', version='0.1.0')
+# Full forecasts keyed by (ticker, horizon, last-bar fingerprint, model version)
+FORECAST_CACHE = LRUCache(
+    maxsize=int(os.getenv('FORECAST_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('FORECAST_CACHE_TTL', '300')) or None,
+)
+
+# Blocking forecast work (download, features, inference) runs here, never on the event loop
+FORECAST_POOL = BoundedExecutor(
+    kind=os.getenv('FORECAST_EXECUTOR', 'thread'),
+    max_workers=int(os.getenv('FORECAST_WORKERS', '0')) or None,
+    max_queue=int(os.getenv('FORECAST_MAX_QUEUE', '64')),
+    timeout=float(os.getenv('FORECAST_TIMEOUT', '30')) or None,
+)
+
+# Market data (outside OFFLINE_MODE): memory + on-disk TTL cache in front of yfinance, stale copies
+# are served while a background refresh runs. MARKET_DATA_PROVIDER=synthetic avoids the network.
+MARKET_DATA = MarketDataCache(
+    provider=SyntheticProvider() if os.getenv('MARKET_DATA_PROVIDER', 'yfinance') == 'synthetic' else yfinance_provider,
+    ttl=float(os.getenv('MARKET_DATA_TTL', '3600')),
+    max_stale=float(os.getenv('MARKET_DATA_MAX_STALE', '86400')),
+    cache_dir=CACHE_DIR if os.getenv('MARKET_DATA_DISK', '1') not in ('0', 'false', 'no') else None,
+    memory_entries=int(os.getenv('MARKET_DATA_MEMORY_TICKERS', '256')) or None,
+)
+
+# Per-stage latency histograms labeled by ticker and served horizon, scraped from /metrics
+METRICS = StageMetrics(enabled=os.getenv('METRICS_ENABLED', '1') not in ('0', 'false', 'no'))
+
+# /api/predict/stream: prediction steps per model round trip and historical rows per event
+STREAM_CHUNK_STEPS = int(os.getenv('STREAM_CHUNK_STEPS', '30'))
+STREAM_CHUNK_ROWS = int(os.getenv('STREAM_CHUNK_ROWS', '500'))
+
+# Per-request profiling (?profile= / X-Profile on /api/predict): 'admin' needs the admin token
+# (and is rejected while ADMIN_TOKEN is unset), 'on' allows anyone, 'off' rejects it
+PROFILING = os.getenv('PROFILING', 'admin')
+
+# Startup warm-up: 'all' (every ticker under models/), 'none', or a hot list like 'AAPL,MSFT:30'.
+# Bundles are loaded and test-predicted on a background thread; /ready reports progress.
+PRELOAD_MODELS = os.getenv('PRELOAD_MODELS', 'all')
+WARMUP: ModelWarmup | None = None
+
+
+def start_warmup(spec: str = PRELOAD_MODELS) -> ModelWarmup:
+    global WARMUP
+    WARMUP = ModelWarmup(parse_targets(spec, MODELS_DIR), engine=MODEL_ENGINE).start()
+    return WARMUP
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_warmup()
+    yield
+    WARMUP.stop(timeout=5)
+    FORECAST_POOL.shutdown()
+    MARKET_DATA.shutdown()
+
+
+app = FastAPI(title='Stock Forecast API', version='0.1.0', lifespan=lifespan)
 
 # Permissive CORS (adjust in production)
 app.add_middleware(
@@ -58,41 +141,38 @@ app.add_middleware(
     allow_headers=['*']
 )
 
+MAX_RECENT = 2000
+
 class PredictRequest(BaseModel):
     ticker: str
     horizon: int = Field(30, ge=1, le=365, description='Forecast horizon (business days)')
-    recent: int = Field(200, ge=50, le=2000, description='Recent historical rows to return')
+    recent: int = Field(200, ge=50, le=MAX_RECENT, description='Recent historical rows to return')
+    format: Literal['records', 'columnar'] = Field(
+        'records', description="'columnar': historical/predictions as {column: [values...]} instead of row objects")
+
+
+MAX_BATCH = int(os.getenv('PREDICT_BATCH_MAX', '100'))
+
+class BatchPredictRequest(BaseModel):
+    items: list[PredictRequest] = Field(..., min_length=1, max_length=MAX_BATCH)
 
 
 def download_latest(ticker: str):
     offline_mode = os.getenv('OFFLINE_MODE', '0') in ('1','true','TRUE','yes','YES')
     if offline_mode:
-        # Use local CSV if exists
-        csv_path = Path(__file__).parent / 'data' / f'{ticker.upper()}.csv'
-        if csv_path.exists():
-            df = pd.read_csv(csv_path, parse_dates=['date'])
+        # Use the local price store (legacy data/{TICKER}.csv is migrated on first read)
+        df = price_store.load_prices(ticker)
+        if df is not None:
             return df
     try:
-        df = yf.download(ticker, period='3y', auto_adjust=True, progress=False)
-        if df.empty:
-            raise ValueError('empty download')
-        df.reset_index(inplace=True)
-        df.rename(columns={c: c.lower() for c in df.columns}, inplace=True)
-        keep = [c for c in ['date','open','high','low','close','adj close','volume'] if c in df.columns]
-        df = df[keep]
-        if 'adj close' in df.columns and 'close' in df.columns:
-            df['close'] = df['adj close']
-            df.drop(columns=['adj close'], inplace=True)
-        return df
+        return MARKET_DATA.get(ticker)
     except Exception:
-        # fallback to local CSV or synthetic minimal stub
-        csv_path = Path(__file__).parent / 'data' / f'{ticker.upper()}.csv'
-        if csv_path.exists():
-            df = pd.read_csv(csv_path, parse_dates=['date'])
+        # fallback to the local price store or synthetic minimal stub
+        df = price_store.load_prices(ticker)
+        if df is not None:
             return df
         # synthetic small dataset (last resort)
         dates = pd.date_range(end=pd.Timestamp.today(), periods=120, freq='B')
-        import numpy as np
         base = 100 + np.cumsum(np.random.normal(0, 1, size=len(dates))) * 0.3
         df = pd.DataFrame({
             'date': dates,
@@ -105,85 +185,452 @@ def download_latest(ticker: str):
         return df
 
 
-def forecast(ticker: str, horizon: int, recent: int):
-    t = ticker.upper()
-    meta = load_metadata(t)
+def resolve_horizon(meta: dict, horizon: int) -> tuple[int | None, str | None]:
+    """Map a requested horizon onto a trained one -> (horizon to load, fallback note).
+
+    Legacy single-horizon metadata returns None as the load horizon (load_models default).
+    """
+    if meta.get('layout') == 'shared':
+        # one trained step set serves every horizon up to its length exactly
+        max_step = max(meta['horizons'])
+        if horizon <= max_step:
+            return horizon, None
+        return max_step, f"Requested horizon {horizon} exceeds trained steps; using {max_step}"
     # multi-horizon aware
     if 'horizons' in meta:
         horizons = meta['horizons']
-        chosen_h = horizon
-        horizon_note = None
-        if horizon not in horizons:
-            # graceful fallback: pick closest larger; if none larger, pick max
-            larger = [h for h in horizons if h >= horizon]
-            if larger:
-                chosen_h = min(larger)
-            else:
-                chosen_h = max(horizons)
-            horizon_note = f"Requested horizon {horizon} not available; using {chosen_h} from {horizons}"
-        metrics_root = meta.get('metrics', {}).get(f'H{chosen_h}', {})
-        bundle = load_models(t, horizon=chosen_h)
-        feature_cols = meta['feature_cols']
-    else:
-        if horizon != meta['horizon']:
-            horizon_note = f"Model trained only for horizon {meta['horizon']}; overriding request {horizon}"
-        else:
-            horizon_note = None
-        metrics_root = meta.get('metrics', {})
-        bundle = load_models(t)
-        feature_cols = meta['feature_cols']
+        if horizon in horizons:
+            return horizon, None
+        # graceful fallback: pick closest larger; if none larger, pick max
+        larger = [h for h in horizons if h >= horizon]
+        chosen_h = min(larger) if larger else max(horizons)
+        return chosen_h, f"Requested horizon {horizon} not available; using {chosen_h} from {horizons}"
+    if horizon != meta['horizon']:
+        return None, f"Model trained only for horizon {meta['horizon']}; overriding request {horizon}"
+    return None, None
+
+
+def horizon_metrics(meta: dict, horizon: int) -> dict:
+    """Validation metrics of the models serving `horizon` (step_1..step_H)."""
+    metrics = meta.get('metrics', {})
+    if 'horizons' not in meta:
+        return metrics
+    if f'H{horizon}' in metrics or meta.get('layout') != 'shared':
+        return metrics.get(f'H{horizon}', {})
+    # shared steps: any horizon is a prefix of the longest one
+    longest = metrics.get(f'H{max(meta["horizons"])}', {})
+    return {f'step_{s}': longest[f'step_{s}'] for s in range(1, horizon+1) if f'step_{s}' in longest}
+
+
+def _bar_fingerprint(df: pd.DataFrame) -> tuple:
+    """Identifies the input data: row count + every field of the last bar."""
+    return (len(df),) + tuple(str(v) for v in df.iloc[-1].tolist())
 
-    df = download_latest(t)
-    df_feat = build_features(df).dropna().reset_index(drop=True)
+
+def _model_version(ticker: str, meta: dict, version: str | None = None) -> tuple:
+    version = version or current_version(ticker)
+    try:
+        mtime = (model_root(ticker, version) / 'metadata.json').stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    return version, meta.get('trained_at'), mtime
+
+
+def _feature_engine(meta: dict) -> str:
+    """build_features engine the model was trained with; FEATURE_ENGINE for models that predate the record."""
+    return meta.get('feature_engine') or ('numpy' if FEATURE_ENGINE == 'numpy' else 'pandas')
+
+
+def _latest_features(t: str, df: pd.DataFrame, meta: dict) -> tuple[np.ndarray, pd.Timestamp]:
+    """Feature vector + date of the newest complete bar, in the model's training precision."""
+    feature_cols = meta['feature_cols']
+    engine = _feature_engine(meta)
+    dtype = np.float32 if engine == 'numpy' else np.float64
+    if FEATURE_ENGINE == 'online':
+        row = ONLINE_FEATURES.latest(t, df)
+        X_last = np.array([row[c] for c in feature_cols], dtype=float)
+        if not np.isnan(X_last).any():
+            # the numpy engine also computes in float64 and stores float32: round the same way
+            return X_last.astype(dtype), pd.to_datetime(row['date'])
+        # incomplete newest bar: fall through to the full build, which drops NaN rows
+    df_feat = build_features(df, engine=engine).dropna().reset_index(drop=True)
+    latest_feat_row = df_feat.iloc[-1]
+    return latest_feat_row[feature_cols].to_numpy(dtype=dtype), pd.to_datetime(latest_feat_row['date'])
+
+
+def _compute_forecast(t: str, meta: dict, model_horizon: int | None, df: pd.DataFrame) -> dict:
+    """Full (cacheable) forecast: MAX_RECENT historical rows, no request-specific note."""
+    h = model_horizon or meta.get('horizon')
+    with METRICS.stage('load_models', t, h):
+        bundle = load_models(t, horizon=model_horizon, engine=MODEL_ENGINE)
+    metrics_root = horizon_metrics(meta, bundle.horizon)
 
     # We'll need the last full feature row as base for iterative approach is not required
     # since we trained direct step models: we just reuse the same last feature vector.
     # If you want step-dependent re-feature engineering, you'd need a recursive approach.
+    with METRICS.stage('features', t, h):
+        X_last, last_date = _latest_features(t, df, meta)
 
-    latest_feat_row = df_feat.iloc[-1]
-    X_last = latest_feat_row[feature_cols].values.reshape(1, -1)
-
-    preds = []
-    last_date = pd.to_datetime(df_feat.iloc[-1]['date'])
-    for step in range(1, bundle.horizon+1):
-        step_record = {'date': (last_date + pd.tseries.offsets.BDay(step)).date().isoformat()}
-        for q in meta['quantiles']:
-            val = bundle.predict_step_quantile(step, q, X_last)
-            step_record[f'p{int(q*100)}'] = val
-        preds.append(step_record)
-
-    hist = df[['date','close']].tail(recent)
-    hist['date'] = pd.to_datetime(hist['date']).dt.date.astype(str)
-    historical = hist.to_dict(orient='records')
-
-    resp = {
+    # one pass over every step/quantile model -> (steps, quantiles)
+    with METRICS.stage('predict', t, h):
+        q_matrix = bundle.predict_all(X_last)
+    with METRICS.stage('serialize', t, h):
+        preds, historical = _columns(meta, bundle.horizon, q_matrix, last_date, df)
+
+    return {
         'ticker': t,
         'horizon': bundle.horizon,
         'historical': historical,
         'predictions': preds,
         'metrics': metrics_root
     }
-    if 'horizons' in meta and horizon not in meta['horizons']:
-        resp['note'] = horizon_note
-    if 'horizons' not in meta and horizon != meta.get('horizon'):
+
+
+def _iso_dates(dates) -> list[str]:
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return np.datetime_as_string(dates.to_numpy().astype('datetime64[D]')).tolist()
+
+
+def _step_dates(last_date: pd.Timestamp, horizon: int) -> list[str]:
+    return _iso_dates(pd.bdate_range(start=last_date + pd.tseries.offsets.BDay(1), periods=horizon))
+
+
+def _frozen(columns: dict) -> dict:
+    for values in columns.values():
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return columns
+
+
+def _prediction_columns(quantiles: list[float], q_matrix: np.ndarray, dates: list[str]) -> dict:
+    preds = {'date': dates}
+    for q, values in zip(quantiles, np.array(q_matrix, dtype=np.float64).T.copy()):
+        preds[f'p{int(q*100)}'] = values
+    return _frozen(preds)
+
+
+def _historical_columns(df: pd.DataFrame) -> dict:
+    hist = df[['date','close']].tail(MAX_RECENT)
+    return _frozen({'date': _iso_dates(hist['date']),
+                    'close': hist['close'].to_numpy(dtype=np.float64, copy=True)})
+
+
+def _columns(meta: dict, horizon: int, q_matrix: np.ndarray, last_date: pd.Timestamp,
+             df: pd.DataFrame) -> tuple[dict, dict]:
+    """Prediction columns (date + one per quantile) and the MAX_RECENT historical date/close columns.
+
+    Values stay contiguous read-only float64 arrays (shared by every cached response), so the
+    encoder can write them without a per-value Python walk; _records() builds row objects.
+    """
+    preds = _prediction_columns(meta['quantiles'], q_matrix, _step_dates(last_date, horizon))
+    return preds, _historical_columns(df)
+
+
+def _records(columns: dict) -> list[dict]:
+    keys = list(columns)
+    values = [v.tolist() if isinstance(v, np.ndarray) else v for v in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+def _prepare(ticker: str, horizon: int):
+    """Metadata, served horizon, latest bars and forecast cache key -> (t, meta, model_horizon, note, h, df, key)."""
+    t = ticker.upper()
+    start = time.perf_counter()
+    meta = load_metadata(t)
+    model_horizon, horizon_note = resolve_horizon(meta, horizon)
+    h = model_horizon or meta.get('horizon')
+    METRICS.observe('load_metadata', time.perf_counter() - start, t, h)
+    with METRICS.stage('download', t, h):
+        df = download_latest(t)
+    # identical data + identical model -> identical forecast; `recent` is applied on the way out
+    key = (t, h, _bar_fingerprint(df), _model_version(t, meta))
+    return t, meta, model_horizon, horizon_note, h, df, key
+
+
+def forecast(ticker: str, horizon: int, recent: int, use_cache: bool = True, fmt: str = 'records'):
+    """Forecast payload; fmt='columnar' returns historical/predictions as {column: values}."""
+    start = time.perf_counter()
+    t, meta, model_horizon, horizon_note, h, df, key = _prepare(ticker, horizon)
+    full = FORECAST_CACHE.get(key) if use_cache else None
+    METRICS.inc('cache', result='miss' if full is None else 'hit', ticker=t, horizon=h)
+    if full is None:
+        full = _compute_forecast(t, meta, model_horizon, df)
+        FORECAST_CACHE.put(key, full)
+
+    resp = dict(full)
+    historical = {k: v[-recent:] for k, v in full['historical'].items()}
+    if fmt == 'columnar':
+        resp['historical'] = historical
+    else:
+        resp['historical'] = _records(historical)
+        resp['predictions'] = _records(full['predictions'])
+    if horizon_note:
         resp['note'] = horizon_note
+    METRICS.observe('total', time.perf_counter() - start, t, h)
     return resp
 
+def profiled_forecast(ticker: str, horizon: int, recent: int, modes: frozenset[str], fmt: str = 'records'):
+    """forecast() computed afresh (no cache read) with a 'timings' block and optional 'profile'."""
+    resp, report = run_profiled(forecast, (ticker, horizon, recent, False, fmt), modes, METRICS)
+    resp['timings'] = report.pop('timings')
+    if report:
+        resp['profile'] = report
+    return resp
+
+def stream_start(ticker: str, horizon: int) -> dict:
+    """Everything /api/predict/stream sends before the first model call (runs on FORECAST_POOL).
+
+    A cached forecast comes back whole in 'full'. Otherwise: the historical columns, the feature
+    vector and the step dates, none of which grows with the horizon, plus the model 'version'
+    that every stream_steps call and the cache key use, so a version published mid-stream
+    never mixes into (or gets cached as) this forecast.
+    """
+    t, meta, model_horizon, horizon_note, h, df, key = _prepare(ticker, horizon)
+    full = FORECAST_CACHE.get(key)
+    METRICS.inc('cache', result='miss' if full is None else 'hit', ticker=t, horizon=h)
+    if full is None:
+        with METRICS.stage('load_models', t, h):
+            bundle = load_models(t, horizon=model_horizon, engine=MODEL_ENGINE)
+        meta = bundle.metadata  # the version actually loaded, even if one was published since _prepare
+        key = key[:3] + (_model_version(t, meta, bundle.version),)
+    plan = {'ticker': t, 'horizon': h, 'model_horizon': model_horizon, 'note': horizon_note, 'key': key,
+            'quantiles': meta['quantiles'], 'metrics': horizon_metrics(meta, h), 'full': full}
+    if full is None:
+        with METRICS.stage('features', t, h):
+            X_last, last_date = _latest_features(t, df, meta)
+        plan.update(historical=_historical_columns(df), X=X_last, dates=_step_dates(last_date, h),
+                    version=bundle.version)
+    return plan
+
+
+def stream_steps(ticker: str, model_horizon: int | None, version: str | None, X: np.ndarray,
+                 start: int, count: int) -> np.ndarray:
+    """(steps, quantiles) rows from step `start` on: `count` of them, or every remaining step for a
+    compiled bundle (its single vectorized pass covers all steps anyway)."""
+    bundle = load_models(ticker, horizon=model_horizon, engine=MODEL_ENGINE, version=version)
+    stop = bundle.horizon+1 if bundle.compiled is not None else min(start+count, bundle.horizon+1)
+    return bundle.predict_all(X, range(start, stop))
+
+
+def _cache_forecast(key: tuple, full: dict):
+    FORECAST_CACHE.put(key, full)
+
+
+def _ndjson_event(event: str, data: dict) -> bytes:
+    return dumps({'event': event, **data}) + b'\n'
+
+
+def _sse_event(event: str, data: dict) -> bytes:
+    return b'event: ' + event.encode() + b'\ndata: ' + dumps(data) + b'\n\n'
+
+
+def _chunk(columns: dict, start: int, stop: int, fmt: str) -> dict:
+    part = {k: v[start:stop] for k, v in columns.items()}
+    return {'columns': part} if fmt == 'columnar' else {'rows': _records(part)}
+
+
+async def forecast_events(plan: dict, recent: int, fmt: str, encode):
+    """meta, historical rows in STREAM_CHUNK_ROWS chunks, prediction steps as they are computed, end.
+
+    Only one chunk is encoded at a time. A failure after the first byte ends the stream with an
+    'error' event ({'error', 'status'}), since the HTTP status is already sent.
+    """
+    h, full = plan['horizon'], plan['full']
+    head = {'ticker': plan['ticker'], 'horizon': h, 'recent': recent, 'metrics': plan['metrics']}
+    if plan['note']:
+        head['note'] = plan['note']
+    yield encode('meta', head)
+
+    historical = (full or plan)['historical']
+    historical = {k: v[-recent:] for k, v in historical.items()}
+    for i in range(0, len(historical['date']), STREAM_CHUNK_ROWS):
+        yield encode('historical', _chunk(historical, i, i+STREAM_CHUNK_ROWS, fmt))
+
+    if full is not None:
+        preds = full['predictions']
+        for i in range(0, len(preds['date']), STREAM_CHUNK_STEPS):
+            yield encode('predictions', _chunk(preds, i, i+STREAM_CHUNK_STEPS, fmt))
+    else:
+        blocks, step = [], 1
+        while step <= h:
+            try:
+                rows = await FORECAST_POOL.run(stream_steps, plan['ticker'], plan['model_horizon'], plan['version'],
+                                               plan['X'], step, STREAM_CHUNK_STEPS)
+            except Exception as e:
+                err = _forecast_error(e)
+                yield encode('error', {'error': err.detail, 'status': err.status_code})
+                return
+            preds = _prediction_columns(plan['quantiles'], rows, plan['dates'][step-1:step-1+len(rows)])
+            for i in range(0, len(rows), STREAM_CHUNK_STEPS):
+                yield encode('predictions', _chunk(preds, i, i+STREAM_CHUNK_STEPS, fmt))
+            blocks.append(rows)
+            step += len(rows)
+        full = {'ticker': plan['ticker'], 'horizon': h, 'historical': plan['historical'],
+                'predictions': _prediction_columns(plan['quantiles'], np.concatenate(blocks), plan['dates']),
+                'metrics': plan['metrics']}
+        await FORECAST_POOL.run(_cache_forecast, plan['key'], full)
+    yield encode('end', {})
+
+
+def _forecast_error(exc: Exception) -> HTTPException:
+    """HTTP error for an exception raised while running a forecast on FORECAST_POOL."""
+    err = _http_error(exc)
+    METRICS.inc('errors', status=err.status_code)
+    return err
+
+
+def _http_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, HTTPException):
+        return exc
+    if isinstance(exc, ExecutorBusy):
+        return HTTPException(503, 'Forecast queue full – retry later.')
+    if isinstance(exc, asyncio.TimeoutError):
+        return HTTPException(504, 'Forecast timed out.')
+    if isinstance(exc, FileNotFoundError):
+        return HTTPException(404, 'Model not trained for this ticker – train first.')
+    return HTTPException(500, str(exc))
+
+
+def _profile_modes(value: str | None, x_admin_token: str | None) -> frozenset[str]:
+    try:
+        modes = parse_modes(value)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if modes:
+        if PROFILING == 'off':
+            raise HTTPException(403, 'Profiling is disabled')
+        if PROFILING != 'on':
+            if not os.getenv('ADMIN_TOKEN'):  # require_admin is open without a token; profiling is not
+                raise HTTPException(403, 'Profiling requires ADMIN_TOKEN (or PROFILING=on)')
+            require_admin(x_admin_token)
+    return modes
+
+
 @app.post('/api/predict')
-async def predict(req: PredictRequest):
+async def predict(req: PredictRequest, profile: str | None = None,
+                  x_profile: str | None = Header(None), x_admin_token: str | None = Header(None)):
+    modes = _profile_modes(profile or x_profile, x_admin_token)
     try:
-        return forecast(req.ticker, req.horizon, req.recent)
-    except FileNotFoundError:
-        raise HTTPException(404, 'Model not trained for this ticker – train first.')
-    except HTTPException:
-        raise
+        if modes:
+            resp = await FORECAST_POOL.run(profiled_forecast, req.ticker, req.horizon, req.recent, modes, req.format)
+        else:
+            resp = await FORECAST_POOL.run(forecast, req.ticker, req.horizon, req.recent, True, req.format)
     except Exception as e:
-        raise HTTPException(500, str(e))
+        raise _forecast_error(e)
+    return JSONBytesResponse(resp)
+
+@app.post('/api/predict/stream')
+async def predict_stream(req: PredictRequest, accept: str | None = Header(None)):
+    """The /api/predict forecast as a stream of events: NDJSON lines ({"event": ..., ...}), or
+    Server-Sent Events when the client accepts text/event-stream.
+
+    Events: meta, historical (rows, oldest first), predictions (steps, in order), end; error
+    replaces the rest if inference fails mid-stream. Chunks carry 'rows' (records) or 'columns'
+    ("format": "columnar"). Errors before the first byte (unknown ticker, ...) are plain HTTP errors.
+    """
+    try:
+        plan = await FORECAST_POOL.run(stream_start, req.ticker, req.horizon)
+    except Exception as e:
+        raise _forecast_error(e)
+    sse = 'text/event-stream' in (accept or '')
+    return StreamingResponse(forecast_events(plan, req.recent, req.format, _sse_event if sse else _ndjson_event),
+                             media_type='text/event-stream' if sse else 'application/x-ndjson',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.post('/api/predict/batch')
+async def predict_batch(req: BatchPredictRequest):
+    """Forecasts for many (ticker, horizon) pairs in one call, in request order.
+
+    Items run concurrently on FORECAST_POOL (at most max_workers at a time per batch, so one batch
+    cannot fill the shared queue); duplicate (ticker, horizon, recent, format) items are computed once.
+    A failing item yields {'ticker', 'horizon', 'error', 'status'} instead of failing the batch.
+    """
+    gate = asyncio.Semaphore(FORECAST_POOL.max_workers)
+
+    async def run_one(ticker: str, horizon: int, recent: int, fmt: str):
+        async with gate:
+            try:
+                return await FORECAST_POOL.run(forecast, ticker, horizon, recent, True, fmt)
+            except Exception as e:
+                err = _forecast_error(e)
+                return {'ticker': ticker.upper(), 'horizon': horizon, 'error': err.detail, 'status': err.status_code}
+
+    tasks = {}
+    for item in req.items:
+        key = (item.ticker.upper(), item.horizon, item.recent, item.format)
+        if key not in tasks:
+            tasks[key] = asyncio.ensure_future(run_one(*key))
+    done = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    results = [done[(i.ticker.upper(), i.horizon, i.recent, i.format)] for i in req.items]
+    return JSONBytesResponse({'results': results, 'errors': sum('error' in r for r in results)})
 
 @app.get('/health')
 async def health():
     return {'status': 'ok', 'time': datetime.utcnow().isoformat()}
 
+@app.get('/ready')
+async def ready(response: Response):
+    """Readiness (unlike /health, which is liveness): 503 until the startup warm-up has finished."""
+    if WARMUP is None:
+        return {'ready': True, 'warmup': None}
+    status = WARMUP.status()
+    if not WARMUP.ready:
+        response.status_code = 503
+    return {'ready': WARMUP.ready, 'warmup': status}
+
+def _workers_excluded() -> int:
+    """Worker processes whose counters /api/stats and /metrics cannot see (0 for the thread executor).
+
+    With FORECAST_EXECUTOR=process forecasts run in the workers, so their forecast/model/market-data
+    caches and stage timings live there; only the executor and error counters are this process's.
+    """
+    return FORECAST_POOL.max_workers if FORECAST_POOL.kind == 'process' else 0
+
+
+@app.get('/api/stats')
+async def stats():
+    excluded = _workers_excluded()
+    scope = {'executor': FORECAST_POOL.kind, 'workers_excluded': excluded}
+    if excluded:
+        scope['note'] = ('forecast_cache, model_cache and market_data are the API process only; '
+                         'forecasts run in worker processes, whose counters are not included')
+    return {'forecast_cache': FORECAST_CACHE.stats(), 'model_cache': model_cache_stats(),
+            'executor': FORECAST_POOL.stats(), 'market_data': MARKET_DATA.stats(), 'scope': scope}
+
+@app.get('/metrics', response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms, counters and cache/executor gauges."""
+    model_cache, executor = model_cache_stats(), FORECAST_POOL.stats()
+    gauges = {
+        'forecast_model_cache_bytes': model_cache.get('bytes'),
+        'forecast_model_cache_entries': model_cache['size'],
+        'forecast_result_cache_entries': len(FORECAST_CACHE),
+        'forecast_executor_in_flight': executor['in_flight'],
+        'forecast_executor_queue_depth': executor['queue_depth'],
+        # >0: stage histograms and cache counters miss these worker processes (FORECAST_EXECUTOR=process)
+        'forecast_metrics_workers_excluded': _workers_excluded(),
+    }
+    return PlainTextResponse(METRICS.render(gauges), media_type='text/plain; version=0.0.4')
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    """Admin endpoints need X-Admin-Token == $ADMIN_TOKEN when ADMIN_TOKEN is set."""
+    expected = os.getenv('ADMIN_TOKEN')
+    if expected and not (x_admin_token and hmac.compare_digest(x_admin_token, expected)):
+        raise HTTPException(403, 'Admin token required')
+
+
+@app.get('/api/admin/models', dependencies=[Depends(require_admin)])
+async def admin_models():
+    """Model versions on disk (current pointer, retained versions) and the bundles loaded in memory."""
+    tickers = {}
+    if MODELS_DIR.exists():
+        for tdir in sorted(p for p in MODELS_DIR.iterdir() if p.is_dir()):
+            t = tdir.name.upper()
+            tickers[t] = {'current': current_version(t), 'versions': list_versions(t)}
+    return {'tickers': tickers, 'loaded': loaded_bundles()}
+
 @app.get('/api/models/{ticker}')
 async def model_metadata(ticker: str):
     try:
@@ -201,8 +648,7 @@ async def list_models():
     for tdir in MODELS_DIR.iterdir():
         if not tdir.is_dir():
             continue
-        mfile = tdir / 'metadata.json'
-        if mfile.exists():
+        if (tdir / 'metadata.json').exists() or (tdir / 'CURRENT').exists():
             try:
                 meta = load_metadata(tdir.name.upper())
                 results.append({
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from backend import backtest
+from backend.train_lightgbm import _generate_synthetic, pinball_loss
+from backend.utils import model_loader, price_store
+
+
+def test_score_matches_per_origin_loops():
+    rng = np.random.default_rng(0)
+    quantiles = [0.1, 0.5, 0.9]
+    close = 100 + rng.normal(size=40).cumsum()
+    origins = np.arange(30, 39)
+    actual = backtest.actuals(close, origins, 3)
+    assert actual[0, 2] == close[33] and np.isnan(actual[-1, 1:]).all()
+    pred = actual[..., None] + rng.normal(size=(len(origins), 3, 3)) + np.array([-1.0, 0.0, 1.0])
+    pred = np.nan_to_num(pred)
+    m = backtest.score(pred, actual, quantiles)
+    for s in range(3):
+        ok = ~np.isnan(actual[:, s])
+        assert m['n'][s] == ok.sum()
+        for j, q in enumerate(quantiles):
+            y, p = actual[ok, s], pred[ok, s, j]
+            assert m['mae'][s, j] == pytest.approx(np.mean(np.abs(y - p)))
+            assert m['pinball'][s, j] == pytest.approx(pinball_loss(y, p, q))
+            assert m['hit'][s, j] == pytest.approx(np.mean(y <= p))
+        inside = (actual[ok, s] >= pred[ok, s, 0]) & (actual[ok, s] <= pred[ok, s, 2])
+        assert m['coverage'][s] == pytest.approx(inside.mean())
+    summary, steps = backtest.summarize(m, quantiles)
+    assert summary['scored'] == m['n'].sum() and set(steps['step_3']) >= {'n', 'coverage', 'q90_pinball'}
+
+
+def test_walk_forward_blocks_only_see_known_targets(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_loader, 'MODELS_DIR', tmp_path / 'models')
+    monkeypatch.setattr(price_store, 'STORE_DIR', tmp_path / 'store')
+    price_store.write('WFB', _generate_synthetic('WFB', rows=420))
+    ctx = backtest._setup('WFB', 2, None, None, walk_forward=True, min_train_rows=100)
+    tasks = backtest._walk_forward_tasks(ctx, 100, {}, 5)
+    for task, i in zip(tasks, range(0, len(ctx['origins']), 100)):
+        first = ctx['origins'][i]
+        assert len(task[0]) == len(task[1]) == first + 1  # nothing after the block's first origin
+    assert ctx['origins'][0] == 101
+
+    (report,) = backtest.run(['WFB'], 2, retrain_every=100, rounds=5, min_train_rows=100)
+    assert report['mode'] == 'walk_forward' and report['folds'] == len(tasks)
+    assert report['origins'] == len(ctx['origins']) and report['steps']['step_2']['n'] == report['origins'] - 1
+    assert 0 <= report['summary']['coverage'] <= 1
+    assert backtest.run(['NOPE'])[0]['ticker'] == 'NOPE'  # no models: an error entry, not an exception
@@ -0,0 +1,21 @@
+from unittest.mock import patch
+
+from backend.utils.cache import LRUCache
+
+
+def test_lru_cache_ttl_and_eviction():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.put('a', 1); cache.put('b', 2); cache.get('a'); cache.put('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.evictions == 1
+    cache.discard('c'); cache.discard('missing')
+    assert cache.get('c') is None and len(cache) == 1 and cache.evictions == 1
+    with patch('backend.utils.cache.time.monotonic', return_value=10**9):
+        assert cache.get('a') is None
+
+
+def test_lru_cache_bounded_by_bytes():
+    sized = LRUCache(maxsize=None, maxbytes=10, sizeof=len)
+    sized.put('a', 'xxxx'); sized.put('b', 'yyyy'); sized.put('c', 'zzzz')
+    assert sized.get('a') is None and sized.bytes == 8 and sized.evicted_bytes == 4
+    sized.put('big', 'w' * 50)  # an oversized entry is kept alone
+    assert len(sized) == 1 and sized.stats()['bytes'] == 50
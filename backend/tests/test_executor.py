@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.utils.executor import BoundedExecutor, ExecutorBusy
+
+
+def test_rejects_when_queue_full_and_reports_depth():
+    pool = BoundedExecutor(max_workers=1, max_queue=1, timeout=5)
+    gate = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(gate.wait))
+        second = asyncio.ensure_future(pool.run(lambda: 'queued'))
+        await asyncio.sleep(0.05)
+        assert pool.stats()['in_flight'] == 1 and pool.stats()['queue_depth'] == 1
+        with pytest.raises(ExecutorBusy):
+            await pool.run(lambda: None)
+        gate.set()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == (True, 'queued')
+    assert pool.stats()['rejected'] == 1
+    pool.shutdown()
+
+
+def test_timeout_keeps_counting_until_work_finishes():
+    pool = BoundedExecutor(max_workers=1, max_queue=0, timeout=0.05)
+    gate = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(gate.wait)
+        assert pool.in_flight == 1
+        gate.set()
+        await asyncio.sleep(0.05)
+        return pool.in_flight
+
+    assert asyncio.run(scenario()) == 0
+    assert pool.stats()['timeouts'] == 1
+    pool.shutdown()
@@ -31,3 +31,17 @@ def test_feature_target_alignment():
     assert len(X) == len(y)
     # ensure horizon shift
     assert y.iloc[0] == feats['close'].iloc[0+5]
+
+def test_numpy_engine_matches_pandas():
+    import numpy as np
+    from backend.generate_sample_data import generate_stock_data
+    df = generate_stock_data('NPENG', days=400)
+    df.loc[200, 'close'] = np.nan  # NaN must poison the same windows
+    expected = build_features(df)
+    got = build_features(df, engine='numpy')
+    assert list(got.columns) == list(expected.columns)
+    assert (got['date'] == expected['date']).all()
+    for col in expected.columns[1:]:
+        assert got[col].dtype == np.float32
+        np.testing.assert_allclose(got[col].to_numpy(float), expected[col].to_numpy(float),
+                                   rtol=1e-5, atol=1e-4, equal_nan=True, err_msg=col)
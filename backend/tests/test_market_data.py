@@ -0,0 +1,70 @@
+import pandas as pd
+
+from backend.utils.market_data import MarketDataCache, SyntheticProvider
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    provider, clock = SyntheticProvider(rows=60, end='2025-06-30'), Clock()
+    cache = MarketDataCache(provider, ttl=60, cache_dir=tmp_path, clock=clock)
+    first = cache.get('aapl')
+    second = cache.get('AAPL')
+    assert provider.calls == {'AAPL': 1}
+    assert second is first and len(first) == 60
+
+    # a fresh process reuses the on-disk copy while it is within the TTL
+    restarted = MarketDataCache(provider, ttl=60, cache_dir=tmp_path, clock=clock)
+    pd.testing.assert_frame_equal(restarted.get('AAPL'), first)
+    assert provider.calls == {'AAPL': 1}
+    assert cache.stats()['misses'] == 1 and cache.stats()['memory_hits'] == 1
+    assert restarted.stats()['disk_hits'] == 1
+
+
+def test_memory_tier_is_bounded_and_falls_back_to_disk(tmp_path):
+    provider, clock = SyntheticProvider(rows=60, end='2025-06-30'), Clock()
+    cache = MarketDataCache(provider, ttl=60, cache_dir=tmp_path, clock=clock, memory_entries=2)
+    first = cache.get('AAA')
+    cache.get('BBB'); cache.get('CCC')  # AAA is the least recently used: dropped from memory
+    assert cache.stats()['tickers'] == 2 and cache.stats()['memory_evictions'] == 1
+    pd.testing.assert_frame_equal(cache.get('AAA'), first)
+    assert provider.calls['AAA'] == 1 and cache.stats()['disk_hits'] == 1
+
+
+def test_stale_while_revalidate(tmp_path):
+    provider, clock = SyntheticProvider(rows=40, end='2025-06-30'), Clock()
+    cache = MarketDataCache(provider, ttl=60, max_stale=3600, cache_dir=None, clock=clock)
+    old = cache.get('MSFT')
+    clock.now += 120
+    provider.end = pd.Timestamp('2025-07-31')
+    assert cache.get('MSFT') is old  # served immediately, refresh runs in the background
+    cache.wait_refreshes(timeout=5)
+    new = cache.get('MSFT')
+    assert new['date'].iloc[-1] == pd.Timestamp('2025-07-31')
+    stats = cache.stats()
+    assert stats['stale_hits'] == 1 and stats['refreshes'] == 1 and provider.calls['MSFT'] == 2
+    cache.shutdown()
+
+
+def test_too_stale_fetches_synchronously_and_failed_refresh_keeps_copy():
+    provider, clock = SyntheticProvider(rows=40, end='2025-06-30'), Clock()
+    cache = MarketDataCache(provider, ttl=60, max_stale=600, cache_dir=None, clock=clock)
+    cache.get('X')
+    clock.now += 1000
+    cache.get('X')
+    assert provider.calls['X'] == 2 and cache.stats()['misses'] == 2
+
+    def broken(ticker):
+        raise ConnectionError('offline')
+    cache.provider = broken
+    clock.now += 120
+    kept = cache.get('X')
+    cache.wait_refreshes(timeout=5)
+    assert cache.get('X') is kept and cache.stats()['refresh_errors'] == 1
+    cache.shutdown()
@@ -0,0 +1,137 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import joblib
+import pytest
+
+from backend.utils import model_loader
+from backend.utils.model_loader import write_packed, PackedModelMap, load_models, load_metadata, PACK_FILE
+
+META = {
+    "ticker": "PACKT",
+    "horizons": [2],
+    "default_horizon": 2,
+    "quantiles": [0.1, 0.5, 0.9],
+    "feature_cols": ["close"],
+    "metrics": {},
+}
+
+
+def _write_ticker(root: Path, packed: bool, pickles: bool):
+    hdir = root / 'PACKT' / 'H2'
+    hdir.mkdir(parents=True)
+    (root / 'PACKT' / 'metadata.json').write_text(json.dumps(META))
+    model_map = {(s, q): {'step': s, 'q': q} for s in (1, 2) for q in (10, 50, 90)}
+    if packed:
+        write_packed(hdir, model_map)
+    if pickles:
+        for (s, q), m in model_map.items():
+            joblib.dump(dict(m, src='pkl'), hdir / f'step_{s}_q{q}.pkl')
+    return model_map
+
+
+def _load(root: Path, **kw):
+    model_loader.clear_caches()
+    with patch.object(model_loader, 'MODELS_DIR', root):
+        return load_models('PACKT', 2, **kw)
+
+
+def test_packed_roundtrip_is_lazy(tmp_path):
+    model_map = _write_ticker(tmp_path, packed=True, pickles=False)
+    packed = PackedModelMap(tmp_path / 'PACKT' / 'H2' / PACK_FILE)
+    assert set(packed) == set(model_map)
+    assert packed.loaded == 0
+    assert packed[(2, 90)] == model_map[(2, 90)]
+    assert packed.loaded == 1
+    assert packed.get((3, 10)) is None
+
+
+def test_load_models_prefers_pack_and_falls_back(tmp_path):
+    _write_ticker(tmp_path, packed=True, pickles=True)
+    assert isinstance(_load(tmp_path).model_map, PackedModelMap)
+    assert _load(tmp_path, artifact='pkl').model_map[(1, 10)]['src'] == 'pkl'
+    (tmp_path / 'PACKT' / 'H2' / PACK_FILE).unlink()
+    assert _load(tmp_path).model_map[(1, 50)]['src'] == 'pkl'
+
+
+def test_shared_layout_serves_any_horizon_from_one_pack(tmp_path):
+    shared = tmp_path / 'SHR' / 'shared'
+    shared.mkdir(parents=True)
+    meta = dict(META, ticker='SHR', horizons=[1, 3], default_horizon=3, layout='shared')
+    (tmp_path / 'SHR' / 'metadata.json').write_text(json.dumps(meta))
+    write_packed(shared, {(s, q): {'step': s, 'q': q} for s in (1, 2, 3) for q in (10, 50, 90)})
+    model_loader.clear_caches()
+    with patch.object(model_loader, 'MODELS_DIR', tmp_path):
+        b2 = load_models('SHR', 2)
+        b3 = load_models('SHR')
+        assert (b2.horizon, b3.horizon) == (2, 3)
+        assert b2.model_map is b3.model_map  # one set of boosters for every horizon
+        assert b2.model_map[(2, 50)] == {'step': 2, 'q': 50}
+        with pytest.raises(ValueError):
+            load_models('SHR', 4)
+
+
+def test_predict_all_step_range_matches_full_prediction():
+    class Const:
+        def __init__(self, value):
+            self.value = value
+
+        def predict(self, X):
+            return [self.value] * len(X)
+
+    meta = dict(META, horizons=[4])
+    bundle = model_loader.ModelBundle('PACKT', meta, 4, {(s, q): Const(s * 100 + q) for s in range(1, 5)
+                                                         for q in (10, 50, 90)})
+    full = bundle.predict_all([1.0])
+    assert full.shape == (4, 3) and full[3, 2] == 490
+    assert (bundle.predict_all([1.0], range(2, 4)) == full[1:3]).all()
+
+
+def test_bundle_cache_is_bounded_by_estimated_bytes(tmp_path, monkeypatch):
+    import gc
+    import weakref
+    _write_ticker(tmp_path, packed=True, pickles=True)
+    model_loader.clear_caches()
+    with patch.object(model_loader, 'MODELS_DIR', tmp_path):
+        packed = load_models('PACKT', 2, artifact='packed')
+        blobs = packed.model_map.serialized_bytes(list(packed.model_map))
+        assert packed.nbytes == int(blobs * model_loader.BOOSTER_MEMORY_FACTOR)
+        monkeypatch.setattr(model_loader._BUNDLES, 'maxbytes', packed.nbytes + 1)
+        pack_ref = weakref.ref(packed.model_map)
+        del packed
+        load_models('PACKT', 2, artifact='pkl')  # over budget: the packed bundle is evicted
+        stats = model_loader.model_cache_stats()
+        assert (stats['size'], stats['evictions']) == (1, 1)
+        assert stats['bytes'] == model_loader.loaded_bundles()[0]['bytes'] > 0
+        gc.collect()
+        assert pack_ref() is None  # its boosters and mmap were released
+        for horizon in (None, 2):  # new keys drop the loader locks of evicted bundles
+            load_models('PACKT', horizon, artifact='packed')
+        assert len(model_loader._LOAD_LOCKS) <= model_loader.model_cache_stats()['size'] + 1
+    model_loader.clear_caches()
+
+
+def test_registry_publish_swaps_version_and_prunes(tmp_path):
+    model_loader.clear_caches()
+    with patch.object(model_loader, 'MODELS_DIR', tmp_path):
+        versions = []
+        for tag in ('a', 'b', 'c'):
+            vdir = model_loader.new_version_dir('REG')
+            (vdir / 'H2').mkdir()
+            (vdir / 'metadata.json').write_text(json.dumps(dict(META, ticker='REG', trained_at=tag)))
+            write_packed(vdir / 'H2', {(s, q): {'tag': tag} for s in (1, 2) for q in (10, 50, 90)})
+            versions.append(vdir.name)
+            model_loader.publish_version('REG', vdir.name, keep=2)
+            bundle = load_models('REG', 2)
+            # a running process sees each new version on its next call
+            assert bundle.version == vdir.name and bundle.model_map[(1, 50)] == {'tag': tag}
+            assert load_metadata('REG')['trained_at'] == tag
+        assert model_loader.list_versions('REG') == versions[1:]
+        assert load_models('REG', 2) is bundle
+        # a request pinned to the superseded version keeps it without displacing the current one
+        pinned = load_models('REG', 2, version=versions[1])
+        assert pinned.version == versions[1] and pinned.model_map[(1, 50)] == {'tag': 'b'}
+        assert load_models('REG', 2, version=versions[1]) is pinned and load_models('REG', 2) is bundle
+        with pytest.raises(FileNotFoundError):
+            load_models('REG', 2, version=versions[0])  # pruned
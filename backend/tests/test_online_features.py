@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.feature_engineering import build_features
+from backend.generate_sample_data import generate_stock_data
+from backend.online_features import OnlineFeatureState, OnlineFeatureStore, latest_features
+
+
+@pytest.fixture(scope='module')
+def prices():
+    return generate_stock_data('ONLINE', days=300)
+
+
+def _assert_row_matches(online: dict, expected: pd.Series):
+    assert list(online) == list(expected.index)
+    for col in expected.index:
+        if col == 'date':
+            assert pd.Timestamp(online[col]) == expected[col]
+        else:
+            np.testing.assert_allclose(online[col], expected[col], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_seeded_state_matches_build_features(prices):
+    _assert_row_matches(latest_features(prices), build_features(prices).iloc[-1])
+
+
+def test_seeding_sorts_by_date(prices):
+    shuffled = prices.sample(frac=1, random_state=0)
+    _assert_row_matches(latest_features(shuffled), build_features(prices).iloc[-1])
+
+
+@pytest.mark.parametrize('seed_rows', [0, 5, 14, 40])
+def test_incremental_updates_match_every_row(prices, seed_rows):
+    state = OnlineFeatureState.from_frame(prices.iloc[:seed_rows])
+    full = build_features(prices)
+    for i, bar in enumerate(prices.iloc[seed_rows:].to_dict('records'), start=seed_rows):
+        state.update(bar)
+        if i in (seed_rows, 13, 14, 29, 30, 31) or i == len(prices) - 1:
+            _assert_row_matches(state.features(), full.iloc[i])
+    assert len(state.closes) <= 31
+
+
+def test_store_extends_then_reseeds_on_revised_history(prices):
+    store = OnlineFeatureStore()
+    store.latest('X', prices.iloc[:250])
+    _assert_row_matches(store.latest('X', prices), build_features(prices).iloc[-1])
+    revised = prices.copy()
+    revised.loc[revised.index[-1], 'close'] += 1.0
+    _assert_row_matches(store.latest('X', revised), build_features(revised).iloc[-1])
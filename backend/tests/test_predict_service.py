@@ -1,6 +1,5 @@
 import pytest
 from fastapi.testclient import TestClient
-from pathlib import Path
 import json
 import joblib
 from unittest.mock import patch
@@ -22,12 +21,17 @@ DUMMY_META = {
 }
 
 @pytest.fixture(autouse=True)
-def patch_metadata(tmp_path):
-    # create dummy model folder structure
-    models_dir = Path('backend/models/TEST/H5')
+def patch_metadata(tmp_path, monkeypatch):
+    # create dummy model folder structure under tmp_path, never in the real backend/models
+    from backend import predict_service
+    from backend.utils import model_loader
+    root = tmp_path / 'models'
+    monkeypatch.setattr(model_loader, 'MODELS_DIR', root)
+    monkeypatch.setattr(predict_service, 'MODELS_DIR', root)
+    models_dir = root / 'TEST' / 'H5'
     models_dir.mkdir(parents=True, exist_ok=True)
     # Write metadata
-    with open(Path('backend/models/TEST/metadata.json'), 'w') as f:
+    with open(root / 'TEST' / 'metadata.json', 'w') as f:
         json.dump(DUMMY_META, f)
     # Instead of dumping a class (pickle issues in local scope), dump a simple dict
     dummy_model = {"predict": 123.45}
@@ -49,7 +53,7 @@ def patch_metadata(tmp_path):
             return LoaderMock(obj['predict'])
         return obj
 
-    with patch('backend.utils.model_loader.joblib.load', side_effect=_load):
+    with patch('joblib.load', side_effect=_load):  # model_loader imports joblib on use
         yield
 
 @pytest.mark.skip(reason="Requires network for yfinance unless mocked")
@@ -68,3 +72,197 @@ def test_model_metadata():
     body = r.json()
     assert body['ticker'] == 'TEST'
     assert 5 in body['horizons']
+
+_PRICES = None
+
+def _sample_prices(*args, **kwargs):
+    # generated once: the series ends at datetime.now(), so regenerating would change the data
+    global _PRICES
+    if _PRICES is None:
+        from backend.generate_sample_data import generate_stock_data
+        _PRICES = generate_stock_data('TEST', days=150)
+    return _PRICES.copy()
+
+def test_predict_uses_all_steps_and_quantiles():
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        r = client.post('/api/predict', json={'ticker': 'TEST', 'horizon': 5, 'recent': 60})
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body['historical']) == 60
+    assert len(body['predictions']) == 5
+    assert body['predictions'][0]['p50'] == pytest.approx(123.45)
+    dates = [p['date'] for p in body['predictions']]
+    assert dates == sorted(dates) and len(set(dates)) == 5
+
+def test_forecast_cache_hits_and_slices_recent():
+    from backend.predict_service import FORECAST_CACHE
+    FORECAST_CACHE.clear()
+    from backend.predict_service import _compute_forecast
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices), \
+         patch('backend.predict_service._compute_forecast', wraps=_compute_forecast) as compute:
+        first = client.post('/api/predict', json={'ticker': 'TEST', 'horizon': 5, 'recent': 100}).json()
+        second = client.post('/api/predict', json={'ticker': 'TEST', 'horizon': 5, 'recent': 50}).json()
+    assert compute.call_count == 1
+    assert second['historical'] == first['historical'][-50:]
+    assert second['predictions'] == first['predictions']
+    stats = client.get('/api/stats').json()['forecast_cache']
+    assert stats['hits'] >= 1
+
+def test_predict_columnar_matches_records():
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        rows = client.post('/api/predict', json={'ticker': 'TEST', 'horizon': 5, 'recent': 60}).json()
+        cols = client.post('/api/predict', json={'ticker': 'TEST', 'horizon': 5, 'recent': 60,
+                                                 'format': 'columnar'}).json()
+    assert set(cols['historical']) == {'date', 'close'} and len(cols['historical']['close']) == 60
+    assert [dict(zip(cols['historical'], r)) for r in zip(*cols['historical'].values())] == rows['historical']
+    assert [dict(zip(cols['predictions'], r)) for r in zip(*cols['predictions'].values())] == rows['predictions']
+    assert client.post('/api/predict', json={'ticker': 'TEST', 'format': 'csv'}).status_code == 422
+
+def test_predict_stream_matches_predict(monkeypatch):
+    from backend import predict_service as ps
+    monkeypatch.setattr(ps, 'STREAM_CHUNK_STEPS', 2)
+    monkeypatch.setattr(ps, 'STREAM_CHUNK_ROWS', 25)
+    ps.FORECAST_CACHE.clear()
+    body = {'ticker': 'TEST', 'horizon': 5, 'recent': 60}
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        streams = [client.post('/api/predict/stream', json=body) for _ in range(2)]  # computed, then cached
+        plain = client.post('/api/predict', json=body).json()
+        sse = client.post('/api/predict/stream', json=body, headers={'Accept': 'text/event-stream'})
+    for r in streams:
+        assert r.headers['content-type'].startswith('application/x-ndjson')
+        events = [json.loads(line) for line in r.text.splitlines()]
+        kinds = [e['event'] for e in events]
+        assert kinds == ['meta'] + ['historical'] * 3 + ['predictions'] * 3 + ['end']
+        assert events[0]['horizon'] == 5
+        assert [row for e in events if e['event'] == 'historical' for row in e['rows']] == plain['historical']
+        assert [row for e in events if e['event'] == 'predictions' for row in e['rows']] == plain['predictions']
+    assert sse.text.startswith('event: meta\ndata: {') and sse.text.endswith('event: end\ndata: {}\n\n')
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        assert client.post('/api/predict/stream', json={'ticker': 'NOPE', 'horizon': 5}).status_code == 404
+
+def test_fastjson_fallback_matches_orjson(monkeypatch):
+    import numpy as np
+    from backend.utils import fastjson
+    payload = {'date': ['2024-01-02'], 'close': np.array([1.5, 2.25]), 'n': np.int64(3), 'x': None}
+    fast = fastjson.dumps(payload)
+    monkeypatch.setattr(fastjson, 'orjson', None)
+    assert json.loads(fastjson.dumps(payload)) == json.loads(fast) == \
+        {'date': ['2024-01-02'], 'close': [1.5, 2.25], 'n': 3, 'x': None}
+
+def test_fastjson_writes_non_finite_as_null(monkeypatch):
+    import numpy as np
+    from backend.utils import fastjson
+    payload = {'a': float('nan'), 'b': [1.0, float('-inf')], 'c': np.array([[np.inf, 2.0]]), 'd': np.float64('nan')}
+    expected = {'a': None, 'b': [1.0, None], 'c': [[None, 2.0]], 'd': None}
+    outputs = [fastjson.dumps(payload)]
+    monkeypatch.setattr(fastjson, 'orjson', None)
+    outputs.append(fastjson.dumps(payload))
+    for out in outputs:
+        assert b'NaN' not in out and b'Infinity' not in out and json.loads(out) == expected
+
+@pytest.mark.parametrize('serving', ['online', 'pandas', 'numpy'])
+@pytest.mark.parametrize('trained', ['pandas', 'numpy'])
+def test_serving_features_match_training(monkeypatch, serving, trained):
+    import numpy as np
+    from backend import predict_service as ps
+    from backend.online_features import OnlineFeatureStore
+    from backend.train_lightgbm import prepare
+    monkeypatch.setattr(ps, 'FEATURE_ENGINE', serving)
+    monkeypatch.setattr(ps, 'ONLINE_FEATURES', OnlineFeatureStore())
+    df = _sample_prices()
+    train = prepare(df, engine=trained)
+    cols = [c for c in train.columns if c != 'date']
+    X, last_date = ps._latest_features('TEST', df, {'feature_cols': cols, 'feature_engine': trained})
+    expected = train[cols].iloc[-1].to_numpy()
+    assert X.dtype == expected.dtype and last_date == train['date'].iloc[-1]
+    np.testing.assert_allclose(X, expected, rtol=1e-6 if serving == 'online' else 0)
+
+def test_predict_batch_mixes_results_and_errors():
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        r = client.post('/api/predict/batch', json={'items': [
+            {'ticker': 'TEST', 'horizon': 5, 'recent': 60},
+            {'ticker': 'NOPE', 'horizon': 5},
+            {'ticker': 'test', 'horizon': 5, 'recent': 60},
+        ]})
+    assert r.status_code == 200
+    body = r.json()
+    ok, missing, dup = body['results']
+    assert body['errors'] == 1
+    assert len(ok['predictions']) == 5 and dup == ok
+    assert missing == {'ticker': 'NOPE', 'horizon': 5, 'error': missing['error'], 'status': 404}
+
+def test_admin_models_reports_versions_and_token(monkeypatch):
+    client.get('/api/models/TEST')
+    body = client.get('/api/admin/models').json()
+    assert body['tickers']['TEST']['current'] is None  # flat layout, no registry pointer
+    monkeypatch.setenv('ADMIN_TOKEN', 's3cret')
+    assert client.get('/api/admin/models').status_code == 403
+    assert client.get('/api/admin/models', headers={'X-Admin-Token': 's3cret'}).status_code == 200
+
+def test_ready_reports_warmup_progress(monkeypatch):
+    import backend.predict_service as ps
+    from backend.utils.model_loader import clear_caches
+    from backend.utils.warmup import ModelWarmup, parse_targets
+    assert parse_targets('test, nope:3') == [('TEST', 5), ('NOPE', 3)]
+    assert parse_targets('none') == []
+    clear_caches()
+    monkeypatch.setattr(ps, 'WARMUP', ModelWarmup([('TEST', 5)]))
+    r = client.get('/ready')
+    assert r.status_code == 503 and r.json()['warmup']['state'] == 'pending'
+    ps.start_warmup('TEST,NOPE:3')._thread.join(10)
+    r = client.get('/ready')
+    status = r.json()['warmup']
+    assert r.status_code == 200 and status['state'] == 'ready'
+    assert (status['total'], status['done'], status['failed']) == (2, 2, 1)
+    assert status['errors'][0]['ticker'] == 'NOPE'
+    assert any(b['ticker'] == 'TEST' for b in client.get('/api/admin/models').json()['loaded'])
+
+def test_metrics_exposes_stage_histograms():
+    from backend.predict_service import METRICS, FORECAST_CACHE
+    METRICS.reset(); FORECAST_CACHE.clear()
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        client.post('/api/predict', json={'ticker': 'TEST', 'horizon': 5, 'recent': 50})
+        client.post('/api/predict', json={'ticker': 'TEST', 'horizon': 5, 'recent': 50})
+    client.post('/api/predict', json={'ticker': 'NOPE', 'horizon': 5})
+    r = client.get('/metrics')
+    assert r.status_code == 200 and r.headers['content-type'].startswith('text/plain')
+    body = r.text
+    for stage in ('load_metadata', 'download', 'load_models', 'features', 'predict', 'serialize'):
+        assert f'forecast_stage_seconds_count{{stage="{stage}",ticker="TEST",horizon="5"}}' in body
+    assert 'forecast_stage_seconds_count{stage="total",ticker="TEST",horizon="5"} 2' in body
+    assert 'forecast_stage_seconds_bucket{stage="total",ticker="TEST",horizon="5",le="+Inf"} 2' in body
+    assert 'forecast_cache_total{horizon="5",result="hit",ticker="TEST"} 1' in body
+    assert 'forecast_errors_total{status="404"} 1' in body
+    assert 'NOPE' not in body  # unknown tickers do not create label series
+
+def test_stats_label_worker_processes_they_cannot_see(monkeypatch):
+    from backend.predict_service import FORECAST_POOL
+    assert client.get('/api/stats').json()['scope'] == {'executor': 'thread', 'workers_excluded': 0}
+    monkeypatch.setattr(FORECAST_POOL, 'kind', 'process')
+    scope = client.get('/api/stats').json()['scope']
+    assert scope['workers_excluded'] == FORECAST_POOL.max_workers and 'worker processes' in scope['note']
+    assert f'forecast_metrics_workers_excluded {FORECAST_POOL.max_workers}' in client.get('/metrics').text
+
+def test_predict_profile_reports_stage_timings(monkeypatch):
+    body = {'ticker': 'TEST', 'horizon': 5, 'recent': 50}
+    monkeypatch.setenv('ADMIN_TOKEN', 's3cret')
+    admin = {'X-Admin-Token': 's3cret'}
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        assert 'timings' not in client.post('/api/predict', json=body).json()
+        timed = client.post('/api/predict?profile=1', json=body, headers=admin).json()
+        full = client.post('/api/predict', json=body, headers={'X-Profile': 'cprofile,memory', **admin}).json()
+    assert {'load_metadata', 'download', 'load_models', 'predict', 'total', 'wall'} <= set(timed['timings'])
+    assert 'profile' not in timed
+    assert full['profile']['cprofile'] and full['profile']['memory']['peak_kb'] > 0
+    assert client.post('/api/predict?profile=bogus', json=body).status_code == 400
+    assert client.post('/api/predict?profile=1', json=body).status_code == 403
+
+def test_predict_profile_admin_mode_needs_a_configured_token(monkeypatch):
+    import backend.predict_service as ps
+    body = {'ticker': 'TEST', 'horizon': 5, 'recent': 50}
+    monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+    r = client.post('/api/predict?profile=1', json=body)
+    assert r.status_code == 403 and 'ADMIN_TOKEN' in r.json()['detail']
+    monkeypatch.setattr(ps, 'PROFILING', 'on')
+    with patch('backend.predict_service.download_latest', side_effect=_sample_prices):
+        assert 'timings' in client.post('/api/predict?profile=1', json=body).json()
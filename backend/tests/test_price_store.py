@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from backend.utils import price_store
+
+
+def _prices(n, start='2024-01-01'):
+    dates = pd.date_range(start, periods=n, freq='B').astype('datetime64[ns]')  # store resolution
+    close = 100 + np.arange(n, dtype=float)
+    return pd.DataFrame({'date': dates, 'open': close - 0.5, 'close': close,
+                         'volume': np.arange(n, dtype=np.int64) * 10})
+
+
+def test_write_read_roundtrip_and_tail(tmp_path):
+    df = _prices(50)
+    price_store.write('ABC', df, root=tmp_path)
+    out = price_store.read('ABC', root=tmp_path)
+    pd.testing.assert_frame_equal(out, df)
+    tail = price_store.read('ABC', tail=5, root=tmp_path)
+    pd.testing.assert_frame_equal(tail, df.iloc[-5:].reset_index(drop=True))
+    arrays = price_store.read_arrays('ABC', tail=5, columns=['close'], root=tmp_path)
+    assert list(arrays) == ['close'] and isinstance(arrays['close'], np.memmap)
+
+
+def test_append_only_adds_new_bars(tmp_path):
+    df = _prices(40)
+    price_store.write('ABC', df.iloc[:30], root=tmp_path)
+    # overlapping window: only the 10 bars after the stored last date are written
+    assert price_store.append('ABC', df.iloc[20:], root=tmp_path) == 10
+    assert price_store.append('ABC', df.iloc[35:], root=tmp_path) == 0
+    pd.testing.assert_frame_equal(price_store.read('ABC', root=tmp_path), df)
+
+
+def test_append_discards_uncommitted_bytes(tmp_path):
+    df = _prices(20)
+    tdir = price_store.write('ABC', df.iloc[:10], root=tmp_path)
+    close_file = price_store.read_meta('ABC', root=tmp_path)['files']['close']
+    with open(tdir / close_file, 'ab') as f:  # crashed append: data written, meta not updated
+        f.write(np.array([1e9, 1e9]).tobytes())
+    assert len(price_store.read('ABC', root=tmp_path)) == 10
+    price_store.append('ABC', df.iloc[10:], root=tmp_path)
+    pd.testing.assert_frame_equal(price_store.read('ABC', root=tmp_path), df)
+
+
+def test_load_prices_migrates_csv(tmp_path):
+    df = _prices(15)
+    df.to_csv(tmp_path / 'XYZ.csv', index=False)
+    store = tmp_path / 'store'
+    out = price_store.load_prices('xyz', root=store, data_dir=tmp_path)
+    assert price_store.exists('XYZ', root=store)
+    pd.testing.assert_frame_equal(out, df, check_dtype=False)
+    assert price_store.load_prices('NOPE', root=store, data_dir=tmp_path) is None
+
+
+def test_concurrent_readers_and_writers(tmp_path):
+    df = _prices(300)
+    df.to_csv(tmp_path / 'XYZ.csv', index=False)
+    store = tmp_path / 'store'
+
+    def reader(_):
+        for _ in range(30):
+            out = price_store.load_prices('XYZ', tail=50, root=store, data_dir=tmp_path)
+            assert len(out) == 50 and out['close'].iloc[-1] in (df['close'].iloc[-1], df['close'].iloc[199])
+
+    def writer(i):
+        for j in range(15):
+            price_store.write('XYZ', df.iloc[:200] if (i + j) % 2 else df, root=store, fetched_at=j)
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(reader, i) for i in range(6)] + [pool.submit(writer, i) for i in range(2)]
+        for f in futures:
+            f.result()
+    meta = price_store.read_meta('XYZ', root=store)
+    live = {p.name for p in (store / 'XYZ').glob('*.bin')}
+    assert set(meta['files'].values()) <= live and len(live) <= 2 * len(meta['files'])  # current + previous
+    assert not list((store / 'XYZ').glob('*.tmp'))
+
+
+def test_write_survives_undeletable_old_generation(tmp_path):
+    df = _prices(30)
+    for n in (10, 20):
+        price_store.write('ABC', df.iloc[:n], root=tmp_path)
+
+    def mapped(self, missing_ok=False):  # Windows refuses to delete a file a reader has mapped
+        raise PermissionError(13, 'in use', str(self))
+    with patch.object(Path, 'unlink', mapped):
+        price_store.write('ABC', df, root=tmp_path)  # committed despite the failed cleanup
+    pd.testing.assert_frame_equal(price_store.read('ABC', root=tmp_path), df)
+    stale = len(list((tmp_path / 'ABC').glob('*.bin')))
+    price_store.write('ABC', df, root=tmp_path)
+    assert len(list((tmp_path / 'ABC').glob('*.bin'))) < stale  # the next write cleaned up
@@ -0,0 +1,80 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.train_lightgbm import (_generate_synthetic, _fit_task, _init_task_data, prepare, serial_fit_seconds,
+                                    thread_budget, cache_datasets, train_step, train_rows, align_features)
+
+
+def test_thread_budget_never_oversubscribes():
+    assert thread_budget(4, cpus=16) == 4
+    assert thread_budget(3, cpus=8) == 2
+    assert thread_budget(8, cpus=2) == 1
+    assert thread_budget(0, cpus=4) == 4
+
+
+def test_pool_task_matches_in_process():
+    df = prepare(_generate_synthetic('POOL', rows=300))
+    cols = [c for c in df.columns if c != 'date']
+    params = {'learning_rate': 0.1, 'num_leaves': 8, 'min_data_in_leaf': 10, 'seed': 1,
+              'verbosity': -1, 'num_threads': 1}
+    _init_task_data(df[cols], df['close'], params)
+    local_model, local_metrics, _ = _fit_task(3, 2, 0.5, None)
+    with ProcessPoolExecutor(1, initializer=_init_task_data, initargs=(df[cols], df['close'], params)) as pool:
+        model, metrics, _ = pool.submit(_fit_task, 3, 2, 0.5, None).result()
+    assert metrics == local_metrics
+    assert model.model_to_string() == local_model.model_to_string()
+
+
+def test_serial_baseline_refits_without_writing(tmp_path):
+    df = prepare(_generate_synthetic('SERIAL', rows=200))
+    cols = [c for c in df.columns if c != 'date']
+    params = {'learning_rate': 0.1, 'num_leaves': 8, 'min_data_in_leaf': 10, 'seed': 1, 'verbosity': -1,
+              'num_threads': 1}
+    tasks = [(2, step, q, tmp_path, None, 0, 5) for step in (1, 2) for q in (0.1, 0.9)]
+    assert serial_fit_seconds(tasks, df[cols], df['close'], params) > 0
+    assert not list(tmp_path.iterdir())  # pickle_dir is ignored: the baseline keeps no models
+    from backend import train_lightgbm
+    assert 'num_threads' not in train_lightgbm._TASK_DATA['params']  # --jobs 1 threading
+
+
+def test_reused_and_cached_dataset_match_fresh_construction(tmp_path):
+    df = prepare(_generate_synthetic('REUSE', rows=300))
+    cols = [c for c in df.columns if c != 'date']
+    params = {'learning_rate': 0.1, 'num_leaves': 8, 'min_data_in_leaf': 10, 'seed': 1, 'verbosity': -1}
+    H, step = 3, 2
+    n = train_rows(len(df), H)
+    X_tr = align_features(df[cols], H).iloc[:n]
+    y_tr = df['close'].shift(-step).iloc[:-H].iloc[:n]
+    fresh, _ = train_step(X_tr, y_tr, 0.9, step, None, params)
+
+    files = cache_datasets(df[cols], [H], params, tmp_path)
+    assert cache_datasets(df[cols], [H], dict(params, num_threads=2), tmp_path) == files
+    for dataset_files in (None, files):
+        _init_task_data(df[cols], df['close'], params, dataset_files)
+        _fit_task(H, 1, 0.1, None)  # another step/quantile first: the shared Dataset gets relabelled
+        model, _, _ = _fit_task(H, step, 0.9, None)
+        assert model.model_to_string().split('parameters:')[0] == fresh.model_to_string().split('parameters:')[0]
+
+
+def test_incremental_plan_policy():
+    from backend.train_lightgbm import QUANTILES, incremental_plan, update_lineage
+    prev = {'layout': 'per_horizon', 'horizons': [5], 'quantiles': QUANTILES, 'feature_cols': ['a'],
+            'rows': 100, 'trained_at': 't0'}
+    plan = lambda meta, rows, **kw: incremental_plan(meta, kw.get('layout', 'per_horizon'), [5], ['a'], rows, 3)[0]
+    assert plan(None, 100) == 'full'
+    assert plan(prev, 100) == 'skip'
+    assert plan(prev, 90) == 'full'
+    assert plan(prev, 105, layout='shared') == 'full'
+    assert plan(prev, 105) == 'incremental'
+    lineage = update_lineage(prev, 'incremental', '5 new bars', 't1', 105, 30)
+    assert lineage['incremental_since_full'] == 1 and lineage['total_rounds'] == 330
+    assert plan(dict(prev, lineage=dict(lineage, incremental_since_full=3)), 110) == 'full'
+
+
+def test_warm_start_continues_existing_booster():
+    df = prepare(_generate_synthetic('WARM', rows=300))
+    cols = [c for c in df.columns if c != 'date']
+    params = {'learning_rate': 0.1, 'num_leaves': 8, 'min_data_in_leaf': 10, 'seed': 1, 'verbosity': -1}
+    _init_task_data(df[cols], df['close'], params)
+    base, _, _ = _fit_task(3, 1, 0.5, None, rounds=20)
+    grown, _, _ = _fit_task(3, 1, 0.5, None, init_model=base.model_to_string(), start_row=100, rounds=5)
+    assert (base.num_trees(), grown.num_trees()) == (20, 25)
@@ -0,0 +1,40 @@
+import numpy as np
+import lightgbm as lgb
+import pytest
+
+from backend.utils.tree_engine import CompiledForest
+
+
+def _train(X, y, alpha, rounds=40, **extra):
+    params = {'objective': 'quantile', 'alpha': alpha, 'num_leaves': 15, 'min_data_in_leaf': 5,
+              'learning_rate': 0.1, 'verbosity': -1, 'seed': 1, **extra}
+    return lgb.train(params, lgb.Dataset(X, y), num_boost_round=rounds)
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    X[rng.random(X.shape) < 0.05] = np.nan  # exercise missing-value routing
+    y = np.nan_to_num(X[:, 0]) * 3 + np.nan_to_num(X[:, 1]) ** 2 + rng.normal(scale=0.1, size=400)
+    return X, y
+
+
+def test_matches_booster_predict(data):
+    X, y = data
+    boosters = [_train(X, y, q) for q in (0.1, 0.5, 0.9)]
+    boosters.append(_train(X, y, 0.5, zero_as_missing=True))
+    forest = CompiledForest.from_boosters(boosters)
+    expected = np.column_stack([b.predict(X) for b in boosters])
+    np.testing.assert_allclose(forest.predict(X), expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(forest.predict(X[0]), expected[:1], rtol=1e-9, atol=1e-9)
+
+
+def test_constant_trees_and_roundtrip(data, tmp_path):
+    X, _ = data
+    flat = _train(X, np.full(len(X), 7.0), 0.5, rounds=3)  # every tree is a single leaf
+    forest = CompiledForest.from_boosters([flat])
+    np.testing.assert_allclose(forest.predict(X[:5])[:, 0], flat.predict(X[:5]))
+    forest.save(tmp_path / 'forest.npz')
+    again = CompiledForest.load(tmp_path / 'forest.npz')
+    np.testing.assert_array_equal(again.predict(X), forest.predict(X))
@@ -2,26 +2,43 @@
 Enhancements:
 1. Pinball (quantile) loss logging per step & quantile
 2. Optional multi-horizon training (e.g. 5,10,30) in a single run storing models in subfolders:
-    backend/models/{TICKER}/H{h}/step_{step}_q{quant}.pkl
+    backend/models/{TICKER}/versions/{v}/H{h}/models.pack            (--artifact packed, default)
+    backend/models/{TICKER}/versions/{v}/H{h}/step_{step}_q{quant}.pkl (--artifact pkl, legacy layout)
+   Each run writes a new version directory and then atomically repoints models/{TICKER}/CURRENT,
+   so a running service never sees a half-written model set (see utils/model_loader.py).
 3. Backward compatible when single --horizon provided.
+4. --layout shared trains each (step, quantile) once for the largest horizon into
+    backend/models/{TICKER}/shared/ and serves every horizon <= max(horizons) from that step set.
+5. --incremental continues the existing boosters (LightGBM init_model) with a few extra rounds on
+   the newly usable rows instead of retraining from scratch; every --full-every updates (or when
+   the model set changes) a full retrain runs instead. metadata['lineage'] records the history.
+6. --jobs N trains the independent step/quantile boosters on N worker processes, with LightGBM
+   num_threads budgeted to cpu_count // N so workers x threads does not oversubscribe the machine.
+   --compare-serial then retrains every model in-process (the --jobs 1 run) to report the real
+   wall-clock speedup.
 
-Metadata now stores: { ticker, horizons:[...], default_horizon, metrics:{Hxx:{step_1:{q10_mae,..,q10_pinball:..},...}}, quantiles }
+Metadata now stores: { ticker, horizons:[...], default_horizon, layout, lineage, metrics:{Hxx:{step_1:{q10_mae,..,q10_pinball:..},...}}, quantiles }
 """
 from __future__ import annotations
-import argparse, json, time
+import argparse, json, shutil, time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 import pandas as pd
 import numpy as np
-import joblib
-from sklearn.metrics import mean_absolute_error
-import lightgbm as lgb
 import sys
+
+if TYPE_CHECKING:  # lightgbm itself is imported where training needs it
+    import lightgbm as lgb
 # Ensure project root on path when executed directly (python backend/train_lightgbm.py ...)
 if __package__ is None and __name__ == "__main__":
     # add parent directory so that `backend.` absolute imports work regardless of CWD
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from backend.feature_engineering import build_features
+from backend.utils.model_loader import (write_packed, load_model_map, PackedModelMap, SHARED_DIR,
+                                       model_root, new_version_dir, publish_version)
+from backend.utils import price_store
 import os
 
 def _generate_synthetic(ticker: str, rows: int = 800) -> pd.DataFrame:
@@ -49,13 +66,15 @@ MODELS_DIR = Path(__file__).parent / 'models'
 DATA_DIR = Path(__file__).parent / 'data'
 
 QUANTILES = [0.1, 0.5, 0.9]
+NUM_BOOST_ROUND = 300
+LINEAGE_HISTORY = 20  # lineage entries kept in metadata.json
 
 def pinball_loss(y_true, y_pred, q: float):
     diff = y_true - y_pred
     return float(np.mean(np.maximum(q*diff, (q-1)*diff)))
 
-def prepare(df: pd.DataFrame) -> pd.DataFrame:
-    df = build_features(df)
+def prepare(df: pd.DataFrame, engine: str = 'pandas') -> pd.DataFrame:
+    df = build_features(df, engine=engine)
     # drop rows with NA created by indicators
     df = df.dropna().reset_index(drop=True)
     return df
@@ -75,48 +94,244 @@ def align_features(df: pd.DataFrame, horizon: int) -> pd.DataFrame:
     return df.iloc[:-horizon].reset_index(drop=True)
 
 
-def train_step(X: pd.DataFrame, y: pd.Series, quantile: float, step: int, out_dir: Path, params_base: dict):
+def train_step(X: pd.DataFrame, y: pd.Series, quantile: float, step: int, out_dir: Path | None, params_base: dict,
+               dataset: lgb.Dataset | None = None, num_boost_round: int = NUM_BOOST_ROUND, init_model=None):
+    """Train one quantile booster. Pickled into out_dir unless out_dir is None (packed-only runs).
+
+    dataset: an already constructed (binned) Dataset over X to reuse; only its label is replaced.
+    init_model: existing Booster to continue with num_boost_round more rounds (warm start).
+    """
+    import lightgbm as lgb
     params = params_base.copy()
     params.update({
         'objective': 'quantile',
         'alpha': quantile,
     })
-    lgb_train = lgb.Dataset(X, y)
+    if dataset is not None:
+        dataset.set_label(y)
+        lgb_train = dataset
+    else:
+        lgb_train = lgb.Dataset(X, y)
     # LightGBM 4.6.0 removed verbose_eval argument in core.train; suppress logging by omitting it
-    model = lgb.train(params, lgb_train, num_boost_round=300)
+    model = lgb.train(params, lgb_train, num_boost_round=num_boost_round, init_model=init_model)
+    if out_dir is None:
+        return model, None
+    import joblib
     out_path = out_dir / f'step_{step}_q{int(quantile*100)}.pkl'
     joblib.dump(model, out_path)
     return model, out_path
 
 
-def main():
+# per-process training data, set once by _init_task_data (worker initializer or in-process)
+_TASK_DATA: dict = {}
+
+
+def _init_task_data(features: pd.DataFrame, close: pd.Series, params_base: dict,
+                    dataset_files: dict | None = None):
+    _TASK_DATA.update(features=features, close=close, params=params_base,
+                      dataset_files=dataset_files or {}, datasets={})
+
+
+def train_rows(n_rows: int, H: int) -> int:
+    """Rows of the horizon-H training split (first 90% of the n_rows - H usable rows)."""
+    return int((n_rows - H) * 0.9)
+
+
+def _horizon_dataset(H: int) -> lgb.Dataset:
+    """Binned training matrix of horizon H, built once per process and shared by all its steps/quantiles.
+
+    The rows (and so the bins) only depend on H; labels are swapped per task by train_step.
+    Loaded from the binary file written by cache_datasets when one is registered.
+    """
+    import lightgbm as lgb
+    ds = _TASK_DATA['datasets'].get(H)
+    if ds is None:
+        path = _TASK_DATA['dataset_files'].get(H)
+        if path is not None:
+            ds = lgb.Dataset(str(path), params=_TASK_DATA['params'], free_raw_data=False)
+        else:
+            X_tr = _TASK_DATA['features'].iloc[:train_rows(len(_TASK_DATA['features']), H)]
+            ds = lgb.Dataset(X_tr, label=np.zeros(len(X_tr)), params=_TASK_DATA['params'], free_raw_data=False)
+        ds.construct()
+        _TASK_DATA['datasets'][H] = ds
+    return ds
+
+
+def cache_datasets(features: pd.DataFrame, horizons: list[int], params_base: dict, cache_dir: Path) -> dict:
+    """Write (or reuse) one LightGBM binary Dataset per horizon -> {H: path}.
+
+    Files are keyed by a hash of the training rows and the binning parameters, so a later run on
+    the same data skips Dataset construction; changed data or params produce a new file.
+    """
+    import hashlib
+    import lightgbm as lgb
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for H in horizons:
+        X_tr = features.iloc[:train_rows(len(features), H)]
+        digest = hashlib.sha1()
+        binning = {k: v for k, v in params_base.items() if k != 'num_threads'}
+        digest.update(json.dumps([list(X_tr.columns), binning], sort_keys=True, default=str).encode())
+        digest.update(np.ascontiguousarray(X_tr.to_numpy(dtype=np.float64)).tobytes())
+        path = cache_dir / f'H{H}_{digest.hexdigest()[:16]}.bin'
+        if not path.exists():
+            ds = lgb.Dataset(X_tr, label=np.zeros(len(X_tr)), params=params_base, free_raw_data=False)
+            tmp = path.with_suffix('.tmp')
+            ds.construct().save_binary(str(tmp))
+            os.replace(tmp, path)
+        files[H] = path
+    return files
+
+
+def _fit_task(H: int, step: int, q: float, pickle_dir: Path | None,
+              init_model: str | None = None, start_row: int = 0, rounds: int = NUM_BOOST_ROUND):
+    """Train + validate one (horizon, step, quantile) booster -> (model, metrics, fit CPU seconds).
+
+    init_model: model string of the existing booster to continue on training rows start_row.. for
+    `rounds` more rounds (incremental mode); otherwise a fresh `rounds`-round booster on the whole
+    training split.
+    CPU time (all threads of this process) rather than wall time. LightGBM is multi-threaded, so
+    the sum over tasks divided by the wall time is CPU utilisation, not a speedup over --jobs 1
+    (see serial_fit_seconds for that).
+    """
+    import lightgbm as lgb
+    X_all = align_features(_TASK_DATA['features'], H)
+    y = _TASK_DATA['close'].shift(-step).iloc[:-H]  # == make_targets(df, H)[step-1]
+    split_idx = train_rows(len(_TASK_DATA['features']), H)
+    X_tr, X_val = X_all.iloc[:split_idx], X_all.iloc[split_idx:]
+    y_tr, y_val = y.iloc[:split_idx], y.iloc[split_idx:]
+    start = time.process_time()
+    if init_model is not None:
+        model, _ = train_step(X_tr.iloc[start_row:], y_tr.iloc[start_row:], q, step, pickle_dir, _TASK_DATA['params'],
+                              num_boost_round=rounds, init_model=lgb.Booster(model_str=init_model))
+    else:
+        model, _ = train_step(X_tr, y_tr, q, step, pickle_dir, _TASK_DATA['params'], dataset=_horizon_dataset(H),
+                              num_boost_round=rounds)
+    pred_val = model.predict(X_val)
+    prefix = f'q{int(q*100)}'
+    metrics = {
+        f'{prefix}_mae': float(np.mean(np.abs(y_val.to_numpy() - pred_val))),
+        f'{prefix}_pinball': pinball_loss(y_val.values, pred_val, q),
+    }
+    return model, metrics, time.process_time() - start
+
+
+def incremental_plan(previous: dict | None, layout: str, horizons: list[int], feature_cols: list[str],
+                     rows: int, full_every: int) -> tuple[str, str]:
+    """Decide how to refresh a ticker's models -> (mode, reason), mode in 'full' | 'incremental' | 'skip'."""
+    if previous is None or 'rows' not in previous:
+        return 'full', 'no previous models'
+    if (previous.get('layout', 'per_horizon') != layout or previous.get('horizons') != horizons
+            or previous.get('quantiles') != QUANTILES or previous.get('feature_cols') != feature_cols):
+        return 'full', 'model set changed'
+    new_rows = rows - previous['rows']
+    if new_rows < 0:
+        return 'full', 'history shrank (data rewritten)'
+    if new_rows == 0:
+        return 'skip', 'no new bars since last training'
+    since_full = previous.get('lineage', {}).get('incremental_since_full', 0)
+    if since_full >= full_every:
+        return 'full', f'periodic full retrain after {since_full} incremental updates'
+    return 'incremental', f'{new_rows} new bars'
+
+
+def update_lineage(previous: dict | None, mode: str, reason: str, trained_at: str, rows: int, rounds: int) -> dict:
+    """metadata['lineage'] after a full or incremental training run."""
+    prev = (previous or {}).get('lineage', {})
+    if mode == 'full':
+        lineage = {'base_trained_at': trained_at, 'incremental_since_full': 0, 'total_rounds': rounds}
+    else:
+        lineage = {
+            'base_trained_at': prev.get('base_trained_at', previous.get('trained_at')),
+            'incremental_since_full': prev.get('incremental_since_full', 0) + 1,
+            'total_rounds': prev.get('total_rounds', NUM_BOOST_ROUND) + rounds,
+        }
+    entry = {'mode': mode, 'reason': reason, 'trained_at': trained_at, 'rows': rows,
+             'new_rows': rows - previous['rows'] if previous and 'rows' in previous else rows, 'rounds': rounds}
+    lineage['history'] = (prev.get('history', []) + [entry])[-LINEAGE_HISTORY:]
+    return lineage
+
+
+def default_params(learning_rate: float = 0.05, seed: int = 42) -> dict:
+    """LightGBM parameters shared by every step/quantile booster (objective/alpha set per model)."""
+    return {
+        'learning_rate': learning_rate,
+        'feature_fraction': 0.9,
+        'bagging_fraction': 0.9,
+        'bagging_freq': 1,
+        'num_leaves': 64,
+        'min_data_in_leaf': 30,
+        'max_depth': -1,
+        'seed': seed,
+        'verbosity': -1,
+        'metric': 'quantile'
+    }
+
+
+def serial_fit_seconds(tasks: list[tuple], features: pd.DataFrame, close: pd.Series, params_base: dict,
+                       dataset_files: dict | None = None) -> float:
+    """Wall seconds to fit `tasks` (_fit_task arguments) one after another in this process with
+    LightGBM's default threading, i.e. what --jobs 1 spends fitting. The models are discarded."""
+    params = {k: v for k, v in params_base.items() if k != 'num_threads'}
+    _init_task_data(features, close, params, dataset_files)
+    start = time.perf_counter()
+    for H, step, q, _pickle_dir, *rest in tasks:
+        _fit_task(H, step, q, None, *rest)
+    return time.perf_counter() - start
+
+
+def thread_budget(jobs: int, cpus: int | None = None) -> int:
+    """LightGBM num_threads per worker so that jobs x threads <= cpu count."""
+    return max(1, (cpus or os.cpu_count() or 1) // max(1, jobs))
+
+
+def main(argv: list[str] | None = None):
     ap = argparse.ArgumentParser(description='Train LightGBM quantile models per horizon step (supports multi-horizon)')
     ap.add_argument('ticker')
     ap.add_argument('--horizon', type=int, default=None, help='Single horizon (deprecated if --horizons provided)')
     ap.add_argument('--horizons', type=str, default=None, help='Comma separated horizons e.g. 5,10,30')
     ap.add_argument('--learning_rate', type=float, default=0.05)
     ap.add_argument('--seed', type=int, default=42)
-    args = ap.parse_args()
+    ap.add_argument('--feature-engine', choices=['pandas', 'numpy'], default='pandas',
+                    help='numpy: vectorized float32 feature matrix (recorded in metadata; serving follows it)')
+    ap.add_argument('--artifact', choices=['packed', 'pkl', 'both'], default='packed',
+                    help='Model storage: single models.pack per horizon, legacy per-step pickles, or both')
+    ap.add_argument('--jobs', type=int, default=1,
+                    help='Worker processes for the step/quantile models (0 = one per CPU, 1 = serial)')
+    ap.add_argument('--compare-serial', action='store_true',
+                    help='After training, refit every model serially (--jobs 1) and report the wall-clock speedup')
+    ap.add_argument('--layout', choices=['per_horizon', 'shared'], default='per_horizon',
+                    help='shared: train steps 1..max(horizons) once into models/TICKER/shared/ and serve every horizon from it')
+    ap.add_argument('--incremental', action='store_true',
+                    help='Continue the existing boosters on new bars (init_model) instead of retraining from scratch')
+    ap.add_argument('--extra-rounds', type=int, default=30, help='Boosting rounds added per incremental update')
+    ap.add_argument('--full-every', type=int, default=10,
+                    help='Run a full retrain after this many incremental updates')
+    ap.add_argument('--context-rows', type=int, default=200,
+                    help='Already-trained rows included with the new ones in an incremental update')
+    ap.add_argument('--keep-versions', type=int, default=3,
+                    help='Model versions kept under models/TICKER/versions/ after publishing (0 = keep all)')
+    ap.add_argument('--dataset-cache', action='store_true',
+                    help='Keep binned LightGBM datasets under models/TICKER/dataset_cache/ for later runs')
+    args = ap.parse_args(argv)
 
-    csv_path = DATA_DIR / f"{args.ticker.upper()}.csv"
-    
-    # Auto-download if CSV missing
+    ticker = args.ticker.upper()
+    df = price_store.load_prices(ticker)  # columnar store, legacy data/{TICKER}.csv migrated on first use
+
+    # Auto-download if no stored prices
     offline_mode = os.getenv('OFFLINE_MODE', '0') in ('1','true','TRUE','yes','YES')
-    if not csv_path.exists():
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if df is None:
         if offline_mode:
-            print(f"OFFLINE_MODE=1 -> generating synthetic data for {args.ticker.upper()}")
-            df_syn = _generate_synthetic(args.ticker.upper())
-            df_syn.to_csv(csv_path, index=False)
+            print(f"OFFLINE_MODE=1 -> generating synthetic data for {ticker}")
+            price_store.write(ticker, _generate_synthetic(ticker))
         else:
-            print(f"Data not found, downloading {args.ticker.upper()} from yfinance...")
+            print(f"Data not found, downloading {ticker} from yfinance...")
             try:
                 import yfinance as yf
-                ticker_data = yf.download(args.ticker.upper(), period='3y', auto_adjust=True, progress=False)
+                ticker_data = yf.download(ticker, period='3y', auto_adjust=True, progress=False)
                 if ticker_data.empty:
                     print("Download empty; falling back to synthetic data.")
-                    df_syn = _generate_synthetic(args.ticker.upper())
-                    df_syn.to_csv(csv_path, index=False)
+                    price_store.write(ticker, _generate_synthetic(ticker))
                 else:
                     ticker_data.reset_index(inplace=True)
                     ticker_data.columns = [c.lower() for c in ticker_data.columns]
@@ -125,15 +340,14 @@ def main():
                     if 'adj close' in ticker_data.columns and 'close' in ticker_data.columns:
                         ticker_data['close'] = ticker_data['adj close']
                         ticker_data.drop(columns=['adj close'], inplace=True)
-                    ticker_data.to_csv(csv_path, index=False)
-                    print(f"Saved {len(ticker_data)} rows to {csv_path}")
+                    tdir = price_store.write(ticker, ticker_data)
+                    print(f"Saved {len(ticker_data)} rows to {tdir}")
             except Exception as e:
                 print(f"Download failed ({e}); using synthetic data.")
-                df_syn = _generate_synthetic(args.ticker.upper())
-                df_syn.to_csv(csv_path, index=False)
+                price_store.write(ticker, _generate_synthetic(ticker))
+        df = price_store.read(ticker)
 
-    df = pd.read_csv(csv_path, parse_dates=['date'])
-    df = prepare(df)
+    df = prepare(df, engine=args.feature_engine)
 
     feature_cols = [c for c in df.columns if c not in {'date'}]
 
@@ -148,60 +362,131 @@ def main():
     ticker_root = MODELS_DIR / args.ticker.upper()
     ticker_root.mkdir(parents=True, exist_ok=True)
 
-    params_base = {
-        'learning_rate': args.learning_rate,
-        'feature_fraction': 0.9,
-        'bagging_fraction': 0.9,
-        'bagging_freq': 1,
-        'num_leaves': 64,
-        'min_data_in_leaf': 30,
-        'max_depth': -1,
-        'seed': args.seed,
-        'verbosity': -1,
-        'metric': 'quantile'
-    }
+    current_root = model_root(ticker)
+    previous = None
+    if (current_root / 'metadata.json').exists():
+        with open(current_root / 'metadata.json') as f:
+            previous = json.load(f)
+    mode, reason = 'full', 'full retrain requested'
+    if args.incremental:
+        mode, reason = incremental_plan(previous, args.layout, horizons, feature_cols, len(df), args.full_every)
+        print(f"Refresh mode: {mode} ({reason})")
+        if mode == 'skip':
+            return
 
-    all_metrics = {}
+    params_base = default_params(args.learning_rate, args.seed)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs > 1:
+        params_base['num_threads'] = thread_budget(jobs)
+    dataset_files = None
+    if args.dataset_cache:
+        aligned = list(range(1, default_horizon+1)) if args.layout == 'shared' else horizons
+        dataset_files = cache_datasets(df[feature_cols], aligned, params_base, ticker_root / 'dataset_cache')
+    pool = None
+    if jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_task_data,
+                                   initargs=(df[feature_cols], df['close'], params_base, dataset_files))
+        print(f"Training with {jobs} worker processes x {params_base['num_threads']} LightGBM threads")
+    else:
+        _init_task_data(df[feature_cols], df['close'], params_base, dataset_files)
+
+    # training units: (model dir name, [(alignment horizon, step, quantile), ...])
+    if args.layout == 'shared':
+        # each step trained once on its largest usable window (align to the step itself)
+        units = [(SHARED_DIR, [(step, step, q) for step in range(1, default_horizon+1) for q in QUANTILES])]
+    else:
+        units = [(f'H{H}', [(H, step, q) for step in range(1, H+1) for q in QUANTILES]) for H in horizons]
+
+    version_root = new_version_dir(ticker)
+    print(f"Writing model version {version_root.name}")
+    unit_metrics = {}
+    fit_cpu = 0.0
+    fit_wall = 0.0
+    all_tasks = []
+    n_models = 0
     start_global = time.time()
-    for H in horizons:
-        print(f"=== Training horizon {H} ===")
-        targets = make_targets(df, H)
-        X_all = align_features(df[feature_cols], H)
-        horizon_dir = ticker_root / f'H{H}'
-        horizon_dir.mkdir(exist_ok=True)
-        metrics = {}
-        start = time.time()
-        for step, y in enumerate(targets, start=1):
-            step_metrics = {}
-            split_idx = int(len(X_all) * 0.9)
-            X_tr, X_val = X_all.iloc[:split_idx], X_all.iloc[split_idx:]
-            y_tr, y_val = y.iloc[:split_idx], y.iloc[split_idx:]
-            for q in QUANTILES:
-                model, path = train_step(X_tr, y_tr, q, step, horizon_dir, params_base)
-                pred_val = model.predict(X_val)
-                mae = mean_absolute_error(y_val, pred_val)
-                pb = pinball_loss(y_val.values, pred_val, q)
-                prefix = f'q{int(q*100)}'
-                step_metrics[f'{prefix}_mae'] = mae
-                step_metrics[f'{prefix}_pinball'] = pb
-            metrics[f'step_{step}'] = step_metrics
-            print(f"H{H} step {step}/{H} metrics: {step_metrics}")
-        all_metrics[f'H{H}'] = metrics
-        print(f"Finished horizon {H} in {time.time()-start:.1f}s")
+    try:
+        for name, unit_tasks in units:
+            print(f"=== Training {name} ({unit_tasks[-1][1]} steps) ===")
+            unit_dir = version_root / name
+            unit_dir.mkdir()
+            metrics = {}
+            model_map = {}
+            pickle_dir = unit_dir if args.artifact in ('pkl', 'both') else None
+            start = time.time()
+            if mode == 'incremental':
+                # continue each existing booster on the rows that entered the training split since
+                # the last run, plus some context rows already seen
+                existing = load_model_map(current_root / name, unit_tasks[-1][1], QUANTILES, cache=False)
+                tasks = []
+                for H, step, q in unit_tasks:
+                    key = (step, int(q*100))
+                    init = existing.model_string(key) if isinstance(existing, PackedModelMap) else existing[key].model_to_string()
+                    start_row = max(0, train_rows(previous['rows'], H) - args.context_rows)
+                    tasks.append((H, step, q, pickle_dir, init, start_row, args.extra_rounds))
+                if isinstance(existing, PackedModelMap):
+                    existing.close()
+            else:
+                tasks = [(H, step, q, pickle_dir, None, 0, NUM_BOOST_ROUND) for H, step, q in unit_tasks]
+            all_tasks.extend(tasks)
+            fit_start = time.perf_counter()
+            # map() yields in task order whatever the completion order -> deterministic metadata
+            results = pool.map(_fit_task, *zip(*tasks)) if pool else (_fit_task(*t) for t in tasks)
+            last_step = unit_tasks[-1][1]
+            for (_, step, q, *_), (model, q_metrics, seconds) in zip(tasks, results):
+                model_map[(step, int(q*100))] = model
+                metrics.setdefault(f'step_{step}', {}).update(q_metrics)
+                fit_cpu += seconds
+                n_models += 1
+                if q == QUANTILES[-1]:
+                    print(f"{name} step {step}/{last_step} metrics: {metrics[f'step_{step}']}")
+            fit_wall += time.perf_counter() - fit_start
+            if args.artifact in ('packed', 'both'):
+                pack_path = write_packed(unit_dir, model_map)
+                print(f"Packed {len(model_map)} models -> {pack_path}")
+            unit_metrics[name] = metrics
+            print(f"Finished {name} in {time.time()-start:.1f}s")
+    except BaseException:
+        shutil.rmtree(version_root, ignore_errors=True)  # never leave a partial version behind
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if args.layout == 'shared':
+        shared = unit_metrics[SHARED_DIR]
+        all_metrics = {f'H{H}': {f'step_{s}': shared[f'step_{s}'] for s in range(1, H+1)} for H in horizons}
+    else:
+        all_metrics = unit_metrics
+    wall = time.time() - start_global
+    print(f"Trained {n_models} models in {wall:.1f}s wall ({fit_wall:.1f}s fitting) with --jobs {jobs}; "
+          f"fit CPU time {fit_cpu:.1f}s -> CPU utilisation x{fit_cpu / max(fit_wall, 1e-9):.2f}")
+    if args.compare_serial:
+        serial = serial_fit_seconds(all_tasks, df[feature_cols], df['close'], params_base, dataset_files)
+        print(f"Serial baseline (--jobs 1): {serial:.1f}s fitting -> wall-clock speedup "
+              f"x{serial / max(fit_wall, 1e-9):.2f} with --jobs {jobs}")
 
+    trained_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    rounds = args.extra_rounds if mode == 'incremental' else NUM_BOOST_ROUND
     meta = {
         'ticker': args.ticker.upper(),
+        'version': version_root.name,
         'horizons': horizons,
         'default_horizon': default_horizon,
+        'layout': args.layout,
         'quantiles': QUANTILES,
         'feature_cols': feature_cols,
+        'feature_engine': args.feature_engine,
         'metrics': all_metrics,
-        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-        'rows': len(df)
+        'trained_at': trained_at,
+        'rows': len(df),
+        'data_end': str(pd.Timestamp(df['date'].iloc[-1]).date()),
+        'lineage': update_lineage(previous, mode, reason, trained_at, len(df), rounds),
     }
-    with open(ticker_root / 'metadata.json', 'w') as f:
+    with open(version_root / 'metadata.json', 'w') as f:
         json.dump(meta, f, indent=2)
-    print(f"Saved metadata to {ticker_root / 'metadata.json'} in {time.time()-start_global:.1f}s")
+    publish_version(ticker, version_root.name, keep=args.keep_versions)
+    print(f"Published {ticker} version {version_root.name} in {time.time()-start_global:.1f}s")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,118 @@
+"""Small in-process caches shared by the prediction service."""
+from __future__ import annotations
+from collections import OrderedDict
+import threading
+import time
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with optional per-entry TTL and hit/miss counters.
+
+    maxsize <= 0 disables caching (every get is a miss, put is a no-op); None leaves the entry
+    count unbounded. maxbytes bounds the summed sizeof(value) of the entries instead (or as well);
+    the most recently put entry is always kept, even if it alone exceeds the budget.
+    """
+
+    def __init__(self, maxsize: int | None = 256, ttl: float | None = None,
+                 maxbytes: int | None = None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._sizes: dict = {}  # key -> bytes (only when sizeof is set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self.evicted_bytes = 0
+
+    def _pop(self, key):
+        del self._data[key]
+        self.bytes -= self._sizes.pop(key, 0)
+
+    def _over(self) -> bool:
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            return True
+        return self.maxbytes is not None and self.bytes > self.maxbytes and len(self._data) > 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._pop(key)
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """get() without touching recency or the hit/miss counters (TTL is not checked)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return default if entry is None else entry[1]
+
+    def put(self, key, value):
+        if self.maxsize is not None and self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (expires_at, value)
+            if self.sizeof is not None:
+                self._sizes[key] = size
+                self.bytes += size
+            while self._over():
+                old = next(iter(self._data))
+                self.evicted_bytes += self._sizes.get(old, 0)
+                self._pop(old)
+                self.evictions += 1
+
+    def discard(self, key):
+        """Remove key if present (not counted as an eviction)."""
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def sizes(self) -> dict:
+        """key -> accounted bytes (empty unless the cache was built with sizeof)."""
+        with self._lock:
+            return dict(self._sizes)
+
+    def items(self) -> list:
+        """Snapshot of (key, value) pairs, least recently used first (expired entries included)."""
+        with self._lock:
+            return [(k, v) for k, (_, v) in self._data.items()]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        out = {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else None,
+        }
+        if self.sizeof is not None:
+            out.update(bytes=self.bytes, maxbytes=self.maxbytes, evicted_bytes=self.evicted_bytes)
+        return out
+
+
+__all__ = ['LRUCache']
@@ -0,0 +1,100 @@
+"""Bounded thread/process pool for running blocking forecast work off the event loop."""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import asyncio
+import os
+import threading
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when the pool already has max_workers running and max_queue waiting."""
+
+
+class BoundedExecutor:
+    """Async front for a worker pool with a concurrency cap, a wait queue limit and per-call timeout.
+
+    kind: 'thread' (default; shares in-process caches) or 'process' (scales CPU-bound work past
+    the GIL; each worker process keeps its own model/forecast caches).
+    """
+
+    def __init__(self, kind: str = 'thread', max_workers: int | None = None,
+                 max_queue: int = 64, timeout: float | None = 30.0):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0  # submitted and not finished (running + queued)
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == 'process':
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='forecast')
+        return self._pool
+
+    def _done(self, _fut):
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    async def run(self, fn, *args, timeout: float | None = None):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusy(f"{self._pending} forecasts pending")
+            self._pending += 1
+        try:
+            fut = self._get_pool().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # counts drop when the work really finishes, not when the caller gives up on it
+        fut.add_done_callback(self._done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            fut.cancel()  # only helps while still queued; running work cannot be interrupted
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    @property
+    def in_flight(self) -> int:
+        return min(self._pending, self.max_workers)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._pending - self.max_workers)
+
+    def stats(self) -> dict:
+        return {
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'timeout': self.timeout,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queue_depth,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+        }
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+__all__ = ['BoundedExecutor', 'ExecutorBusy']
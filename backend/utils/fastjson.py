@@ -0,0 +1,71 @@
+"""JSON encoding for the hot API responses: orjson when installed, the stdlib json module otherwise.
+
+FastAPI runs a returned dict through jsonable_encoder (a recursive Python walk over every
+value) before json.dumps. For a forecast with 2,000 historical rows that walk costs more than the
+forecast itself. Endpoints that return JSONBytesResponse(payload) skip it. orjson then writes
+float64 ndarrays straight from their buffers (OPT_SERIALIZE_NUMPY), and the fallback turns
+arrays into lists first.
+
+Both encoders write NaN/inf as null (JSON has no literal for them). The fallback encodes with
+allow_nan=False first and only on failure re-encodes a copy with the non-finite floats replaced,
+so finite payloads pay nothing for it.
+"""
+from __future__ import annotations
+import json
+import math
+
+import numpy as np
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+ENCODER = 'orjson' if orjson is not None else 'json'
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _finite(obj):
+    """obj with NaN/inf floats (also inside arrays) replaced by None, as orjson writes them."""
+    if isinstance(obj, float):  # includes np.float64
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _finite(obj.tolist())
+    return obj
+
+
+def _json_dumps(obj) -> str:
+    return json.dumps(obj, default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON for dicts/lists of str, int, float, None and NumPy arrays/scalars."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        return _json_dumps(obj).encode('utf-8')
+    except ValueError:  # NaN/inf somewhere: write them as null like orjson
+        return _json_dumps(_finite(obj)).encode('utf-8')
+
+
+class JSONBytesResponse(Response):
+    """JSONResponse encoded with dumps(); return it from an endpoint to bypass jsonable_encoder."""
+    media_type = 'application/json'
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+__all__ = ['dumps', 'JSONBytesResponse', 'ENCODER']
@@ -0,0 +1,252 @@
+"""TTL-cached market data in front of a price provider (yfinance in production).
+
+MarketDataCache.get(ticker) serves, in order:
+  1. the in-memory copy, if younger than `ttl`;
+  2. the on-disk copy (a price_store directory, survives restarts), if younger than `ttl`;
+  3. a stale copy (memory or disk) younger than `max_stale`, while a background refresh fetches
+     a new one (stale-while-revalidate);
+  4. otherwise a synchronous fetch from the provider (one fetch per ticker at a time).
+
+A provider is any callable ticker -> OHLCV DataFrame with a 'date' column; tests and the
+benchmarks use SyntheticProvider instead of the network.
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from pathlib import Path
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.utils import price_store
+from backend.utils.cache import LRUCache
+
+CACHE_DIR = price_store.DATA_DIR / 'market_cache'
+
+
+def yfinance_provider(ticker: str, period: str = '3y') -> pd.DataFrame:
+    """Daily auto-adjusted OHLCV for the last `period` from yfinance."""
+    import yfinance as yf
+    df = yf.download(ticker, period=period, auto_adjust=True, progress=False)
+    if df.empty:
+        raise ValueError('empty download')
+    df.reset_index(inplace=True)
+    df.rename(columns={c: c.lower() for c in df.columns}, inplace=True)
+    keep = [c for c in ['date','open','high','low','close','adj close','volume'] if c in df.columns]
+    df = df[keep]
+    if 'adj close' in df.columns and 'close' in df.columns:
+        df['close'] = df['adj close']
+        df.drop(columns=['adj close'], inplace=True)
+    return df
+
+
+class SyntheticProvider:
+    """Deterministic offline stand-in for yfinance_provider (per-ticker seeded random walk).
+
+    `delay` simulates network latency; `calls` counts fetches per ticker.
+    """
+
+    def __init__(self, rows: int = 756, delay: float = 0.0, end: str | None = None):
+        self.rows = rows
+        self.delay = delay
+        self.end = pd.Timestamp(end) if end else pd.Timestamp.today().normalize()
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker: str) -> pd.DataFrame:
+        with self._lock:
+            self.calls[ticker] = self.calls.get(ticker, 0) + 1
+        if self.delay:
+            time.sleep(self.delay)
+        seed = sum(ticker.encode()) * 7919 % (2**32)
+        rng = np.random.default_rng(seed)
+        dates = pd.bdate_range(end=self.end, periods=self.rows)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, self.rows)))
+        spread = np.abs(rng.normal(0, 0.01, self.rows)) * close
+        return pd.DataFrame({
+            'date': dates,
+            'open': close * (1 + rng.normal(0, 0.004, self.rows)),
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+            'volume': rng.integers(500_000, 5_000_000, self.rows),
+        })
+
+
+class MarketDataCache:
+    """Two-tier (memory + price_store on disk) TTL cache with stale-while-revalidate.
+
+    ttl: seconds a fetched copy is served without refreshing.
+    max_stale: seconds a copy may still be served (while refreshing in the background);
+               None serves stale data indefinitely, 0 disables stale serving.
+    cache_dir: price_store root for the disk tier; None keeps the cache memory-only.
+    memory_entries: tickers kept in memory (least recently used are dropped and served from the
+                    disk tier next time); None leaves the memory tier unbounded.
+    """
+
+    def __init__(self, provider, ttl: float = 3600.0, max_stale: float | None = 86400.0,
+                 cache_dir: Path | None = CACHE_DIR, refresh_workers: int = 2, clock=time.time,
+                 memory_entries: int | None = 256):
+        self.provider = provider
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.clock = clock
+        self._memory = LRUCache(maxsize=memory_entries)  # ticker -> (fetched_at, df)
+        self._lock = threading.Lock()
+        self._fetch_locks: dict[str, threading.Lock] = {}
+        self._refreshing: dict[str, Future] = {}
+        self._refresh_workers = refresh_workers
+        self._pool = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.fetches = 0
+        self.fetch_seconds = 0.0
+
+    def _age(self, fetched_at: float) -> float:
+        return self.clock() - fetched_at
+
+    def _servable(self, fetched_at: float) -> bool:
+        return self.max_stale is None or self._age(fetched_at) <= self.max_stale
+
+    def _from_disk(self, ticker: str) -> tuple[float, pd.DataFrame] | None:
+        if self.cache_dir is None or not price_store.exists(ticker, self.cache_dir):
+            return None
+        fetched_at = price_store.read_meta(ticker, self.cache_dir).get('fetched_at')
+        if fetched_at is None:
+            return None
+        return fetched_at, price_store.read(ticker, root=self.cache_dir)
+
+    def _fetch(self, ticker: str) -> pd.DataFrame:
+        start = time.perf_counter()
+        df = self.provider(ticker)
+        fetched_at = self.clock()
+        with self._lock:
+            self.fetches += 1
+            self.fetch_seconds += time.perf_counter() - start
+        if self.cache_dir is not None:
+            # fetched_at is committed with the columns: a reader never pairs new bars with an old timestamp
+            price_store.write(ticker, df, self.cache_dir, fetched_at=fetched_at)
+            df = price_store.read(ticker, root=self.cache_dir)
+        with self._lock:
+            self._memory.put(ticker, (fetched_at, df))
+        return df
+
+    def _fetch_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            return self._fetch_locks.setdefault(ticker, threading.Lock())
+
+    def _refresh(self, ticker: str):
+        try:
+            with self._fetch_lock(ticker):  # never races a foreground fetch of the same ticker
+                self._fetch(ticker)
+            with self._lock:
+                self.refreshes += 1
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1  # keep serving the stale copy
+
+    def _schedule_refresh(self, ticker: str):
+        with self._lock:
+            if ticker in self._refreshing:
+                return
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._refresh_workers,
+                                                thread_name_prefix='market-refresh')
+            # registered under the lock: concurrent stale hits schedule a single refresh
+            fut = Future()
+            self._refreshing[ticker] = fut
+        def done(_inner):
+            with self._lock:
+                self._refreshing.pop(ticker, None)
+            fut.set_result(None)
+        self._pool.submit(self._refresh, ticker).add_done_callback(done)
+
+    def get(self, ticker: str) -> pd.DataFrame:
+        ticker = ticker.upper()
+        with self._lock:
+            entry = self._memory.get(ticker)
+        tier = 'memory'
+        if entry is None:
+            entry = self._from_disk(ticker)
+            tier = 'disk'
+            if entry is not None:
+                with self._lock:
+                    if self._memory.peek(ticker) is None:
+                        self._memory.put(ticker, entry)
+        if entry is not None:
+            fetched_at, df = entry
+            if self._age(fetched_at) <= self.ttl:
+                with self._lock:
+                    if tier == 'memory':
+                        self.memory_hits += 1
+                    else:
+                        self.disk_hits += 1
+                return df
+            if self._servable(fetched_at):
+                with self._lock:
+                    self.stale_hits += 1
+                self._schedule_refresh(ticker)
+                return df
+
+        # nothing servable: fetch now, once per ticker even under concurrent requests
+        with self._fetch_lock(ticker):
+            with self._lock:
+                entry = self._memory.get(ticker)
+            if entry is not None and self._age(entry[0]) <= self.ttl:
+                with self._lock:
+                    self.memory_hits += 1
+                return entry[1]
+            with self._lock:
+                self.misses += 1
+            return self._fetch(ticker)
+
+    def wait_refreshes(self, timeout: float | None = None):
+        """Block until background refreshes scheduled so far have finished (tests, shutdown)."""
+        with self._lock:
+            pending = list(self._refreshing.values())
+        wait(pending, timeout=timeout)
+
+    def invalidate(self, ticker: str | None = None):
+        """Drop the in-memory copy of one ticker (or all); the disk tier is kept."""
+        with self._lock:
+            if ticker is None:
+                self._memory.clear()
+            else:
+                self._memory.discard(ticker.upper())
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits + self.stale_hits
+            total = hits + self.misses
+            return {
+                'tickers': len(self._memory),
+                'memory_entries': self._memory.maxsize,
+                'memory_evictions': self._memory.evictions,
+                'ttl': self.ttl,
+                'max_stale': self.max_stale,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'refreshing': len(self._refreshing),
+                'hit_rate': round(hits / total, 4) if total else None,
+                'fetches': self.fetches,
+                'avg_fetch_ms': round(self.fetch_seconds / self.fetches * 1e3, 2) if self.fetches else None,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ['MarketDataCache', 'SyntheticProvider', 'yfinance_provider', 'CACHE_DIR']
@@ -0,0 +1,164 @@
+"""Per-stage latency histograms and counters for the prediction service, in Prometheus text format.
+
+Recording is a perf_counter pair, a bisect and two list increments under a lock (~1 µs); nothing
+is formatted until /metrics is scraped. No prometheus_client dependency: render() writes the
+text exposition format (version 0.0.4) directly.
+
+    with METRICS.stage('load_models', ticker, horizon):
+        bundle = load_models(...)
+
+trace() additionally collects the stage durations of the calling thread into a dict (per-request
+profiling); outside a trace that costs one thread-local lookup per stage.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+import threading
+import time
+
+# seconds; forecasts range from ~1 ms (cached) to seconds (cold load / download)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs) -> str:
+    return ','.join(f'{k}="{_escape(v)}"' for k, v in pairs)
+
+
+class _StageTimer:
+    __slots__ = ('metrics', 'key', 'start')
+
+    def __init__(self, metrics: 'StageMetrics', key: tuple):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # failed stages are not recorded: unknown tickers must not create label series
+        if exc_type is None:
+            self.metrics._record(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Trace:
+    __slots__ = ('metrics', 'stages', 'outer')
+
+    def __init__(self, metrics: 'StageMetrics'):
+        self.metrics = metrics
+        self.stages: dict[str, float] = {}  # stage -> seconds
+
+    def __enter__(self) -> dict[str, float]:
+        local = self.metrics._local
+        self.outer = getattr(local, 'trace', None)
+        local.trace = self.stages
+        return self.stages
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._local.trace = self.outer
+        return False
+
+
+class StageMetrics:
+    """Histograms of stage durations labeled (stage, ticker, horizon) plus labeled counters."""
+
+    def __init__(self, prefix: str = 'forecast', buckets: tuple = BUCKETS, enabled: bool = True):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._hist: dict[tuple, list] = {}  # (stage, ticker, horizon) -> [per-bucket counts..., +Inf, sum]
+        self._counters: dict[tuple, float] = {}  # (name, ((label, value), ...)) -> value
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stage(self, stage: str, ticker: str = '', horizon='') -> _StageTimer | _NullTimer:
+        """Context manager timing one stage of one request."""
+        if not self.enabled and getattr(self._local, 'trace', None) is None:
+            return _NULL_TIMER
+        return _StageTimer(self, (stage, ticker, str(horizon)))
+
+    def observe(self, stage: str, seconds: float, ticker: str = '', horizon=''):
+        self._record((stage, ticker, str(horizon)), seconds)
+
+    def trace(self) -> '_Trace':
+        """Context manager collecting this thread's stage durations: `with m.trace() as stages:`."""
+        return _Trace(self)
+
+    def _record(self, key: tuple, seconds: float):
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace[key[0]] = trace.get(key[0], 0.0) + seconds
+        if self.enabled:
+            self._observe(key, seconds)
+
+    def _observe(self, key: tuple, seconds: float):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            h = self._hist.get(key)
+            if h is None:
+                h = self._hist[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            h[i] += 1
+            h[-1] += seconds
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+
+    def render(self, gauges: dict[str, float] | None = None) -> str:
+        """Prometheus text exposition of every histogram, counter and the given gauges."""
+        with self._lock:
+            hist = {k: list(v) for k, v in self._hist.items()}
+            counters = dict(self._counters)
+        name = f'{self.prefix}_stage_seconds'
+        lines = [f'# HELP {name} Time spent per forecast stage.', f'# TYPE {name} histogram']
+        bounds = [repr(b) for b in self.buckets] + ['+Inf']
+        for (stage, ticker, horizon), h in sorted(hist.items()):
+            base = _labels((('stage', stage), ('ticker', ticker), ('horizon', horizon)))
+            cumulative = 0
+            for bound, count in zip(bounds, h[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{base}}} {h[-1]!r}')
+            lines.append(f'{name}_count{{{base}}} {cumulative}')
+        by_name: dict[str, list] = {}
+        for (cname, labels), value in sorted(counters.items()):
+            by_name.setdefault(cname, []).append((labels, value))
+        for cname, series in by_name.items():
+            full = f'{self.prefix}_{cname}_total'
+            lines.append(f'# TYPE {full} counter')
+            for labels, value in series:
+                lines.append(f'{full}{{{_labels(labels)}}} {value}' if labels else f'{full} {value}')
+        for gname, value in (gauges or {}).items():
+            if value is None:
+                continue
+            lines.append(f'# TYPE {gname} gauge')
+            lines.append(f'{gname} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+__all__ = ['StageMetrics', 'BUCKETS']
@@ -4,23 +4,204 @@ Supports both legacy single-horizon layout:
     models/TICKER/step_{step}_q{quant}.pkl + metadata.json (with 'horizon')
 and new multi-horizon layout:
     models/TICKER/H{H}/step_{step}_q{quant}.pkl + metadata.json (with 'horizons')
+and shared-steps layout (metadata 'layout': 'shared'):
+    models/TICKER/shared/... holding steps 1..max(horizons) once; any horizon up to that is served
 Use load_models(ticker, horizon=None) to pick a specific horizon. If not provided,
 defaults to metadata['default_horizon'] if multi-horizon, else metadata['horizon'].
+
+Packed artifacts: instead of one pickle per (step, quantile) a model directory may hold a
+single `models.pack` file (see write_packed). It is memory-mapped on load and each booster
+is deserialized lazily on first use. When both formats exist the packed file wins.
+
+Versioned registry: the trainer writes a complete model set to models/TICKER/versions/<version>/
+and then atomically replaces models/TICKER/CURRENT (a one-line pointer file). Readers resolve the
+pointer on every call (a stat, re-read only when it changed), so a running service picks up a
+new version on its next request while in-flight requests keep the bundle they already hold.
+Tickers without CURRENT use the flat models/TICKER/ layout.
+
+CLI:
+    python -m backend.utils.model_loader pack AAPL MSFT   # convert legacy pickles to packs
 """
 from __future__ import annotations
 from pathlib import Path
+from collections.abc import Mapping
 import json
-import joblib
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import threading
+import time
+import weakref
+import numpy as np
 from functools import lru_cache
 
+from backend.utils.cache import LRUCache
+
 MODELS_DIR = Path(__file__).resolve().parent.parent / 'models'
 
+PACK_FILE = 'models.pack'
+SHARED_DIR = 'shared'
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+PACK_MAGIC = b'SPPACK01'
+_HEADER = struct.Struct('<8sQ')  # magic, index length
+# resident bytes of a deserialized LightGBM booster per byte of its text dump (measured ~1.5x:
+# the booster keeps the parsed trees plus the text itself)
+BOOSTER_MEMORY_FACTOR = 1.5
+
+
+def _encode_model(model) -> tuple[str, bytes]:
+    # LightGBM boosters are stored as their native text dump (what pickling does internally anyway)
+    if hasattr(model, 'model_to_string'):
+        return 'lgb', model.model_to_string().encode('utf-8')
+    return 'pickle', pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_model(kind: str, raw: bytes):
+    if kind == 'lgb':
+        import lightgbm as lgb
+        return lgb.Booster(model_str=raw.decode('utf-8'))
+    return pickle.loads(raw)
+
+
+def write_packed(out_dir: Path, model_map: dict) -> Path:
+    """Write every (step, quantile_int) -> model entry of model_map into out_dir/models.pack.
+
+    Layout: magic | u64 index length | JSON index | concatenated model blobs.
+    The file is written to a temp name and renamed so readers never see a partial pack.
+    """
+    out_path = Path(out_dir) / PACK_FILE
+    blobs = []
+    entries = {}
+    offset = 0
+    for (step, q_int) in sorted(model_map):
+        kind, raw = _encode_model(model_map[(step, q_int)])
+        entries[f'{step}:{q_int}'] = [offset, len(raw), kind]
+        blobs.append(raw)
+        offset += len(raw)
+    index = json.dumps({'version': 1, 'entries': entries}).encode('utf-8')
+    tmp_path = out_path.with_suffix('.pack.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(PACK_MAGIC, len(index)))
+        f.write(index)
+        for raw in blobs:
+            f.write(raw)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class PackedModelMap(Mapping):
+    """Read-only (step, quantile_int) -> model mapping backed by a memory-mapped pack file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = _HEADER.unpack_from(self._buf, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"Not a model pack: {self.path}")
+        start = _HEADER.size
+        index = json.loads(self._buf[start:start + index_len])
+        self._data_start = start + index_len
+        self._index = {}
+        for key, (offset, length, kind) in index['entries'].items():
+            step, q_int = key.split(':')
+            self._index[(int(step), int(q_int))] = (offset, length, kind)
+        self._models = {}
+
+    def __getitem__(self, key):
+        model = self._models.get(key)
+        if model is None:
+            offset, length, kind = self._index[key]
+            begin = self._data_start + offset
+            model = _decode_model(kind, self._buf[begin:begin + length])
+            self._models[key] = model
+        return model
+
+    def serialized_bytes(self, keys) -> int:
+        """Summed blob size of the given entries (what they cost once deserialized, roughly)."""
+        return sum(self._index[k][1] for k in keys)
+
+    def model_string(self, key) -> str:
+        """LightGBM text dump of one entry, read straight from the pack (no Booster built)."""
+        offset, length, kind = self._index[key]
+        if kind != 'lgb':
+            return self[key].model_to_string()
+        begin = self._data_start + offset
+        return self._buf[begin:begin + length].decode('utf-8')
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def close(self):
+        """Release the memory map (boosters already built stay usable)."""
+        self._buf.close()
+
+    @property
+    def loaded(self) -> int:
+        """Number of boosters deserialized so far."""
+        return len(self._models)
+
+
 class ModelBundle:
-    def __init__(self, ticker: str, metadata: dict, horizon: int, model_map: dict):
+    # the array evaluator beats Booster.predict only while per-call overhead dominates;
+    # bigger batches go through the boosters (see tree_engine CLI for the crossover)
+    COMPILED_MAX_ROWS = 2
+
+    def __init__(self, ticker: str, metadata: dict, horizon: int, model_map: Mapping, version: str | None = None):
         self.ticker = ticker
         self.metadata = metadata
         self.horizon = horizon
         self.model_map = model_map  # (step, quantile_int) -> model
+        self.version = version  # registry version (None for the flat layout)
+        self.compiled = None  # CompiledForest when loaded with engine='compiled'
+        self.serialized_bytes = 0  # on-disk size of the models it serves (set by load_models)
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated resident size: every served booster deserialized, plus the compiled forest.
+
+        An upper estimate: packed boosters decode lazily, and bundles of several horizons over one
+        shared step set each count the shared boosters.
+        """
+        total = int(self.serialized_bytes * BOOSTER_MEMORY_FACTOR)
+        if self.compiled is not None:
+            total += self.compiled.nbytes
+        return total
+
+    def compile(self) -> 'ModelBundle':
+        """Flatten every step/quantile booster into one array-based forest (see tree_engine).
+
+        For packed artifacts the result is cached next to the pack (compiled_H{h}.npz) and
+        reused while it is newer than the pack.
+        """
+        from backend.utils.tree_engine import CompiledForest
+        cache_path = None
+        if isinstance(self.model_map, PackedModelMap):
+            cache_path = self.model_map.path.with_name(f'compiled_H{self.horizon}.npz')
+            if cache_path.exists() and cache_path.stat().st_mtime >= self.model_map.path.stat().st_mtime:
+                self.compiled = CompiledForest.load(cache_path)
+                return self
+        keys = [(step, int(q*100)) for step in range(1, self.horizon+1) for q in self.quantiles]
+        if isinstance(self.model_map, PackedModelMap):
+            strings = [self.model_map.model_string(k) for k in keys]
+        else:
+            strings = [self.model_map[k].model_to_string() for k in keys]
+        self.compiled = CompiledForest.from_model_strings(strings)
+        if cache_path is not None:
+            try:
+                self.compiled.save(cache_path)
+            except OSError:
+                pass  # read-only model dir: compile again next time
+        return self
 
     def predict_step_quantile(self, step: int, q: float, features_row):
         q_int = int(q*100)
@@ -30,36 +211,158 @@ class ModelBundle:
             raise FileNotFoundError(f"Model missing for step {step} q{q} (horizon {self.horizon})")
         return float(model.predict(features_row)[0])
 
-@lru_cache(maxsize=16)
-def load_metadata(ticker: str) -> dict:
-    meta_path = MODELS_DIR / ticker / 'metadata.json'
-    if not meta_path.exists():
-        raise FileNotFoundError(f"Metadata not found for {ticker}")
-    with open(meta_path) as f:
+    @property
+    def quantiles(self) -> list[float]:
+        return self.metadata['quantiles']
+
+    def predict_all(self, X, steps: range | None = None) -> np.ndarray:
+        """Predict every step & quantile in one pass.
+
+        X is a single feature vector (n_features,) or a batch (rows, n_features). Returns a
+        (steps, quantiles) matrix for a vector, (rows, steps, quantiles) for a batch; the
+        quantile axis follows metadata['quantiles']. steps (1-based, e.g. range(1, 31)) limits
+        the step axis; the compiled forest still evaluates every step and slices.
+        """
+        if steps is None:
+            steps = range(1, self.horizon+1)
+        X = np.asarray(X, dtype=np.float64)
+        single = X.ndim == 1
+        X2 = np.ascontiguousarray(X.reshape(1, -1) if single else X)
+        q_ints = [int(q*100) for q in self.quantiles]
+        if self.compiled is not None and X2.shape[0] <= self.COMPILED_MAX_ROWS:
+            out = self.compiled.predict(X2).reshape(X2.shape[0], self.horizon, len(q_ints))
+            out = out[:, steps.start-1:steps.stop-1]
+            return out[0] if single else out
+        out = np.empty((X2.shape[0], len(steps), len(q_ints)))
+        for i, step in enumerate(steps):
+            for j, q_int in enumerate(q_ints):
+                model = self.model_map.get((step, q_int))
+                if model is None:
+                    raise FileNotFoundError(f"Model missing for step {step} q{q_int} (horizon {self.horizon})")
+                out[:, i, j] = model.predict(X2)
+        return out[0] if single else out
+
+# ticker -> ((pointer path, mtime_ns, size), version named by its CURRENT file); the path is part of the
+# stamp so a changed MODELS_DIR is never answered from another root's pointer
+_POINTERS: dict[str, tuple[tuple, str | None]] = {}
+
+
+def current_version(ticker: str) -> str | None:
+    """Version named by models/TICKER/CURRENT, or None for the flat layout."""
+    # plain os.path strings: this runs on every request
+    pointer = os.path.join(MODELS_DIR, ticker, CURRENT_FILE)
+    try:
+        st = os.stat(pointer)
+    except FileNotFoundError:
+        return None
+    stamp = (pointer, st.st_mtime_ns, st.st_size)
+    cached = _POINTERS.get(ticker)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(pointer) as f:
+        version = f.read().strip() or None
+    _POINTERS[ticker] = (stamp, version)
+    return version
+
+
+def _root_str(ticker: str, version: str | None) -> str:
+    if version is None:
+        return os.path.join(MODELS_DIR, ticker)
+    return os.path.join(MODELS_DIR, ticker, VERSIONS_DIR, version)
+
+
+def model_root(ticker: str, version: str | None = None) -> Path:
+    """Directory holding metadata.json + model dirs of the current (or given) version."""
+    return Path(_root_str(ticker, version or current_version(ticker)))
+
+
+def list_versions(ticker: str) -> list[str]:
+    vdir = MODELS_DIR / ticker / VERSIONS_DIR
+    if not vdir.exists():
+        return []
+    return sorted(p.name for p in vdir.iterdir() if p.is_dir() and (p / 'metadata.json').exists())
+
+
+def new_version_dir(ticker: str) -> Path:
+    """Create and return an empty models/TICKER/versions/<UTC timestamp> directory."""
+    vroot = MODELS_DIR / ticker / VERSIONS_DIR
+    vroot.mkdir(parents=True, exist_ok=True)
+    base = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+    for n in range(1000):
+        path = vroot / (base if n == 0 else f'{base}-{n}')
+        try:
+            path.mkdir()
+            return path
+        except FileExistsError:
+            continue
+    raise RuntimeError(f"Could not allocate a version directory under {vroot}")
+
+
+def publish_version(ticker: str, version: str, keep: int = 3) -> Path:
+    """Atomically point models/TICKER/CURRENT at `version`; prune all but the newest `keep` versions.
+
+    The previous versions are kept (keep >= 2) so requests still holding them can finish.
+    """
+    tdir = MODELS_DIR / ticker
+    if not (tdir / VERSIONS_DIR / version / 'metadata.json').exists():
+        raise FileNotFoundError(f"Version {version} of {ticker} has no metadata.json")
+    tmp = tdir / (CURRENT_FILE + '.tmp')
+    tmp.write_text(version + '\n')
+    os.replace(tmp, tdir / CURRENT_FILE)
+    if keep > 0:
+        for old in list_versions(ticker)[:-keep]:
+            if old != version:
+                shutil.rmtree(tdir / VERSIONS_DIR / old, ignore_errors=True)
+    return tdir / VERSIONS_DIR / version
+
+
+@lru_cache(maxsize=64)
+def _read_metadata(path: str, mtime_ns: int) -> dict:
+    with open(path) as f:
         return json.load(f)
 
-@lru_cache(maxsize=32)
-def load_models(ticker: str, horizon: int | None = None):
-    meta = load_metadata(ticker)
 
-    # Determine horizon list & target horizon
+def load_metadata(ticker: str) -> dict:
+    meta_path = os.path.join(_root_str(ticker, current_version(ticker)), 'metadata.json')
+    try:
+        mtime_ns = os.stat(meta_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Metadata not found for {ticker}") from None
+    return _read_metadata(meta_path, mtime_ns)
+
+
+def resolve_model_dir(ticker: str, meta: dict, horizon: int | None = None,
+                      root: Path | None = None) -> tuple[Path, int]:
+    """Return (directory holding the step models, effective horizon) for a ticker.
+
+    root: version directory the metadata came from (default: the current model_root).
+    """
+    root = root or model_root(ticker)
+    if meta.get('layout') == 'shared':
+        max_step = max(meta['horizons'])
+        if horizon is None:
+            horizon = meta.get('default_horizon', max_step)
+        if not 1 <= horizon <= max_step:
+            raise ValueError(f"Requested horizon {horizon} outside the shared steps 1..{max_step}")
+        return root / SHARED_DIR, horizon
     if 'horizons' in meta:
         horizons = meta['horizons']
         if horizon is None:
             horizon = meta.get('default_horizon', horizons[-1])
         if horizon not in horizons:
             raise ValueError(f"Requested horizon {horizon} not in trained horizons {horizons}")
-        base_dir = MODELS_DIR / ticker / f'H{horizon}'
-        effective_horizon = horizon
-    else:  # legacy
-        effective_horizon = meta['horizon']
-        if horizon and horizon != effective_horizon:
-            raise ValueError(f"Model only trained for horizon {effective_horizon}")
-        base_dir = MODELS_DIR / ticker
+        return root / f'H{horizon}', horizon
+    # legacy
+    effective_horizon = meta['horizon']
+    if horizon and horizon != effective_horizon:
+        raise ValueError(f"Model only trained for horizon {effective_horizon}")
+    return root, effective_horizon
 
+
+def _load_pickles(base_dir: Path, horizon: int, quantiles: list[float]) -> dict:
+    import joblib  # legacy format only; packs need neither joblib nor its multiprocessing imports
     model_map = {}
-    quantiles = meta['quantiles']
-    for step in range(1, effective_horizon+1):
+    for step in range(1, horizon+1):
         for q in quantiles:
             q_int = int(q*100)
             p = base_dir / f'step_{step}_q{q_int}.pkl'
@@ -67,6 +370,184 @@ def load_models(ticker: str, horizon: int | None = None):
                 model_map[(step, q_int)] = joblib.load(p)
             else:
                 raise FileNotFoundError(f"Missing model file {p}")
-    return ModelBundle(ticker, meta, effective_horizon, model_map)
+    return model_map
+
+
+_PACKS: weakref.WeakValueDictionary = weakref.WeakValueDictionary()  # (path, mtime_ns) -> map
+_PACKS_LOCK = threading.Lock()
+
+
+def _open_pack(path: str, mtime_ns: int) -> PackedModelMap:
+    # one map per pack file version while any bundle holds it: bundles of different horizons over
+    # a shared step set reuse the same boosters, and evicting the last such bundle frees them
+    with _PACKS_LOCK:
+        model_map = _PACKS.get((path, mtime_ns))
+        if model_map is None:
+            model_map = PackedModelMap(Path(path))
+            _PACKS[(path, mtime_ns)] = model_map
+        return model_map
+
+
+def _serialized_bytes(model_map: Mapping, base_dir: Path, horizon: int, quantiles: list[float]) -> int:
+    keys = [(step, int(q*100)) for step in range(1, horizon+1) for q in quantiles]
+    if isinstance(model_map, PackedModelMap):
+        return model_map.serialized_bytes(keys)
+    return sum(os.path.getsize(base_dir / f'step_{step}_q{q_int}.pkl') for step, q_int in keys)
+
+
+def _load_packed(base_dir: Path, horizon: int, quantiles: list[float], cache: bool = True) -> PackedModelMap:
+    path = base_dir / PACK_FILE
+    model_map = _open_pack(str(path), path.stat().st_mtime_ns) if cache else PackedModelMap(path)
+    for step in range(1, horizon+1):
+        for q in quantiles:
+            if (step, int(q*100)) not in model_map:
+                raise FileNotFoundError(f"Missing step {step} q{q} in {model_map.path}")
+    return model_map
+
+
+def load_model_map(base_dir: Path, horizon: int, quantiles: list[float], artifact: str = 'auto',
+                   cache: bool = True) -> Mapping:
+    """(step, quantile_int) -> model for steps 1..horizon of one model directory.
+
+    artifact: 'auto' (packed file if present, else pickles), 'packed' or 'pkl'.
+    cache=False opens a private pack map (caller closes it, e.g. before rewriting the pack).
+    """
+    if artifact == 'auto':
+        artifact = 'packed' if (base_dir / PACK_FILE).exists() else 'pkl'
+    if artifact == 'packed':
+        return _load_packed(base_dir, horizon, quantiles, cache)
+    if artifact == 'pkl':
+        return _load_pickles(base_dir, horizon, quantiles)
+    raise ValueError(f"Unknown artifact format {artifact!r}")
+
+
+# (ticker, horizon, artifact, engine) -> (version stamp, ModelBundle); a stale stamp means reload.
+# Bounded by estimated resident bytes (ModelBundle.nbytes), not entry count: an H365 bundle holds
+# ~70x the boosters of an H5 one. MODEL_CACHE_MB=0 disables the bound.
+MODEL_CACHE_BYTES = int(float(os.getenv('MODEL_CACHE_MB', '2048')) * 2**20) or None
+_BUNDLES = LRUCache(maxsize=None, maxbytes=MODEL_CACHE_BYTES, sizeof=lambda entry: entry[1].nbytes)
+# bundles of superseded versions requested explicitly (load_models(version=...)) by requests that
+# started before a publish; kept apart so they never displace the current version in _BUNDLES
+_PINNED = LRUCache(maxsize=4, ttl=600)
+_LOAD_LOCKS: dict[tuple, threading.Lock] = {}  # bundle cache key -> lock held while loading it
+_LOAD_LOCKS_GUARD = threading.Lock()
+
+
+def _load_lock(key: tuple) -> threading.Lock:
+    """Loader lock of one bundle cache key. Creating one drops the idle locks of keys no longer in
+    _BUNDLES/_PINNED, so the table stays as small as the caches plus the loads in progress."""
+    with _LOAD_LOCKS_GUARD:
+        lock = _LOAD_LOCKS.get(key)
+        if lock is None:
+            # a dropped lock someone is about to take only costs a duplicate load, never a wrong bundle
+            for k in [k for k, l in _LOAD_LOCKS.items()
+                      if not l.locked() and _BUNDLES.peek(k) is None and _PINNED.peek(k) is None]:
+                del _LOAD_LOCKS[k]
+            lock = _LOAD_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def load_models(ticker: str, horizon: int | None = None, artifact: str = 'auto', engine: str = 'lightgbm',
+                version: str | None = None):
+    """Load the step/quantile models for a ticker (cached per model version).
+
+    artifact: 'auto' (packed file if present, else pickles), 'packed' or 'pkl'.
+    engine: 'lightgbm' (Booster.predict per model) or 'compiled' (array-based tree_engine).
+    version: registry version to load instead of the current one. A request that loads models
+    more than once (a streamed forecast, one call per chunk) passes the first bundle's version.
+    """
+    current = current_version(ticker)
+    pinned = version is not None and version != current
+    if not pinned:
+        version = current
+    root = _root_str(ticker, version)
+    meta_path = os.path.join(root, 'metadata.json')
+    try:
+        stamp = (version, os.stat(meta_path).st_mtime_ns)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Metadata not found for {ticker}" + (f" version {version}" if pinned else '')) from None
+    cache = _PINNED if pinned else _BUNDLES
+    key = (ticker, horizon, artifact, engine) + ((version,) if pinned else ())
+    cached = cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _load_lock(key):  # one loader per key; concurrent callers then find the fresh bundle
+        cached = cache.peek(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        meta = _read_metadata(meta_path, stamp[1])
+        base_dir, effective_horizon = resolve_model_dir(ticker, meta, horizon, Path(root))
+        model_map = load_model_map(base_dir, effective_horizon, meta['quantiles'], artifact)
+        bundle = ModelBundle(ticker, meta, effective_horizon, model_map, version=version)
+        bundle.serialized_bytes = _serialized_bytes(model_map, base_dir, effective_horizon, meta['quantiles'])
+        if engine == 'compiled':
+            bundle.compile()
+        elif engine != 'lightgbm':
+            raise ValueError(f"Unknown inference engine {engine!r}")
+        cache.put(key, (stamp, bundle))
+        return bundle
+
+
+def loaded_bundles() -> list[dict]:
+    """Summary of the bundles currently cached (for admin/diagnostics)."""
+    out = []
+    sizes = _BUNDLES.sizes()
+    for key, (stamp, bundle) in _BUNDLES.items():
+        ticker, horizon, artifact, engine = key
+        out.append({'ticker': ticker, 'requested_horizon': horizon, 'horizon': bundle.horizon,
+                    'engine': engine, 'artifact': artifact, 'version': stamp[0],
+                    'bytes': sizes.get(key, 0)})
+    return out
+
+
+def model_cache_stats() -> dict:
+    """Hits, misses, evictions and accounted resident bytes of the bundle cache."""
+    return _BUNDLES.stats()
+
+
+def clear_caches():
+    """Drop every cached bundle, metadata file, pointer and pack map."""
+    _BUNDLES.clear()
+    _PINNED.clear()
+    with _LOAD_LOCKS_GUARD:
+        _LOAD_LOCKS.clear()
+    _POINTERS.clear()
+    _read_metadata.cache_clear()
+    with _PACKS_LOCK:
+        _PACKS.clear()
+
+
+def pack_ticker(ticker: str) -> list[Path]:
+    """Convert every legacy pickle model directory of a ticker into a packed artifact."""
+    meta = load_metadata(ticker)
+    root = model_root(ticker)
+    if meta.get('layout') == 'shared':
+        horizons = [max(meta['horizons'])]  # one directory holds every step
+    else:
+        horizons = meta['horizons'] if 'horizons' in meta else [None]
+    written = []
+    for h in horizons:
+        base_dir, effective_horizon = resolve_model_dir(ticker, meta, h, root)
+        model_map = _load_pickles(base_dir, effective_horizon, meta['quantiles'])
+        written.append(write_packed(base_dir, model_map))
+    return written
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description='Model artifact utilities')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p_pack = sub.add_parser('pack', help='Convert legacy per-step pickles into models.pack files')
+    p_pack.add_argument('tickers', nargs='+')
+    args = ap.parse_args()
+
+    if args.cmd == 'pack':
+        for t in args.tickers:
+            for path in pack_ticker(t.upper()):
+                print(f"Packed {t.upper()} -> {path} ({path.stat().st_size/1e6:.1f} MB)")
+
+__all__ = ['load_models','load_metadata','load_model_map','current_version','model_root','list_versions',
+           'new_version_dir','publish_version','loaded_bundles','model_cache_stats','clear_caches','ModelBundle','PackedModelMap','write_packed','resolve_model_dir','PACK_FILE','SHARED_DIR']
 
-__all__ = ['load_models','load_metadata','ModelBundle']
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""Columnar, memory-mapped local price store (replaces backend/data/{TICKER}.csv).
+
+Layout, one directory per ticker:
+    data/store/TICKER/meta.json            {"version": 2, "rows": n, "columns": {"date": "datetime64[ns]", ...},
+                                            "files": {"date": "date.<gen>.bin", ...}}
+    data/store/TICKER/{column}.<gen>.bin   raw little-endian values, one file per column
+
+Dates are stored as int64 nanoseconds. Reads memory-map the column files, so opening a ticker
+costs a few syscalls regardless of history length and read(tail=N) only touches the last N
+rows.
+
+meta.json is the commit point. Readers only open the files it names, for the row count it
+names. write() puts a whole history into new files (a fresh <gen>) and then swaps meta.json
+atomically, so a reader never pairs a new row count with old columns or the reverse. The
+generation before the current one is kept, so readers that opened the old meta can finish.
+append() only adds bytes past the committed rows of the current files. Writers of a ticker
+(write, append, update_meta, CSV migration) are serialized by a per-ticker lock: a thread lock,
+plus an flock on TICKER/.lock so processes (CLI, service) exclude each other where fcntl exists.
+Version 1 stores ({column}.bin, no "files") are still read and are replaced on the next write().
+
+CLI:
+    python -m backend.utils.price_store migrate            # every data/*.csv
+    python -m backend.utils.price_store migrate AAPL MSFT
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import os
+import tempfile
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+STORE_DIR = DATA_DIR / 'store'
+META_FILE = 'meta.json'
+LOCK_FILE = '.lock'
+DATE_KIND = 'datetime64[ns]'
+READ_RETRIES = 3
+
+_LOCKS: dict[str, threading.RLock] = {}
+_LOCKS_GUARD = threading.Lock()
+_HELD = threading.local()  # ticker dirs whose flock this thread holds (writers nest, e.g. append -> write)
+
+
+def _ticker_dir(ticker: str, root: Path | None = None) -> Path:
+    return Path(root or STORE_DIR) / ticker.upper()
+
+
+def _read_meta(tdir: Path) -> dict:
+    with open(tdir / META_FILE) as f:
+        return json.load(f)
+
+
+def _write_meta(tdir: Path, meta: dict):
+    fd, tmp = tempfile.mkstemp(dir=tdir, prefix=META_FILE + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, tdir / META_FILE)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _files(meta: dict) -> dict[str, str]:
+    """Column name -> file name (version 1 stores use {column}.bin)."""
+    files = meta.get('files') or {}
+    return {name: files.get(name, f'{name}.bin') for name in meta['columns']}
+
+
+@contextmanager
+def _locked(tdir: Path):
+    """Hold the writer lock of one ticker directory (re-entrant within a thread)."""
+    key = str(tdir.resolve())
+    with _LOCKS_GUARD:
+        lock = _LOCKS.setdefault(key, threading.RLock())
+    with lock:
+        held = _HELD.__dict__.setdefault('dirs', set())
+        if fcntl is None or key in held:
+            yield
+            return
+        tdir.mkdir(parents=True, exist_ok=True)
+        with open(tdir / LOCK_FILE, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            held.add(key)
+            try:
+                yield
+            finally:
+                held.discard(key)
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _to_columns(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    if 'date' not in df.columns:
+        raise ValueError("price frame needs a 'date' column")
+    dates = pd.to_datetime(df['date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+    cols = {'date': dates.to_numpy(dtype='datetime64[ns]').view('<i8')}
+    for c in df.columns:
+        if c == 'date':
+            continue
+        if not pd.api.types.is_numeric_dtype(df[c]):
+            raise TypeError(f"price store only holds numeric columns, got {c!r} ({df[c].dtype})")
+        arr = df[c].to_numpy()
+        cols[c] = arr.astype(arr.dtype.newbyteorder('<'), copy=False)
+    return cols
+
+
+def _dtype(kind: str) -> np.dtype:
+    return np.dtype('<i8') if kind == DATE_KIND else np.dtype(kind)
+
+
+def read_meta(ticker: str, root: Path | None = None) -> dict:
+    """meta.json of a stored ticker (row count, column kinds and any update_meta() attributes)."""
+    return _read_meta(_ticker_dir(ticker, root))
+
+
+def update_meta(ticker: str, root: Path | None = None, **attrs):
+    """Record extra attributes (e.g. fetched_at) in a stored ticker's meta.json."""
+    tdir = _ticker_dir(ticker, root)
+    with _locked(tdir):
+        meta = _read_meta(tdir)
+        meta.update(attrs)
+        _write_meta(tdir, meta)
+
+
+def exists(ticker: str, root: Path | None = None) -> bool:
+    return (_ticker_dir(ticker, root) / META_FILE).exists()
+
+
+def write(ticker: str, df: pd.DataFrame, root: Path | None = None, **attrs) -> Path:
+    """Replace the stored history of a ticker with df (sorted by date).
+
+    attrs (e.g. fetched_at) go into the same meta.json commit as the new columns.
+    """
+    tdir = _ticker_dir(ticker, root)
+    df = df.sort_values('date', kind='stable')
+    cols = _to_columns(df)
+    gen = uuid.uuid4().hex[:12]
+    with _locked(tdir):
+        previous = _read_meta(tdir) if (tdir / META_FILE).exists() else None
+        kinds, files = {}, {}
+        try:
+            for name, arr in cols.items():
+                files[name] = f'{name}.{gen}.bin'
+                arr.tofile(tdir / files[name])
+                kinds[name] = DATE_KIND if name == 'date' else arr.dtype.str
+            _write_meta(tdir, {'version': 2, 'rows': len(df), 'columns': kinds, 'files': files, **attrs})
+        except BaseException:
+            for name in files.values():
+                (tdir / name).unlink(missing_ok=True)
+            raise
+        # keep the previous generation for readers that already hold its meta; drop older ones
+        keep = set(files.values()) | (set(_files(previous).values()) if previous else set())
+        for path in tdir.glob('*.bin'):
+            if path.name not in keep:
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:  # still memory-mapped by a reader (Windows): a later write removes it
+                    pass
+    return tdir
+
+
+def append(ticker: str, df: pd.DataFrame, root: Path | None = None) -> int:
+    """Append the bars of df newer than the last stored date; returns the number of rows added.
+
+    Creates the ticker if it does not exist yet. Columns must match the stored schema.
+    """
+    tdir = _ticker_dir(ticker, root)
+    cols = _to_columns(df.sort_values('date', kind='stable'))
+    with _locked(tdir):
+        if not exists(ticker, root):
+            write(ticker, df, root)
+            return len(df)
+        meta = _read_meta(tdir)
+        rows = meta['rows']
+        if set(cols) != set(meta['columns']):
+            raise ValueError(f"column mismatch for {ticker}: stored {sorted(meta['columns'])}, got {sorted(cols)}")
+        last = read_arrays(ticker, tail=1, columns=['date'], root=root)['date'].view('<i8')
+        new = cols['date'] > last[-1] if rows else np.ones(len(cols['date']), dtype=bool)
+        added = int(new.sum())
+        if not added:
+            return 0
+        files = _files(meta)
+        for name, kind in meta['columns'].items():
+            dtype = _dtype(kind)
+            with open(tdir / files[name], 'r+b') as f:
+                f.truncate(rows * dtype.itemsize)  # drop bytes of an append that never committed
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(cols[name][new], dtype=dtype).tobytes())
+        meta['rows'] = rows + added
+        _write_meta(tdir, meta)
+    return added
+
+
+def read_arrays(ticker: str, tail: int | None = None, columns: list[str] | None = None,
+                root: Path | None = None) -> dict[str, np.ndarray]:
+    """Zero-copy read: column name -> read-only memmap view (dates as datetime64[ns])."""
+    tdir = _ticker_dir(ticker, root)
+    for attempt in range(READ_RETRIES):
+        if not exists(ticker, root):
+            raise FileNotFoundError(f"No stored prices for {ticker.upper()} in {tdir.parent}")
+        try:
+            return _map_columns(tdir, _read_meta(tdir), tail, columns)
+        except FileNotFoundError:
+            # two write()s landed between reading meta and opening its files: read the new meta
+            if attempt == READ_RETRIES - 1:
+                raise
+
+
+def _map_columns(tdir: Path, meta: dict, tail: int | None, columns: list[str] | None) -> dict[str, np.ndarray]:
+    rows = meta['rows']
+    start = max(0, rows - tail) if tail is not None else 0
+    files = _files(meta)
+    out = {}
+    for name, kind in meta['columns'].items():
+        if columns is not None and name not in columns:
+            continue
+        dtype = _dtype(kind)
+        if rows == 0:
+            arr = np.empty(0, dtype=dtype)
+        else:
+            arr = np.memmap(tdir / files[name], dtype=dtype, mode='r', shape=(rows,))[start:]
+        out[name] = arr.view('datetime64[ns]') if kind == DATE_KIND else arr
+    return out
+
+
+def read(ticker: str, tail: int | None = None, columns: list[str] | None = None,
+         root: Path | None = None) -> pd.DataFrame:
+    """Stored prices as a DataFrame (only the last `tail` rows are materialized)."""
+    arrays = read_arrays(ticker, tail=tail, columns=columns, root=root)
+    return pd.DataFrame({name: np.asarray(arr) for name, arr in arrays.items()})
+
+
+def load_prices(ticker: str, tail: int | None = None, root: Path | None = None,
+                data_dir: Path | None = None) -> pd.DataFrame | None:
+    """Stored prices for a ticker, migrating a legacy data/{TICKER}.csv on first use.
+
+    A CSV newer than the stored copy (e.g. regenerated sample data) is migrated again.
+    Returns None when neither the store nor a CSV has the ticker.
+    """
+    csv_path = Path(data_dir or DATA_DIR) / f'{ticker.upper()}.csv'
+    if _needs_migration(ticker, root, csv_path):
+        with _locked(_ticker_dir(ticker, root)):
+            if _needs_migration(ticker, root, csv_path):  # another caller may have just migrated it
+                migrate_csv(csv_path, root)
+    if not exists(ticker, root):
+        return None
+    return read(ticker, tail=tail, root=root)
+
+
+def _needs_migration(ticker: str, root: Path | None, csv_path: Path) -> bool:
+    if not csv_path.exists():
+        return False
+    if not exists(ticker, root):
+        return True
+    return csv_path.stat().st_mtime > (_ticker_dir(ticker, root) / META_FILE).stat().st_mtime
+
+
+def migrate_csv(csv_path: Path, root: Path | None = None) -> Path:
+    """Convert one legacy data/{TICKER}.csv into the columnar store."""
+    csv_path = Path(csv_path)
+    df = pd.read_csv(csv_path, parse_dates=['date'])
+    return write(csv_path.stem, df, root)
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description='Columnar price store utilities')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p_mig = sub.add_parser('migrate', help='Convert data/{TICKER}.csv files into the columnar store')
+    p_mig.add_argument('tickers', nargs='*', help='Tickers to migrate (default: every CSV in data/)')
+    args = ap.parse_args()
+
+    if args.cmd == 'migrate':
+        if args.tickers:
+            paths = [DATA_DIR / f'{t.upper()}.csv' for t in args.tickers]
+        else:
+            paths = sorted(DATA_DIR.glob('*.csv'))
+        for p in paths:
+            if not p.exists():
+                print(f"Skipped {p.stem}: {p} not found")
+                continue
+            tdir = migrate_csv(p)
+            print(f"Migrated {p.stem} -> {tdir} ({_read_meta(tdir)['rows']} rows)")
+
+__all__ = ['read', 'read_arrays', 'write', 'append', 'exists', 'read_meta', 'update_meta', 'load_prices', 'migrate_csv', 'STORE_DIR']
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Opt-in per-request profiling for the prediction service (?profile=... on /api/predict).
+
+Modes (comma separated): 'timings' (wall time of every forecast stage, from StageMetrics.trace),
+'cprofile' (top functions by cumulative time) and 'memory' (tracemalloc peak / retained bytes and
+the top allocation sites). '1' means timings, 'all' every mode. Nothing here runs unless a
+request asks for it.
+
+cProfile and tracemalloc are process-wide, so only one request at a time gets them; a concurrent
+profiled request falls back to timings and says so in 'note'. tracemalloc also counts allocations
+of other threads running meanwhile.
+"""
+from __future__ import annotations
+from pathlib import Path
+import threading
+import time
+
+MODES = ('timings', 'cprofile', 'memory')
+_EXCLUSIVE = threading.Lock()
+
+
+def parse_modes(value: str | None) -> frozenset[str]:
+    """Profile modes requested by a ?profile= / X-Profile value (empty set: no profiling)."""
+    if value is None:
+        return frozenset()
+    value = value.strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return frozenset()
+    if value in ('1', 'true', 'yes', 'on'):
+        return frozenset({'timings'})
+    if value == 'all':
+        return frozenset(MODES)
+    modes = frozenset(m.strip() for m in value.split(',') if m.strip())
+    unknown = modes - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode(s) {sorted(unknown)}; use {', '.join(MODES)} or all")
+    return modes | {'timings'}
+
+
+def _short(filename: str) -> str:
+    parts = Path(filename).parts
+    return '/'.join(parts[-2:]) if len(parts) > 1 else filename
+
+
+def _cprofile_top(prof, top: int) -> list[dict]:
+    import pstats
+    stats = pstats.Stats(prof).stats  # (file, line, func) -> (primitive calls, calls, tottime, cumtime, callers)
+    rows = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top]
+    return [{'function': f'{_short(f)}:{line}({func})', 'calls': nc,
+             'tottime_ms': round(tt * 1e3, 3), 'cumtime_ms': round(ct * 1e3, 3)}
+            for (f, line, func), (cc, nc, tt, ct, callers) in rows]
+
+
+def _memory_report(snapshot, current: int, peak: int, top: int) -> dict:
+    sites = snapshot.statistics('lineno')[:top]
+    return {
+        'peak_kb': round(peak / 1024, 1),
+        'retained_kb': round(current / 1024, 1),
+        'top': [{'site': f'{_short(s.traceback[0].filename)}:{s.traceback[0].lineno}',
+                 'size_kb': round(s.size / 1024, 1), 'count': s.count} for s in sites],
+    }
+
+
+def run_profiled(fn, args: tuple, modes: frozenset[str], metrics, top: int = 15):
+    """Call fn(*args) under the requested modes -> (result, report).
+
+    report holds 'timings' (stage -> ms, plus 'wall') and, when requested and available,
+    'cprofile', 'memory' and 'note'.
+    """
+    # profilers load on first use: the service pays nothing for them until someone profiles
+    import cProfile
+    import tracemalloc
+    report: dict = {}
+    exclusive = bool(modes & {'cprofile', 'memory'})
+    owned = exclusive and _EXCLUSIVE.acquire(blocking=False)
+    if exclusive and not owned:
+        report['note'] = 'another profiled request is running; timings only'
+    elif owned and 'memory' in modes and tracemalloc.is_tracing():
+        report['note'] = 'tracemalloc is already active in this process; no memory report'
+    try:
+        prof = cProfile.Profile() if owned and 'cprofile' in modes else None
+        memory = owned and 'memory' in modes and not tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.start()
+        with metrics.trace() as stages:
+            start = time.perf_counter()
+            if prof is not None:
+                prof.enable()
+            try:
+                result = fn(*args)
+            finally:
+                if prof is not None:
+                    prof.disable()
+                wall = time.perf_counter() - start
+                if memory:
+                    current, peak = tracemalloc.get_traced_memory()
+                    snapshot = tracemalloc.take_snapshot()
+                    tracemalloc.stop()
+    finally:
+        if owned:
+            _EXCLUSIVE.release()
+    timings = {stage: round(s * 1e3, 3) for stage, s in stages.items()}
+    timings['wall'] = round(wall * 1e3, 3)
+    report['timings'] = timings
+    if prof is not None:
+        report['cprofile'] = _cprofile_top(prof, top)
+    if memory:
+        report['memory'] = _memory_report(snapshot, current, peak, top)
+    return result, report
+
+
+__all__ = ['run_profiled', 'parse_modes', 'MODES']
@@ -0,0 +1,115 @@
+"""Background model preloading so the first request per ticker/horizon does not pay the cold load.
+
+ModelWarmup loads every target bundle through model_loader.load_models (filling its cache) and runs
+one dummy prediction per bundle, which deserializes every lazily-packed booster and triggers
+LightGBM's first-predict initialization. status() reports progress for the /ready endpoint.
+"""
+from __future__ import annotations
+from pathlib import Path
+import threading
+import time
+
+import numpy as np
+
+from backend.utils import model_loader
+
+
+def parse_targets(spec: str, models_dir: Path | None = None) -> list[tuple[str, int | None]]:
+    """Warm-up targets from a PRELOAD_MODELS spec.
+
+    'all' (every ticker with models, each trained horizon), '' / 'none' (nothing), or a
+    comma list of TICKER or TICKER:HORIZON entries (a bare ticker means all its horizons).
+    """
+    spec = spec.strip()
+    if spec.lower() in ('', 'none', '0', 'false', 'off'):
+        return []
+    if spec.lower() == 'all':
+        models_dir = Path(models_dir or model_loader.MODELS_DIR)
+        if not models_dir.exists():
+            return []
+        tickers = [p.name.upper() for p in sorted(models_dir.iterdir()) if p.is_dir()]
+        entries = [(t, None) for t in tickers]
+    else:
+        entries = []
+        for item in spec.split(','):
+            if not item.strip():
+                continue
+            ticker, _, horizon = item.strip().partition(':')
+            entries.append((ticker.upper(), int(horizon) if horizon else None))
+    targets = []
+    for ticker, horizon in entries:
+        if horizon is not None:
+            targets.append((ticker, horizon))
+            continue
+        try:
+            meta = model_loader.load_metadata(ticker)
+        except FileNotFoundError:
+            if spec.lower() != 'all':
+                targets.append((ticker, None))  # explicit entry: report it as failed later
+            continue
+        targets.extend((ticker, h) for h in (meta.get('horizons') or [None]))
+    return targets
+
+
+class ModelWarmup:
+    """Loads + test-predicts a list of (ticker, horizon) bundles on a background thread."""
+
+    def __init__(self, targets: list[tuple[str, int | None]], engine: str = 'lightgbm'):
+        self.targets = list(targets)
+        self.engine = engine
+        self.done = 0
+        self.errors: list[dict] = []
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def warm_one(self, ticker: str, horizon: int | None):
+        bundle = model_loader.load_models(ticker, horizon, engine=self.engine)
+        bundle.predict_all(np.zeros(len(bundle.metadata['feature_cols'])))
+
+    def run(self):
+        self.started_at = time.monotonic()
+        for ticker, horizon in self.targets:
+            if self._stop.is_set():
+                break
+            try:
+                self.warm_one(ticker, horizon)
+            except Exception as e:  # keep warming the rest; the request path reports real errors
+                self.errors.append({'ticker': ticker, 'horizon': horizon, 'error': f'{type(e).__name__}: {e}'})
+            self.done += 1
+        self.finished_at = time.monotonic()
+
+    def start(self) -> 'ModelWarmup':
+        self._thread = threading.Thread(target=self.run, name='model-warmup', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None
+
+    def status(self) -> dict:
+        if self.started_at is None:
+            state = 'pending'
+        elif self.finished_at is None:
+            state = 'warming'
+        else:
+            state = 'ready'
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return {
+            'state': state,
+            'total': len(self.targets),
+            'done': self.done,
+            'failed': len(self.errors),
+            'elapsed_s': round(end - self.started_at, 3) if self.started_at is not None else None,
+            'errors': self.errors[-10:],
+        }
+
+
+__all__ = ['ModelWarmup', 'parse_targets']
@@ -44,6 +44,15 @@ export function postForecast({ ticker, horizon, recent = 200 }, { signal } = {})
   });
 }
 
+// items: [{ ticker, horizon, recent }]; failed items come back as { ticker, horizon, error, status }
+export function postBatchForecast(items, { signal } = {}) {
+  return apiFetch('/api/predict/batch', {
+    method: 'POST',
+    body: { items: items.map(({ ticker, horizon, recent = 200 }) => ({ ticker, horizon, recent })) },
+    signal
+  });
+}
+
 export function getHealth({ signal } = {}) {
   return apiFetch('/health', { signal });
 }
@@ -21,7 +21,7 @@ REM Install backend dependencies if uvicorn missing
 python - <<EOF
 import importlib, subprocess, sys
 missing = []
-for pkg in ["fastapi","uvicorn","pandas","numpy","lightgbm","scikit_learn"]:
+for pkg in ["fastapi","uvicorn","pandas","numpy","lightgbm","orjson"]:
     try:
         importlib.import_module(pkg.replace('-', '_'))
     except Exception: